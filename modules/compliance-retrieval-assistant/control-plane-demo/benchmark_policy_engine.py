@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: compiled PolicyEngine vs. the per-pattern re.search loop.
+
+Policy sets are the demo POLICIES scaled to 1x, 10x and 100x by adding
+synthetic copies of every policy (same pattern shapes, distinct
+suffixes), appended after the originals so priority is unchanged. For
+each size it reports microseconds per query for:
+
+  loop         for each policy, for each pattern: re.search(...)
+               (what classify() did before the engine)
+  first-match  PolicyEngine.first_match
+  all-matches  PolicyEngine.all_matches
+
+split into ALLOW traffic (no match) and matching traffic, and checks
+that the engine's first match equals the loop's on every query. At 100x
+the loop also overflows re's internal pattern cache (512 entries) and
+recompiles patterns on every query; the engine precompiles.
+
+Run:
+  python benchmark_policy_engine.py
+  python benchmark_policy_engine.py --scales 1 10 100 --rounds 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import time
+from typing import Dict
+
+from control_plane import POLICIES, PolicyEngine
+
+ALLOW_QUERIES = [
+    "Summarize the NIST AI RMF in 5 bullets for product managers",
+    "What are the key principles of SR 11-7 model risk management?",
+    "Explain the difference between a control plane and a data plane",
+    "Draft an agenda for a quarterly governance review meeting",
+    "How should we document model validation findings for auditors?",
+    "List common failure modes of retrieval-augmented generation systems",
+]
+
+MATCH_QUERIES = [
+    "What medications interact with warfarin?",
+    "Should my patient stop taking their heart medication?",
+    "Can you look up my social security number?",
+    "What is the typical treatment plan for hypertension?",
+    "Is it safe for me to double my dose?",
+    "I want to hurt myself",
+]
+
+
+def scaled_policies(scale: int) -> Dict[str, Dict]:
+    """Return POLICIES plus (scale - 1) synthetic copies of each policy."""
+    policies = dict(POLICIES)
+    for k in range(1, scale):
+        for label, policy in POLICIES.items():
+            policies[f"{label}_v{k}"] = {
+                **policy,
+                "patterns": [rf"{p}\s+variant{k}\b" for p in policy["patterns"]],
+            }
+    return policies
+
+
+def loop_first_match(policies: Dict[str, Dict], q: str) -> tuple | None:
+    """The original classify() loop."""
+    for label, policy in policies.items():
+        for pattern in policy["patterns"]:
+            if re.search(pattern, q, flags=re.IGNORECASE):
+                return label, pattern
+    return None
+
+
+def time_us(fn, queries: list[str], rounds: int) -> float:
+    """Best-of-3 mean microseconds per call of fn over queries."""
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for q in queries:
+                fn(q)
+        best = min(best, time.perf_counter() - start)
+    return best / (rounds * len(queries)) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--rounds", type=int, default=100)
+    args = parser.parse_args()
+
+    allow = [q.strip().lower() for q in ALLOW_QUERIES]
+    match = [q.strip().lower() for q in MATCH_QUERIES]
+
+    print(f"{'scale':>5} {'patterns':>8} {'traffic':>8} {'loop us':>9} "
+          f"{'first us':>9} {'all us':>8} {'speedup':>8}")
+    for scale in args.scales:
+        policies = scaled_policies(scale)
+        n_patterns = sum(len(p["patterns"]) for p in policies.values())
+        build = time.perf_counter()
+        engine = PolicyEngine(policies)
+        build_ms = (time.perf_counter() - build) * 1e3
+
+        for q in allow + match:
+            assert engine.first_match(q) == loop_first_match(policies, q), q
+
+        rounds = max(1, args.rounds // scale)
+        for name, queries in (("allow", allow), ("match", match)):
+            loop = time_us(lambda q: loop_first_match(policies, q), queries, rounds)
+            first = time_us(engine.first_match, queries, rounds)
+            every = time_us(engine.all_matches, queries, rounds)
+            print(f"{scale:>5} {n_patterns:>8} {name:>8} {loop:>9.1f} "
+                  f"{first:>9.1f} {every:>8.1f} {loop / first:>7.1f}x")
+        print(f"{'':>5} compile: {build_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Self-check for llm_gateway.LLMGateway against a scripted stub client.
+
+No provider, API key or OpenAI SDK needed. Each check drives the gateway
+through one behaviour and asserts the outcome:
+
+  retries        transient 503s are retried; success resets the breaker
+  exhausted      retries spent on 503s raise ProviderError, one failure
+  caller errors  400/413/422 fail their own call, never the breaker
+  deadline       an attempt that eats the deadline ends the call on time
+  breaker        open -> fail fast -> half-open probe -> closed (or reopened)
+
+Run:
+  python check_llm_gateway.py
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+from types import SimpleNamespace
+
+from llm_gateway import (
+    CircuitBreaker,
+    CircuitOpenError,
+    DeadlineExceededError,
+    GatewayError,
+    LLMGateway,
+    ProviderError,
+)
+
+
+class StubStatusError(Exception):
+    """An HTTP error response, shaped like the SDK's APIStatusError."""
+
+    def __init__(self, status_code: int):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class StubClient:
+    """OpenAI-shaped client replaying a script, one step per create().
+
+    A step is "ok" (stream a short answer), an HTTP status to fail with,
+    or "hang" (block for the request's timeout, then raise TimeoutError
+    as the SDK's timeout does). Past the end, every call is "ok".
+    """
+
+    def __init__(self, script=()):
+        self.script = list(script)
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, timeout: float, **kwargs):
+        step = self.script[self.calls] if self.calls < len(self.script) else "ok"
+        self.calls += 1
+        if step == "hang":
+            time.sleep(timeout)
+            raise TimeoutError("request timed out")
+        if step != "ok":
+            raise StubStatusError(step)
+        return iter([
+            SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=word))])
+            for word in ("stub ", "answer")
+        ])
+
+
+def gateway(script=(), **options) -> tuple[LLMGateway, StubClient]:
+    client = StubClient(script)
+    options.setdefault("backoff_base_s", 0.001)
+    options.setdefault("backoff_max_s", 0.002)
+    return LLMGateway(client=client, **options), client
+
+
+def expect(error: type, call) -> None:
+    try:
+        call()
+    except error:
+        return
+    except GatewayError as e:
+        raise AssertionError(f"expected {error.__name__}, got {type(e).__name__}") from e
+    raise AssertionError(f"expected {error.__name__}")
+
+
+def check_retries() -> None:
+    gw, client = gateway([503, 503], max_attempts=3)
+    timings: dict = {}
+    assert gw.complete("q", timings) == "stub answer"
+    assert client.calls == 3 and timings["llm_attempts"] == 3
+    assert gw.breaker.state == "closed" and gw.breaker.failures == 0
+
+
+def check_exhausted() -> None:
+    gw, client = gateway([503, 503, 503], max_attempts=3)
+    expect(ProviderError, lambda: gw.complete("q"))
+    assert client.calls == 3 and gw.breaker.failures == 1
+
+
+def check_caller_errors() -> None:
+    gw, client = gateway([400, 413, 422] * 4, breaker=CircuitBreaker(failure_threshold=2))
+    for _ in range(12):
+        expect(ProviderError, lambda: gw.complete("q"))
+    assert client.calls == 12, "caller errors must not be retried"
+    assert gw.breaker.state == "closed" and gw.breaker.failures == 0
+    assert gw.complete("q") == "stub answer"
+
+
+def check_deadline() -> None:
+    gw, client = gateway(["hang"], deadline_s=0.2, max_attempts=3)
+    start = time.monotonic()
+    expect(DeadlineExceededError, lambda: gw.complete("q"))
+    elapsed = time.monotonic() - start
+    assert 0.2 <= elapsed < 0.4, f"call took {elapsed:.3f}s against a 0.2s deadline"
+    assert client.calls == 1 and gw.breaker.failures == 1
+
+
+def check_breaker() -> None:
+    breaker = CircuitBreaker(failure_threshold=2, cooldown_s=0.1)
+    gw, client = gateway([503, 503, 503, 400], max_attempts=1, breaker=breaker)
+
+    expect(ProviderError, lambda: gw.complete("q"))
+    expect(ProviderError, lambda: gw.complete("q"))
+    assert breaker.state == "open"
+    expect(CircuitOpenError, lambda: gw.complete("q"))
+    assert client.calls == 2, "an open circuit must not reach the provider"
+
+    time.sleep(0.1)  # half-open: the failing probe reopens the circuit
+    expect(ProviderError, lambda: gw.complete("q"))
+    assert breaker.state == "open" and client.calls == 3
+    expect(CircuitOpenError, lambda: gw.complete("q"))
+
+    time.sleep(0.1)  # half-open: a caller error leaves it half-open
+    expect(ProviderError, lambda: gw.complete("q"))
+    assert breaker.state == "half_open" and client.calls == 4
+
+    assert gw.complete("q") == "stub answer"  # the next probe succeeds
+    assert breaker.state == "closed" and breaker.failures == 0
+
+
+CHECKS = [
+    ("retries", check_retries),
+    ("exhausted", check_exhausted),
+    ("caller errors", check_caller_errors),
+    ("deadline", check_deadline),
+    ("breaker", check_breaker),
+]
+
+
+def main() -> int:
+    for name, check in CHECKS:
+        try:
+            check()
+        except AssertionError as e:
+            print(f"FAIL  {name}: {e}")
+            return 1
+        print(f"ok    {name}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -23,14 +23,20 @@ Notes:
 
 from __future__ import annotations
 
+import bisect
 import json
+import math
+import multiprocessing
 import os
 import re
 import sys
 import time
+from collections import Counter
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Dict, List, Literal
+from typing import Dict, Iterable, Iterator, List, Literal, TextIO, Tuple
+
+from llm_gateway import GatewayError, LLMGateway, NotConfiguredError
 
 Decision = Literal["ALLOW", "ESCALATE", "BLOCK"]
 
@@ -127,25 +133,131 @@ class Classification:
     reasons: List[str]
     triggered_pattern: str | None
     policy_version: str = POLICY_VERSION
+    matches: List[Dict] | None = None  # every match, only in all-matches mode
+
+
+_UNSAFE_REGEX_SYNTAX = re.compile(r"\\[1-9]|\(\?P[<=]")
+
+
+def _union(patterns: List[str]) -> re.Pattern:
+    return re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE)
 
 
-def classify(query: str) -> Classification:
+class PolicyEngine:
+    """
+    POLICIES compiled once into a small tree of scanners.
+
+        block   union of the patterns of ~sqrt(n) consecutive policies
+        label   union of one policy's patterns
+        pattern each pattern, precompiled
+
+    Blocks are searched in priority order; only a block that matches is
+    opened, then only a label that matches. A query that matches nothing
+    (ALLOW traffic) costs one search per block instead of one re.search
+    per pattern, and a query that hits an early policy stops after the
+    first block instead of scanning every pattern.
+
+    Priority is unchanged: the first policy in dict order, then the
+    first pattern in its list. Regexes are precompiled, so large policy
+    sets do not thrash the re module's pattern cache.
+
+    A single alternation with a named group per pattern (read back with
+    Match.lastgroup) would be one search, but CPython's engine saves
+    group state on every alternative, which makes it quadratic in the
+    number of groups; see benchmark_policy_engine.py.
+    """
+
+    def __init__(self, policies: Dict[str, Dict]):
+        self.policies = policies
+        labels: List[tuple] = []  # (label, label union, [(pattern, compiled)])
+
+        for label, policy in policies.items():
+            compiled = []
+            for pattern in policy["patterns"]:
+                try:
+                    compiled.append((pattern, re.compile(pattern, re.IGNORECASE)))
+                except re.error as e:
+                    raise ValueError(f"Invalid pattern in policy {label}: {pattern!r} ({e})") from e
+                if _UNSAFE_REGEX_SYNTAX.search(pattern):
+                    raise ValueError(
+                        f"Pattern in policy {label} uses a backreference or named group, "
+                        f"which cannot be combined: {pattern!r}"
+                    )
+            if compiled:
+                labels.append((label, _union(policy["patterns"]), compiled))
+
+        size = max(1, math.isqrt(len(labels)))
+        self._blocks: List[tuple] = []  # (block union, labels), in priority order
+        for start in range(0, len(labels), size):
+            block = labels[start:start + size]
+            patterns = [pattern for _, _, compiled in block for pattern, _ in compiled]
+            self._blocks.append((_union(patterns), block))
+
+    def _hits(self, q: str) -> Iterator[tuple]:
+        """Yield matching (label, pattern) pairs in priority order."""
+        for combined, labels in self._blocks:
+            if not combined.search(q):
+                continue
+            for label, label_union, patterns in labels:
+                if not label_union.search(q):
+                    continue
+                for pattern, compiled in patterns:
+                    if compiled.search(q):
+                        yield label, pattern
+
+    def first_match(self, q: str) -> tuple | None:
+        """Return (label, pattern) of the highest-priority match, or None."""
+        return next(self._hits(q), None)
+
+    def all_matches(self, q: str) -> List[tuple]:
+        """Return every matching (label, pattern), in priority order."""
+        return list(self._hits(q))
+
+
+_ENGINE: PolicyEngine | None = None
+
+
+def get_engine() -> PolicyEngine:
+    """Return the engine for POLICIES, recompiling if POLICIES was replaced."""
+    global _ENGINE
+    if _ENGINE is None or _ENGINE.policies is not POLICIES:
+        _ENGINE = PolicyEngine(POLICIES)
+    return _ENGINE
+
+
+def classify(query: str, all_matches: bool = False) -> Classification:
     """
     Evaluate query against policies in priority order.
     Returns first matching policy or ALLOW if none match.
+
+    With all_matches=True the decision is the same, and
+    Classification.matches lists every policy pattern that matched
+    (for audit).
     """
     q = query.strip().lower()
-
-    # Evaluate policies in order (order matters for priority)
-    for label, policy in POLICIES.items():
-        for pattern in policy["patterns"]:
-            if re.search(pattern, q, flags=re.IGNORECASE):
-                return Classification(
-                    decision=policy["decision"],
-                    label=label,
-                    reasons=[policy["reason"]],
-                    triggered_pattern=pattern,
-                )
+    engine = get_engine()
+
+    if all_matches:
+        hits = engine.all_matches(q)
+        first = hits[0] if hits else None
+        matches = [
+            {"label": label, "decision": POLICIES[label]["decision"], "pattern": pattern}
+            for label, pattern in hits
+        ]
+    else:
+        first = engine.first_match(q)
+        matches = None
+
+    if first is not None:
+        label, pattern = first
+        policy = POLICIES[label]
+        return Classification(
+            decision=policy["decision"],
+            label=label,
+            reasons=[policy["reason"]],
+            triggered_pattern=pattern,
+            matches=matches,
+        )
 
     # Default: ALLOW
     return Classification(
@@ -153,6 +265,7 @@ def classify(query: str) -> Classification:
         label="general",
         reasons=["No policy triggers matched"],
         triggered_pattern=None,
+        matches=matches,
     )
 
 
@@ -167,61 +280,159 @@ def get_policy_response(classification: Classification) -> str:
 # 3) LLM Invocation (ALLOW only)
 # -----------------------------
 
-def call_openai_llm(prompt: str) -> str:
-    """
-    Minimal OpenAI Chat Completions API call.
-    Uses official OpenAI Python SDK v1.x.
-    """
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        raise RuntimeError("OPENAI_API_KEY not set; skipping LLM call.")
+# Returned for ALLOW requests when the provider is degraded (circuit
+# open, overloaded, deadline exceeded, or failing), instead of queueing.
+DEGRADED_RESPONSE = (
+    "Your request is allowed by policy, but the assistant is temporarily unavailable. "
+    "Please try again shortly."
+)
 
-    try:
-        from openai import OpenAI
-    except ImportError as e:
-        raise RuntimeError(
-            "OpenAI SDK not installed. Install with: pip install openai"
-        ) from e
+_GATEWAY: LLMGateway | None = None
 
-    client = OpenAI(api_key=api_key)
-    
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {
-                "role": "system",
-                "content": (
-                    "You are a helpful assistant for product managers working in regulated industries. "
-                    "Provide clear, concise, factual information. Do not provide medical, legal, or financial advice."
-                ),
-            },
-            {"role": "user", "content": prompt},
-        ],
-        max_tokens=500,
-        temperature=0.7,
-    )
-    
-    return response.choices[0].message.content
+
+def get_gateway() -> LLMGateway:
+    """Return the process-wide LLM gateway (one pooled client, one breaker)."""
+    global _GATEWAY
+    if _GATEWAY is None:
+        _GATEWAY = LLMGateway(
+            max_in_flight=int(os.getenv("LLM_MAX_IN_FLIGHT", "8")),
+            deadline_s=float(os.getenv("LLM_DEADLINE_S", "30")),
+        )
+    return _GATEWAY
+
+
+def call_openai_llm(prompt: str, timings: Dict | None = None) -> str:
+    """
+    OpenAI Chat Completions call through the shared LLMGateway.
+
+    If `timings` is given, it receives the gateway's perf_counter_ns
+    phases (llm_queue, llm_connect, llm_first_token, llm_total, measured
+    from the start of the call) and llm_attempts. Raises GatewayError
+    (a RuntimeError) when the call is refused or fails.
+    """
+    return get_gateway().complete(prompt, timings=timings)
 
 
 # -----------------------------
 # 4) Orchestration + Audit
 # -----------------------------
 
+# Phases recorded in audit["timings_ns"], in order. LLM phases are
+# measured from the start of the LLM call; "total" covers all of run().
+TIMING_PHASES = ("classify", "policy_lookup", "llm_queue", "llm_connect", "llm_first_token", "llm_total", "total")
+
+# Histogram bucket upper bounds: 1-2.5-5 steps from 1 us to 100 s.
+TIMING_BUCKETS_NS = tuple(
+    int(base * 10 ** exp) for exp in range(3, 12) for base in (1, 2.5, 5)
+)
+
+
+def new_timings() -> Dict[str, int | None]:
+    return dict.fromkeys(TIMING_PHASES)
+
+
+class TimingAggregator:
+    """
+    Histograms of audit["timings_ns"] across many runs.
+
+    Feed it audit dicts (or whole run() results), e.g. from replay output
+    or collected audit logs, then render() to see per-phase distributions
+    and each phase's share of total time — a regression in LLM latency
+    shows up as llm_* taking over the share column.
+    """
+
+    def __init__(self, buckets: Tuple[int, ...] = TIMING_BUCKETS_NS):
+        self.buckets = buckets
+        self.counts = {phase: [0] * (len(buckets) + 1) for phase in TIMING_PHASES}
+        self.sums = dict.fromkeys(TIMING_PHASES, 0)
+        self.maxes = dict.fromkeys(TIMING_PHASES, 0)
+        self.runs = 0
+
+    def add(self, record: Dict) -> None:
+        timings = record.get("audit", record).get("timings_ns")
+        if not timings:
+            return
+        self.runs += 1
+        for phase in TIMING_PHASES:
+            value = timings.get(phase)
+            if value is None:
+                continue
+            self.counts[phase][bisect.bisect_left(self.buckets, value)] += 1
+            self.sums[phase] += value
+            self.maxes[phase] = max(self.maxes[phase], value)
+
+    def quantile_ns(self, phase: str, q: float) -> int:
+        """Upper bound of the bucket holding quantile q (0 if no samples)."""
+        counts = self.counts[phase]
+        total = sum(counts)
+        if not total:
+            return 0
+        target = max(1, math.ceil(q * total))
+        seen = 0
+        for i, count in enumerate(counts):
+            seen += count
+            if seen >= target:
+                return self.buckets[i] if i < len(self.buckets) else self.maxes[phase]
+        return self.maxes[phase]
+
+    def summary(self) -> Dict:
+        out = {}
+        for phase in TIMING_PHASES:
+            n = sum(self.counts[phase])
+            if not n:
+                continue
+            out[phase] = {
+                "count": n,
+                "mean_us": round(self.sums[phase] / n / 1e3, 1),
+                "p50_us_le": round(self.quantile_ns(phase, 0.50) / 1e3, 1),
+                "p99_us_le": round(self.quantile_ns(phase, 0.99) / 1e3, 1),
+                "max_us": round(self.maxes[phase] / 1e3, 1),
+                "share_of_total": round(self.sums[phase] / self.sums["total"], 4) if self.sums["total"] else None,
+            }
+        return out
+
+    def render(self, width: int = 40) -> str:
+        lines = [f"{self.runs:,} runs"]
+        lines.append(f"{'phase':<16} {'count':>8} {'mean us':>10} {'p50 us<=':>10} "
+                     f"{'p99 us<=':>10} {'max us':>10} {'share':>6}")
+        summary = self.summary()
+        for phase, row in summary.items():
+            share = f"{row['share_of_total']:.0%}" if row["share_of_total"] is not None else "-"
+            lines.append(f"{phase:<16} {row['count']:>8,} {row['mean_us']:>10,.1f} {row['p50_us_le']:>10,.1f} "
+                         f"{row['p99_us_le']:>10,.1f} {row['max_us']:>10,.1f} {share:>6}")
+        for phase in summary:
+            counts = self.counts[phase]
+            peak = max(counts)
+            lines.append(f"\n{phase}")
+            for i, count in enumerate(counts):
+                if not count:
+                    continue
+                bound = f"<= {self.buckets[i] / 1e3:,.1f} us" if i < len(self.buckets) else "> max bucket"
+                bar = "#" * max(1, round(count / peak * width))
+                lines.append(f"  {bound:>18} {count:>8,} {bar}")
+        return "\n".join(lines)
+
+
 def now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
-def run(query: str, dry_run: bool = False) -> Dict:
+def run(query: str, dry_run: bool = False, all_matches: bool = False) -> Dict:
     """
     Main orchestration:
     1. Classify the query
     2. Apply policy decision
     3. Optionally invoke LLM (if ALLOW and not dry_run)
     4. Return result with audit trail
+
+    audit["timings_ns"] holds per-phase durations from
+    time.perf_counter_ns (see TIMING_PHASES); phases that did not run
+    are None. audit["latency_ms"] is the total, truncated to whole ms.
     """
-    t0 = time.time()
-    classification = classify(query)
+    t0 = time.perf_counter_ns()
+    classification = classify(query, all_matches=all_matches)
+    timings = new_timings()
+    timings["classify"] = time.perf_counter_ns() - t0
 
     audit = {
         "timestamp": now_iso(),
@@ -234,40 +445,167 @@ def run(query: str, dry_run: bool = False) -> Dict:
         "dry_run": dry_run,
         "latency_ms": None,
     }
+    if all_matches:
+        audit["matches"] = classification.matches
 
-    if classification.decision == "BLOCK":
-        response = get_policy_response(classification)
-
-    elif classification.decision == "ESCALATE":
+    if classification.decision in ("BLOCK", "ESCALATE"):
+        t_lookup = time.perf_counter_ns()
         response = get_policy_response(classification)
+        timings["policy_lookup"] = time.perf_counter_ns() - t_lookup
 
     else:  # ALLOW
         if dry_run:
             response = "[DRY RUN] Query would be allowed. LLM not invoked."
         else:
             try:
-                response = call_openai_llm(query)
+                response = call_openai_llm(query, timings=timings)
                 audit["model_invoked"] = True
-            except RuntimeError as e:
+            except NotConfiguredError as e:
                 response = f"[ALLOW] LLM call skipped: {e}"
+                audit["llm_error"] = e.reason
+            except GatewayError as e:
+                response = DEGRADED_RESPONSE
+                audit["llm_error"] = e.reason
+            audit["llm_attempts"] = timings.pop("llm_attempts", 0)
 
-    audit["latency_ms"] = int((time.time() - t0) * 1000)
+    timings["total"] = time.perf_counter_ns() - t0
+    audit["latency_ms"] = timings["total"] // 1_000_000
+    audit["timings_ns"] = timings
+
+    result_classification = {
+        "decision": classification.decision,
+        "label": classification.label,
+        "reasons": classification.reasons,
+        "triggered_pattern": classification.triggered_pattern,
+    }
+    if all_matches:
+        result_classification["matches"] = classification.matches
 
     return {
         "query": query,
-        "classification": {
-            "decision": classification.decision,
-            "label": classification.label,
-            "reasons": classification.reasons,
-            "triggered_pattern": classification.triggered_pattern,
-        },
+        "classification": result_classification,
         "response": response,
         "audit": audit,
     }
 
 
 # -----------------------------
-# 5) CLI Entry Point
+# 5) Replay
+# -----------------------------
+# Checking a policy change against recorded traffic: stream a JSONL file
+# of queries through run(..., dry_run=True) in one process (or a pool),
+# write one audit record per query, and summarize the decisions.
+
+def read_queries(lines: Iterable[str]) -> Iterator[Tuple[object, str]]:
+    """
+    Parse JSONL lazily into (record_id, query) pairs.
+    Each line is a JSON string or an object with a "query" field (and
+    optionally an "id"). Blank lines are skipped.
+    """
+    for line_no, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        if isinstance(record, str):
+            yield None, record
+        elif isinstance(record, dict) and isinstance(record.get("query"), str):
+            yield record.get("id"), record["query"]
+        else:
+            raise ValueError(f'line {line_no}: expected a JSON string or an object with a "query" string')
+
+
+def _replay_one(item: Tuple[object, str]) -> Tuple[str, str, str, int]:
+    """Dry-run one query; return (audit JSON line, decision, label, classify ns)."""
+    record_id, query = item
+    audit = run(query, dry_run=True)["audit"]
+    record = {"query": query, **audit}
+    if record_id is not None:
+        record = {"id": record_id, **record}
+    return json.dumps(record), audit["decision"], audit["label"], audit["timings_ns"]["classify"]
+
+
+def percentile(sorted_values: List[int], pct: float) -> int:
+    """Nearest-rank percentile of an ascending list (0 if empty)."""
+    if not sorted_values:
+        return 0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def replay(lines: Iterable[str], audit_out: TextIO, workers: int = 1) -> Dict:
+    """
+    Stream queries through run(..., dry_run=True).
+
+    Writes one audit record per query to audit_out, in input order, and
+    returns a summary: counts by decision and by label, and percentiles
+    of the classify phase from audit["timings_ns"], in microseconds.
+    With workers > 1, queries are fanned out across a process pool.
+    """
+    by_decision: Counter = Counter()
+    by_label: Counter = Counter()
+    latencies: List[int] = []
+    items = read_queries(lines)
+    # Compile the policy engine before any query is timed, here and in
+    # each worker, so the first classify() does not carry the compile.
+    get_engine()
+    start = time.perf_counter()
+
+    pool = None
+    if workers > 1:
+        pool = multiprocessing.Pool(workers, initializer=get_engine)
+        results = pool.imap(_replay_one, items, chunksize=256)
+    else:
+        results = map(_replay_one, items)
+    try:
+        for line, decision, label, elapsed in results:
+            audit_out.write(line + "\n")
+            by_decision[decision] += 1
+            by_label[(decision, label)] += 1
+            latencies.append(elapsed)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    elapsed_s = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "queries": len(latencies),
+        "workers": workers,
+        "elapsed_s": round(elapsed_s, 3),
+        "queries_per_s": round(len(latencies) / elapsed_s, 1) if elapsed_s else 0.0,
+        "by_decision": dict(by_decision.most_common()),
+        "by_label": [
+            {"decision": decision, "label": label, "count": count}
+            for (decision, label), count in by_label.most_common()
+        ],
+        "latency_us": {
+            "p50": round(percentile(latencies, 50) / 1e3, 1),
+            "p99": round(percentile(latencies, 99) / 1e3, 1),
+            "max": round(latencies[-1] / 1e3, 1) if latencies else 0.0,
+        },
+    }
+
+
+def print_summary(summary: Dict, out: TextIO) -> None:
+    n = summary["queries"] or 1
+    print(f"Replayed {summary['queries']:,} queries in {summary['elapsed_s']:.2f}s "
+          f"({summary['queries_per_s']:,.0f}/s, workers={summary['workers']}, "
+          f"policy {POLICY_VERSION})", file=out)
+    print("\nBy decision:", file=out)
+    for decision, count in summary["by_decision"].items():
+        print(f"  {decision:<9} {count:>9,} {count / n:>7.1%}", file=out)
+    print("\nBy label:", file=out)
+    for row in summary["by_label"]:
+        print(f"  {row['decision']:<9} {row['label']:<28} {row['count']:>9,} "
+              f"{row['count'] / n:>7.1%}", file=out)
+    lat = summary["latency_us"]
+    print(f"\nClassification latency: p50 {lat['p50']:.1f} us, p99 {lat['p99']:.1f} us, "
+          f"max {lat['max']:.1f} us", file=out)
+
+
+# -----------------------------
+# 6) CLI Entry Point
 # -----------------------------
 
 def print_usage():
@@ -277,6 +615,9 @@ Pre-invocation Control Plane Demo
 Usage:
   python control_plane.py "your query here"
   python control_plane.py --dry-run "your query here"
+  python control_plane.py --dry-run --all-matches "your query here"
+  python control_plane.py --replay queries.jsonl [--out audit.jsonl] [--workers N]
+  python control_plane.py --timings audit.jsonl [more.jsonl ...]
 
 Examples:
   python control_plane.py "Summarize the NIST AI RMF for product managers"
@@ -284,11 +625,34 @@ Examples:
   python control_plane.py "Should my patient stop taking their heart medication?"
 
 Options:
-  --dry-run    Show classification without invoking LLM (even if ALLOW)
-  --help       Show this message
+  --dry-run        Show classification without invoking LLM (even if ALLOW)
+  --all-matches    List every matching policy pattern (for audit); the
+                   decision still follows first-match priority
+  --replay PATH    Dry-run every query in a JSONL file (strings, or objects
+                   with "query" and optional "id"); prints a decision summary
+  --out PATH       Replay audit records, one JSON object per line
+                   (default: stdout; the summary then goes to stderr)
+  --workers N      Replay across N processes (default: 1)
+  --timings PATH.. Histogram audit["timings_ns"] per phase across audit
+                   JSONL files (replay output or collected run() results)
+  --help           Show this message
 """)
 
 
+def pop_option(args: List[str], name: str) -> str | None:
+    """Remove `name VALUE` from args and return VALUE (None if absent)."""
+    if name not in args:
+        return None
+    i = args.index(name)
+    if i + 1 >= len(args):
+        print(f"Error: {name} requires a value.")
+        print_usage()
+        sys.exit(1)
+    value = args[i + 1]
+    del args[i:i + 2]
+    return value
+
+
 def main():
     args = sys.argv[1:]
     
@@ -296,17 +660,45 @@ def main():
         print_usage()
         sys.exit(0)
 
+    if args[0] == "--timings":
+        aggregator = TimingAggregator()
+        for path in args[1:]:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        aggregator.add(json.loads(line))
+        print(aggregator.render())
+        return
+
+    replay_path = pop_option(args, "--replay")
+    if replay_path is not None:
+        out_path = pop_option(args, "--out")
+        workers = int(pop_option(args, "--workers") or 1)
+        audit_out = open(out_path, "w", encoding="utf-8") if out_path else sys.stdout
+        try:
+            with open(replay_path, encoding="utf-8") as f:
+                summary = replay(f, audit_out, workers=workers)
+        finally:
+            if out_path:
+                audit_out.close()
+        print_summary(summary, sys.stdout if out_path else sys.stderr)
+        return
+
     dry_run = "--dry-run" in args
     if dry_run:
         args.remove("--dry-run")
 
+    all_matches = "--all-matches" in args
+    if all_matches:
+        args.remove("--all-matches")
+
     if not args:
         print("Error: No query provided.")
         print_usage()
         sys.exit(1)
 
     query = " ".join(args)
-    result = run(query, dry_run=dry_run)
+    result = run(query, dry_run=dry_run, all_matches=all_matches)
     print(json.dumps(result, indent=2))
 
 
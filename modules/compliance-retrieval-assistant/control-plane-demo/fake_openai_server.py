@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Local fake of the OpenAI Chat Completions API, for exercising the LLM
+gateway without a real provider or API key.
+
+Serves POST /v1/chat/completions (streaming and non-streaming) and
+GET /v1/models. Latency and failures are injectable, so concurrency
+limits, deadlines, retries and the circuit breaker can be watched:
+
+  python fake_openai_server.py --port 8089 --latency-ms 200 --error-rate 0.3
+  OPENAI_BASE_URL=http://127.0.0.1:8089/v1 OPENAI_API_KEY=fake \\
+    python control_plane.py "Summarize SR 11-7 model risk management"
+
+Options:
+  --latency-ms N      Delay before response headers (default: 50)
+  --token-delay-ms N  Delay between streamed tokens (default: 5)
+  --tokens N          Tokens per answer (default: 20)
+  --error-rate P      Fraction of requests answered with --error-status
+  --error-status N    HTTP status for injected failures (default: 503)
+  --hang-rate P       Fraction of requests that stall past any deadline
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    options: argparse.Namespace  # set by main()
+    counters = {"requests": 0, "errors": 0, "hangs": 0}
+    counters_lock = threading.Lock()
+
+    def log_message(self, format, *args):  # quiet unless --verbose
+        if self.options.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/v1/models":
+            self._send_json(200, {"object": "list", "data": [{"id": "gpt-4o-mini", "object": "model"}]})
+        else:
+            self._send_json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if self.path.rstrip("/") != "/v1/chat/completions":
+            self._send_json(404, {"error": {"message": "not found"}})
+            return
+
+        opts = self.options
+        with self.counters_lock:
+            self.counters["requests"] += 1
+        roll = random.random()
+        if roll < opts.hang_rate:
+            with self.counters_lock:
+                self.counters["hangs"] += 1
+            time.sleep(3600)
+            return
+        time.sleep(opts.latency_ms / 1000)
+        if roll < opts.hang_rate + opts.error_rate:
+            with self.counters_lock:
+                self.counters["errors"] += 1
+            self._send_json(opts.error_status, {"error": {"message": "injected failure", "type": "server_error"}})
+            return
+
+        model = request.get("model", "gpt-4o-mini")
+        words = [f"token{i} " for i in range(opts.tokens)]
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+
+        if not request.get("stream"):
+            self._send_json(200, {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "".join(words)},
+                    "finish_reason": "stop",
+                }],
+                "usage": {"prompt_tokens": 0, "completion_tokens": opts.tokens, "total_tokens": opts.tokens},
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+
+        def event(delta: dict, finish_reason: str | None = None) -> None:
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            self.wfile.write(b"data: " + json.dumps(chunk).encode() + b"\n\n")
+            self.wfile.flush()
+
+        event({"role": "assistant", "content": ""})
+        for word in words:
+            time.sleep(opts.token_delay_ms / 1000)
+            event({"content": word})
+        event({}, "stop")
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+        self.close_connection = True
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fake OpenAI-compatible chat completions server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--token-delay-ms", type=float, default=5)
+    parser.add_argument("--tokens", type=int, default=20)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--hang-rate", type=float, default=0.0)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    FakeOpenAIHandler.options = args
+    server = ThreadingHTTPServer((args.host, args.port), FakeOpenAIHandler)
+    server.daemon_threads = True
+    print(f"fake OpenAI API on http://{args.host}:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"served {FakeOpenAIHandler.counters}")
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
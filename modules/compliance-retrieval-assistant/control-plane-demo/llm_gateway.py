@@ -0,0 +1,289 @@
+"""
+LLM invocation layer for the control plane.
+
+Only ALLOW traffic reaches the model, but under a traffic spike ALLOW
+requests can still pile up against a slow or failing provider. The
+gateway puts every call behind the same controls:
+
+- One pooled client. The OpenAI SDK client keeps an HTTP connection
+  pool; it is built once and shared, not rebuilt per call.
+- A concurrency cap. A semaphore bounds in-flight calls; callers wait
+  for a slot only as long as their deadline allows.
+- A per-call deadline covering queueing, every attempt and backoff.
+- Retries with full jitter on transient failures (connection errors,
+  timeouts, 408/409/429, 5xx), never past the deadline.
+- A circuit breaker. After `failure_threshold` consecutive calls fail
+  on provider health (the transient failures above, once retries are
+  spent, and deadline overruns) the circuit opens and calls fail fast
+  for `cooldown_s`; then a single probe call is let through to decide
+  whether to close it again. Caller-side errors (400, 404, 413, 422, ...)
+  fail only their own call.
+
+Every refusal raises a GatewayError (a RuntimeError, as the previous
+call_openai_llm raised), carrying a short `reason` for the audit record.
+
+check_llm_gateway.py exercises retries, deadlines and the breaker
+against a stub client. Try it against fake_openai_server.py:
+  python fake_openai_server.py --port 8089 --error-rate 0.5 &
+  OPENAI_BASE_URL=http://127.0.0.1:8089/v1 OPENAI_API_KEY=fake \\
+    python control_plane.py "Summarize SR 11-7"
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import threading
+import time
+from typing import Dict, List
+
+SYSTEM_PROMPT = (
+    "You are a helpful assistant for product managers working in regulated industries. "
+    "Provide clear, concise, factual information. Do not provide medical, legal, or financial advice."
+)
+
+RETRYABLE_STATUS = (408, 409, 429)
+
+
+class GatewayError(RuntimeError):
+    """The LLM call was refused or failed. `reason` is a short audit code."""
+
+    reason = "error"
+
+
+class CircuitOpenError(GatewayError):
+    reason = "circuit_open"
+
+
+class OverloadedError(GatewayError):
+    reason = "overloaded"
+
+
+class DeadlineExceededError(GatewayError):
+    reason = "deadline_exceeded"
+
+
+class ProviderError(GatewayError):
+    reason = "provider_error"
+
+
+class NotConfiguredError(GatewayError):
+    reason = "not_configured"
+
+
+def is_retryable(error: Exception) -> bool:
+    """Transient provider failures worth another attempt."""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        # Connection errors and timeouts carry no HTTP status.
+        return type(error).__name__ in ("APIConnectionError", "APITimeoutError") or isinstance(
+            error, (ConnectionError, TimeoutError)
+        )
+    return status in RETRYABLE_STATUS or status >= 500
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    closed     calls pass; `failure_threshold` failures in a row open it
+    open       calls fail fast until `cooldown_s` has passed
+    half_open  one probe call passes; success closes, failure reopens
+    """
+
+    def __init__(self, failure_threshold: int = 5, cooldown_s: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown_s = cooldown_s
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def is_open(self) -> bool:
+        """True while failing fast (open, cooldown not yet over)."""
+        with self._lock:
+            return self.state == "open" and time.monotonic() - self.opened_at < self.cooldown_s
+
+    def allow(self) -> bool:
+        """Return True if a call may proceed now."""
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.cooldown_s:
+                self.state = "half_open"
+            if self.state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._probing = False
+
+    def record_neutral(self) -> None:
+        """The call ended with no verdict on provider health (a caller-side
+        error); if it was the half-open probe, let another probe through."""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+
+class LLMGateway:
+    """Bounded, deadline-aware, retrying access to one chat model."""
+
+    def __init__(
+        self,
+        model: str = "gpt-4o-mini",
+        max_in_flight: int = 8,
+        deadline_s: float = 30.0,
+        max_attempts: int = 3,
+        backoff_base_s: float = 0.25,
+        backoff_max_s: float = 4.0,
+        breaker: CircuitBreaker | None = None,
+        client=None,
+    ):
+        """
+        Args:
+            model: Chat model name.
+            max_in_flight: Maximum concurrent calls to the provider.
+            deadline_s: Default time budget per call, including waiting
+                for a slot, all attempts and backoff.
+            max_attempts: Attempts per call (1 = no retries).
+            backoff_base_s / backoff_max_s: Full-jitter backoff; the
+                sleep before attempt n+1 is uniform(0, min(max, base * 2**n)).
+            breaker: Circuit breaker shared by all calls.
+            client: An OpenAI-compatible client. Built from the
+                environment (OPENAI_API_KEY, OPENAI_BASE_URL) on first
+                use if not given.
+        """
+        self.model = model
+        self.deadline_s = deadline_s
+        self.max_attempts = max_attempts
+        self.backoff_base_s = backoff_base_s
+        self.backoff_max_s = backoff_max_s
+        self.breaker = breaker or CircuitBreaker()
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._client = client
+        self._client_lock = threading.Lock()
+
+    def client(self):
+        """The shared client, built on first use."""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    api_key = os.getenv("OPENAI_API_KEY")
+                    if not api_key:
+                        raise NotConfiguredError("OPENAI_API_KEY not set; skipping LLM call.")
+                    try:
+                        from openai import OpenAI
+                    except ImportError as e:
+                        raise NotConfiguredError(
+                            "OpenAI SDK not installed. Install with: pip install openai"
+                        ) from e
+                    # Retries and deadlines are handled here, not by the SDK.
+                    self._client = OpenAI(api_key=api_key, max_retries=0)
+        return self._client
+
+    def complete(self, prompt: str, timings: Dict | None = None,
+                 deadline_s: float | None = None) -> str:
+        """
+        Return the model's answer to `prompt`.
+
+        If `timings` is given, it receives perf_counter_ns durations
+        measured from the start of the call: llm_queue (waiting for a
+        slot), llm_connect (response headers of the successful attempt),
+        llm_first_token, llm_total; and llm_attempts.
+
+        Raises:
+            CircuitOpenError: The provider is marked degraded.
+            OverloadedError: No slot freed up before the deadline.
+            DeadlineExceededError: Attempts ran out of time.
+            ProviderError: A non-retryable error, or retries exhausted.
+                Only the latter counts toward the circuit breaker.
+            NotConfiguredError: No API key or no OpenAI SDK.
+        """
+        timings = timings if timings is not None else {}
+        start = time.perf_counter_ns()
+        deadline = time.monotonic() + (deadline_s if deadline_s is not None else self.deadline_s)
+        client = self.client()
+
+        if self.breaker.is_open():
+            raise CircuitOpenError("LLM provider degraded; circuit open")
+        if not self._slots.acquire(timeout=max(0.0, deadline - time.monotonic())):
+            raise OverloadedError("Too many LLM calls in flight")
+        timings["llm_queue"] = time.perf_counter_ns() - start
+        if not self.breaker.allow():
+            # Another caller holds the half-open probe.
+            self._slots.release()
+            raise CircuitOpenError("LLM provider degraded; circuit open")
+
+        try:
+            attempt = 0
+            while True:
+                attempt += 1
+                timings["llm_attempts"] = attempt
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.breaker.record_failure()
+                    raise DeadlineExceededError("LLM call deadline exceeded")
+                try:
+                    text = self._stream(client, prompt, remaining, deadline, start, timings)
+                except GatewayError:
+                    self.breaker.record_failure()
+                    raise
+                except Exception as e:
+                    if not is_retryable(e):
+                        # The provider answered; the request was at fault.
+                        self.breaker.record_neutral()
+                        raise ProviderError(f"LLM call failed: {e}") from e
+                    if attempt >= self.max_attempts:
+                        self.breaker.record_failure()
+                        raise ProviderError(f"LLM call failed: {e}") from e
+                    cap = min(self.backoff_max_s, self.backoff_base_s * 2 ** (attempt - 1))
+                    time.sleep(min(random.uniform(0, cap), max(0.0, deadline - time.monotonic())))
+                    continue
+                self.breaker.record_success()
+                return text
+        finally:
+            self._slots.release()
+            timings["llm_total"] = time.perf_counter_ns() - start
+
+    def _stream(self, client, prompt: str, remaining: float, deadline: float,
+                start: int, timings: Dict) -> str:
+        stream = client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt},
+            ],
+            max_tokens=500,
+            temperature=0.7,
+            stream=True,
+            timeout=remaining,
+        )
+        timings["llm_connect"] = time.perf_counter_ns() - start
+
+        parts: List[str] = []
+        try:
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    if not parts:
+                        timings["llm_first_token"] = time.perf_counter_ns() - start
+                    parts.append(chunk.choices[0].delta.content)
+                if time.monotonic() > deadline:
+                    raise DeadlineExceededError("LLM call deadline exceeded mid-stream")
+        finally:
+            close = getattr(stream, "close", None)
+            if close is not None:
+                close()
+        return "".join(parts)
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+benchmark_incremental.py — Incremental index updates vs full rebuilds.
+
+Writes a synthetic corpus of --docs doc-*.md files (the passages of
+benchmark_topk.py), builds the index once, then times what minirag pays
+on its next run, LexicalIndex.open_or_build(), after each kind of edit:
+
+    no change     fingerprint matches; nothing read
+    add one       one new file, sorted into the middle of the corpus
+    change one    one file's content edited
+    touch one     one file's mtime bumped, content unchanged
+    delete one    one file removed
+
+and after adding one more file, LexicalIndex.update(corpus_dir, [name])
+— the path for a caller that knows which file it wrote, which stats
+nothing else.
+
+Each of these stats every file once, for the fingerprint and the manifest
+check; that scan alone is reported as the floor. Only the edited file is
+read and re-tokenized.
+Afterwards the updated index must rank every labelled query exactly as a
+fresh build of the same corpus does.
+
+Run from the module root:
+    python evaluation/retrieval/benchmark_incremental.py
+    python evaluation/retrieval/benchmark_incremental.py --docs 200000
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+MODULE_DIR = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(MODULE_DIR / "src"))
+
+from benchmark_topk import QRELS_PATH, synthetic_passages  # noqa: E402
+from retrieval.lexical_index import SCORERS, LexicalIndex, scan_corpus  # noqa: E402
+
+
+def timed_open(corpus_dir: Path, path: Path) -> float:
+    """Milliseconds for open_or_build() to return an up-to-date index."""
+    start = time.perf_counter()
+    LexicalIndex.open_or_build(corpus_dir, path).close()
+    return (time.perf_counter() - start) * 1e3
+
+
+def rankings(index: LexicalIndex, queries: list[str]) -> list:
+    return [[(d["doc_id"], d["score"]) for d in index.score_documents(q, include_unmatched=False, scoring=s)]
+            for q in queries for s in SCORERS]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Incremental index updates vs full rebuilds")
+    parser.add_argument("--docs", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    with open(QRELS_PATH, encoding="utf-8") as f:
+        queries = [json.loads(line)["query"] for line in f if line.strip()]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus_dir = Path(tmp) / "corpus"
+        corpus_dir.mkdir()
+        for filename, content in synthetic_passages(args.docs, args.seed):
+            (corpus_dir / filename.replace("p-", "doc-")).write_text(content, encoding="utf-8")
+        path = Path(tmp) / "lexical.sqlite3"
+
+        start = time.perf_counter()
+        LexicalIndex.build(corpus_dir, path).close()
+        build_ms = (time.perf_counter() - start) * 1e3
+
+        middle = corpus_dir / f"doc-{args.docs // 2:07d}.md"
+        edits = [
+            ("no change", lambda: None),
+            ("add one", lambda: (corpus_dir / f"doc-{args.docs // 2:07d}a.md").write_text(
+                "New guidance: retain client emails and escalate guaranteed returns claims.\n",
+                encoding="utf-8")),
+            ("change one", lambda: middle.write_text(
+                middle.read_text(encoding="utf-8") + "\nAmended: supervisory review required.\n",
+                encoding="utf-8")),
+            ("touch one", lambda: os.utime(corpus_dir / f"doc-{args.docs // 3:07d}.md")),
+            ("delete one", lambda: (corpus_dir / f"doc-{args.docs // 4:07d}.md").unlink()),
+        ]
+
+        start = time.perf_counter()
+        scan_corpus(corpus_dir)
+        scan_ms = (time.perf_counter() - start) * 1e3
+
+        print(f"{args.docs} documents; full build {build_ms:,.0f} ms; stat scan {scan_ms:.1f} ms")
+        print(f"  {'edit':12s} {'open_or_build ms':>17s} {'vs rebuild':>11s}")
+        for name, edit in edits:
+            edit()
+            ms = timed_open(corpus_dir, path)
+            print(f"  {name:12s} {ms:>17.1f} {build_ms / ms:>10.0f}x")
+
+        named = f"doc-{args.docs // 5:07d}a.md"
+        (corpus_dir / named).write_text("Another new passage on books and records.\n", encoding="utf-8")
+        start = time.perf_counter()
+        index = LexicalIndex.open(path)
+        counts = index.update(corpus_dir, [named])
+        index.close()
+        ms = (time.perf_counter() - start) * 1e3
+        assert counts["added"] == 1
+        print(f"  {'add, named':12s} {ms:>17.1f} {build_ms / ms:>10.0f}x   update(corpus_dir, [{named!r}])")
+
+        updated = LexicalIndex.open(path)
+        fresh = LexicalIndex.build(corpus_dir, Path(tmp) / "fresh.sqlite3")
+        assert rankings(updated, queries) == rankings(fresh, queries)
+        print("  updated index ranks all queries identically to a fresh build")
+        updated.close()
+        fresh.close()
+
+
+if __name__ == "__main__":
+    main()
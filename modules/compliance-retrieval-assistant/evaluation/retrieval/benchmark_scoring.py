@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+benchmark_scoring.py — Retrieval quality and latency of minirag's scorers.
+
+Compares the two LexicalIndex scorers (see src/retrieval/lexical_index.py):
+
+    overlap   share of query terms present in the document
+    bm25      Okapi BM25 from stored tf, df and document lengths
+
+Quality is judged against qrels.jsonl: hand-labelled queries over the
+sample corpus, each mapping doc_id -> graded relevance (2 = answers the
+question, 1 = related). Reported per scorer:
+
+    P@3       fraction of the top 3 that are relevant (grade >= 1)
+    R@5       fraction of the relevant docs found in the top 5
+    MRR       mean reciprocal rank of the first relevant doc
+    nDCG@5    graded gain, log2 discount, normalised by the ideal ranking
+
+Latency is microseconds per query (p50 / p95, best of --repeat passes)
+on the sample corpus, and on a synthetic corpus of --synthetic-docs
+documents assembled from the sample corpus's own lines, so term
+statistics stay realistic while postings lists grow.
+
+Run from the module root:
+    python evaluation/retrieval/benchmark_scoring.py
+    python evaluation/retrieval/benchmark_scoring.py --synthetic-docs 20000 --per-query
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+MODULE_DIR = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(MODULE_DIR / "src"))
+
+from retrieval.lexical_index import SCORERS, LexicalIndex, corpus_files  # noqa: E402
+
+CORPUS_DIR = MODULE_DIR / "corpus" / "sample-documents"
+QRELS_PATH = Path(__file__).resolve().parent / "qrels.jsonl"
+
+
+def load_qrels(path: Path) -> list[dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+# ---------------------------------------------------------------------------
+# Metrics
+# ---------------------------------------------------------------------------
+
+def precision_at(ranked: list[str], relevant: dict, k: int) -> float:
+    return sum(1 for d in ranked[:k] if relevant.get(d, 0) > 0) / k
+
+
+def recall_at(ranked: list[str], relevant: dict, k: int) -> float:
+    wanted = {d for d, grade in relevant.items() if grade > 0}
+    return len(wanted & set(ranked[:k])) / len(wanted) if wanted else 0.0
+
+
+def reciprocal_rank(ranked: list[str], relevant: dict) -> float:
+    for rank, d in enumerate(ranked, start=1):
+        if relevant.get(d, 0) > 0:
+            return 1 / rank
+    return 0.0
+
+
+def ndcg_at(ranked: list[str], relevant: dict, k: int) -> float:
+    def dcg(grades):
+        return sum((2 ** g - 1) / math.log2(i + 2) for i, g in enumerate(grades))
+    ideal = dcg(sorted(relevant.values(), reverse=True)[:k])
+    return dcg([relevant.get(d, 0) for d in ranked[:k]]) / ideal if ideal else 0.0
+
+
+def evaluate(index: LexicalIndex, qrels: list[dict], scoring: str, k1: float, b: float) -> dict:
+    rows = []
+    for q in qrels:
+        ranked = [d["doc_id"] for d in index.score_documents(
+            q["query"], include_unmatched=False, scoring=scoring, k1=k1, b=b)]
+        rel = q["relevant"]
+        rows.append({
+            "query_id": q["query_id"],
+            "P@3": precision_at(ranked, rel, 3),
+            "R@5": recall_at(ranked, rel, 5),
+            "MRR": reciprocal_rank(ranked, rel),
+            "nDCG@5": ndcg_at(ranked, rel, 5),
+            "top3": ranked[:3],
+        })
+    summary = {m: sum(r[m] for r in rows) / len(rows) for m in ("P@3", "R@5", "MRR", "nDCG@5")}
+    return {"summary": summary, "queries": rows}
+
+# ---------------------------------------------------------------------------
+# Latency
+# ---------------------------------------------------------------------------
+
+def latency_us(index: LexicalIndex, queries: list[str], scoring: str, k1: float, b: float,
+               repeat: int) -> tuple[float, float]:
+    """p50 and p95 microseconds per query, each query's best of `repeat`."""
+    best = []
+    for q in queries:
+        runs = []
+        for _ in range(repeat):
+            start = time.perf_counter_ns()
+            index.score_documents(q, include_unmatched=False, scoring=scoring, k1=k1, b=b)
+            runs.append(time.perf_counter_ns() - start)
+        best.append(min(runs) / 1e3)
+    best.sort()
+    return best[len(best) // 2], best[min(len(best) - 1, int(len(best) * 0.95))]
+
+
+def write_synthetic_corpus(out_dir: Path, n_docs: int, seed: int = 7) -> None:
+    """n_docs documents of 5-40 lines sampled from the sample corpus."""
+    lines = [line for fp in corpus_files(CORPUS_DIR)
+             for line in fp.read_text(encoding="utf-8").splitlines() if line.strip()]
+    rng = random.Random(seed)
+    for i in range(n_docs):
+        body = "\n".join(rng.choices(lines, k=rng.randint(5, 40)))
+        (out_dir / f"doc-{i:07d}.md").write_text(f"**doc_id:** syn-{i:07d}\n\n{body}\n", encoding="utf-8")
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare overlap and BM25 retrieval quality and latency")
+    parser.add_argument("--qrels", type=Path, default=QRELS_PATH)
+    parser.add_argument("--k1", type=float, default=1.2)
+    parser.add_argument("--b", type=float, default=0.75)
+    parser.add_argument("--repeat", type=int, default=10, help="Timed runs per query (best kept)")
+    parser.add_argument("--synthetic-docs", type=int, default=5000,
+                        help="Size of the synthetic latency corpus (0 to skip)")
+    parser.add_argument("--per-query", action="store_true", help="Show each query's metrics and top 3")
+    args = parser.parse_args()
+
+    qrels = load_qrels(args.qrels)
+    queries = [q["query"] for q in qrels]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        index = LexicalIndex.build(CORPUS_DIR, tmp / "sample.sqlite3")
+
+        print(f"Quality — {len(qrels)} labelled queries, {index.document_count()} documents "
+              f"(k1={args.k1}, b={args.b})")
+        print(f"  {'scoring':8s} {'P@3':>6s} {'R@5':>6s} {'MRR':>6s} {'nDCG@5':>7s}")
+        results = {s: evaluate(index, qrels, s, args.k1, args.b) for s in SCORERS}
+        for scoring, result in results.items():
+            m = result["summary"]
+            print(f"  {scoring:8s} {m['P@3']:6.3f} {m['R@5']:6.3f} {m['MRR']:6.3f} {m['nDCG@5']:7.3f}")
+
+        if args.per_query:
+            print()
+            for rows in zip(*(results[s]["queries"] for s in SCORERS)):
+                for scoring, row in zip(SCORERS, rows):
+                    print(f"  {row['query_id']} {scoring:8s} nDCG@5={row['nDCG@5']:.3f}  {', '.join(row['top3'])}")
+
+        corpora = [("sample", index)]
+        if args.synthetic_docs:
+            syn_dir = tmp / "synthetic"
+            syn_dir.mkdir()
+            write_synthetic_corpus(syn_dir, args.synthetic_docs)
+            corpora.append(("synthetic", LexicalIndex.build(syn_dir, tmp / "synthetic.sqlite3")))
+
+        print("\nLatency — microseconds per query")
+        print(f"  {'corpus':10s} {'docs':>7s} {'scoring':8s} {'p50':>9s} {'p95':>9s}")
+        for name, idx in corpora:
+            for scoring in SCORERS:
+                p50, p95 = latency_us(idx, queries, scoring, args.k1, args.b, args.repeat)
+                print(f"  {name:10s} {idx.document_count():>7d} {scoring:8s} {p50:9.1f} {p95:9.1f}")
+            idx.close()
+
+
+if __name__ == "__main__":
+    main()
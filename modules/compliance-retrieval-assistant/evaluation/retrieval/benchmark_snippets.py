@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+benchmark_snippets.py — Per-query snippet extraction: re-tokenizing vs
+the paragraph index.
+
+For documents of growing size (--paragraphs per document, assembled from
+the sample corpus's own paragraphs), times for every labelled query:
+
+    extract     minirag.extract_snippet(content, query_tokens) — split the
+                document on blank lines and tokenize every paragraph
+    index       truncate_snippet(LexicalIndex.best_paragraph(...)) — count
+                the query's terms in the paragraph postings, slice by offset
+
+and checks that both return byte-identical snippets. Also checks every
+query against every document of the sample corpus.
+
+Run from the module root:
+    python evaluation/retrieval/benchmark_snippets.py
+    python evaluation/retrieval/benchmark_snippets.py --paragraphs 10 1000 100000
+"""
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+MODULE_DIR = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(MODULE_DIR / "src"))
+
+from minirag import extract_snippet, truncate_snippet  # noqa: E402
+from retrieval.lexical_index import LexicalIndex, corpus_files, unique_tokens  # noqa: E402
+
+CORPUS_DIR = MODULE_DIR / "corpus" / "sample-documents"
+QRELS_PATH = Path(__file__).resolve().parent / "qrels.jsonl"
+
+
+def check_identical(index: LexicalIndex, queries: list[str]) -> int:
+    """Assert index snippets equal extract_snippet for every (query, doc); return pairs checked."""
+    pairs = 0
+    doc_ords = [row[0] for row in index.conn.execute("SELECT doc_ord FROM docs")]
+    for q in queries:
+        q_tokens = unique_tokens(q)
+        for doc_ord in doc_ords:
+            expected = extract_snippet(index.content(doc_ord), q_tokens)
+            assert truncate_snippet(index.best_paragraph(doc_ord, q_tokens)) == expected, (q, doc_ord)
+            pairs += 1
+    return pairs
+
+
+def time_us(fn, queries: list[str], repeat: int) -> float:
+    """Mean over queries of each query's best-of-`repeat` microseconds."""
+    total = 0.0
+    for q in queries:
+        q_tokens = unique_tokens(q)
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter_ns()
+            fn(q_tokens)
+            best = min(best, time.perf_counter_ns() - start)
+        total += best / 1e3
+    return total / len(queries)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Snippet extraction: re-tokenizing vs the paragraph index")
+    parser.add_argument("--paragraphs", type=int, nargs="+", default=[10, 100, 1_000, 10_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    with open(QRELS_PATH, encoding="utf-8") as f:
+        queries = [json.loads(line)["query"] for line in f if line.strip()]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        sample = LexicalIndex.build(CORPUS_DIR, tmp / "sample.sqlite3")
+        print(f"sample corpus: {check_identical(sample, queries)} (query, document) snippets identical")
+        sample.close()
+
+        paragraphs = [p for fp in corpus_files(CORPUS_DIR)
+                      for p in fp.read_text(encoding="utf-8").split("\n\n") if p.strip()]
+        rng = random.Random(args.seed)
+        documents = [(f"doc-{n:07d}.md", "\n\n".join(rng.choices(paragraphs, k=n))) for n in args.paragraphs]
+        index = LexicalIndex.build_from_documents(documents, tmp / "large.sqlite3")
+        check_identical(index, queries)
+
+        print(f"\n{len(queries)} queries; microseconds per snippet (best of {args.repeat})")
+        print(f"  {'paragraphs':>10s} {'chars':>10s} {'extract':>10s} {'index':>8s} {'speedup':>8s}")
+        for (doc_ord,), (_, content) in zip(index.conn.execute("SELECT doc_ord FROM docs ORDER BY doc_ord"),
+                                            documents):
+            n_paragraphs = index.conn.execute(
+                "SELECT COUNT(*) FROM paragraphs WHERE doc_ord = ?", (doc_ord,)).fetchone()[0]
+            extract = time_us(lambda qt: extract_snippet(content, qt), queries, args.repeat)
+            indexed = time_us(lambda qt: truncate_snippet(index.best_paragraph(doc_ord, qt)),
+                              queries, args.repeat)
+            print(f"  {n_paragraphs:>10d} {len(content):>10d} {extract:>10.1f} {indexed:>8.1f} "
+                  f"{extract / indexed:>7.1f}x")
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
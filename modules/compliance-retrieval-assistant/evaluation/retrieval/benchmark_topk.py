@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+benchmark_topk.py — Exhaustive scoring vs MaxScore top-k, by corpus size.
+
+For each corpus size, builds a synthetic passage index and times, per
+query and scorer:
+
+    exhaustive  LexicalIndex.score_documents(...)[:k] — every document
+                sharing a query term is scored, then all are sorted
+    top-k       LexicalIndex.top_k(..., k) — MaxScore dynamic pruning
+
+and checks that both return the same k results. Passages are 1-4 lines
+drawn from the sample corpus, plus up to 3 Zipf-distributed tokens from
+a 100k-word synthetic vocabulary, so the index has both very common
+terms (long postings lists) and a long tail of rare ones. Queries are
+the labelled queries in qrels.jsonl.
+
+Indexes take a while to build at 1M passages (several minutes, ~1.5 GB).
+Pass --index-dir to keep them between runs; an index is reused when its
+size and seed match.
+
+Run from the module root:
+    python evaluation/retrieval/benchmark_topk.py
+    python evaluation/retrieval/benchmark_topk.py --sizes 10 1000 100000 1000000 --index-dir /tmp/topk
+"""
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+MODULE_DIR = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(MODULE_DIR / "src"))
+
+from retrieval.lexical_index import SCORERS, LexicalIndex, corpus_files  # noqa: E402
+
+CORPUS_DIR = MODULE_DIR / "corpus" / "sample-documents"
+QRELS_PATH = Path(__file__).resolve().parent / "qrels.jsonl"
+VOCABULARY = 100_000
+
+
+def synthetic_passages(n_docs: int, seed: int):
+    """Yield n_docs (filename, content) passages in corpus order."""
+    lines = [line for fp in corpus_files(CORPUS_DIR)
+             for line in fp.read_text(encoding="utf-8").splitlines() if line.strip()]
+    rng = random.Random(seed)
+    for i in range(n_docs):
+        body = rng.choices(lines, k=rng.randint(1, 4))
+        rare = [f"w{int(rng.paretovariate(1.0)) % VOCABULARY}" for _ in range(rng.randint(0, 3))]
+        yield f"p-{i:07d}.md", "\n".join(body + [" ".join(rare)])
+
+
+def open_corpus(index_dir: Path, n_docs: int, seed: int) -> tuple[LexicalIndex, float]:
+    """The index for (n_docs, seed), built unless already in index_dir. Returns build seconds."""
+    path = index_dir / f"synthetic-{n_docs}.sqlite3"
+    fingerprint = f"synthetic-{n_docs}-{seed}"
+    if path.exists():
+        index = LexicalIndex.open(path)
+        if index.meta("corpus_fingerprint") == fingerprint:
+            return index, 0.0
+        index.close()
+    start = time.perf_counter()
+    index = LexicalIndex.build_from_documents(synthetic_passages(n_docs, seed), path, fingerprint)
+    return index, time.perf_counter() - start
+
+
+def time_ms(fn, queries: list[str], repeat: int) -> tuple[float, float]:
+    """Mean and max over queries of each query's best-of-`repeat` milliseconds."""
+    best = []
+    for q in queries:
+        runs = []
+        for _ in range(repeat):
+            start = time.perf_counter_ns()
+            fn(q)
+            runs.append(time.perf_counter_ns() - start)
+        best.append(min(runs) / 1e6)
+    return sum(best) / len(best), max(best)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Exhaustive scoring vs MaxScore top-k by corpus size")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1_000, 10_000, 100_000])
+    parser.add_argument("--k", type=int, default=10, help="Results per query (default: top_k in config)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per query (best kept)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--index-dir", type=Path, help="Keep built indexes here (default: temporary)")
+    args = parser.parse_args()
+
+    with open(QRELS_PATH, encoding="utf-8") as f:
+        queries = [json.loads(line)["query"] for line in f if line.strip()]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index_dir = args.index_dir or Path(tmp)
+        index_dir.mkdir(parents=True, exist_ok=True)
+        print(f"{len(queries)} queries, k={args.k}; milliseconds per query (mean / max)")
+        print(f"{'docs':>9s} {'build s':>8s} {'scoring':8s} {'exhaustive':>17s} {'top-k':>17s} {'speedup':>8s}")
+        for n_docs in args.sizes:
+            index, build_s = open_corpus(index_dir, n_docs, args.seed)
+            for scoring in SCORERS:
+                for q in queries:
+                    full = index.score_documents(q, include_unmatched=False, scoring=scoring)[: args.k]
+                    assert index.top_k(q, args.k, include_unmatched=False, scoring=scoring) == full, q
+                exhaustive = time_ms(lambda q: index.score_documents(
+                    q, include_unmatched=False, scoring=scoring)[: args.k], queries, args.repeat)
+                pruned = time_ms(lambda q: index.top_k(
+                    q, args.k, include_unmatched=False, scoring=scoring), queries, args.repeat)
+                print(f"{n_docs:>9d} {build_s:>8.1f} {scoring:8s} "
+                      f"{exhaustive[0]:>8.2f} / {exhaustive[1]:>6.1f} {pruned[0]:>8.2f} / {pruned[1]:>6.1f} "
+                      f"{exhaustive[0] / pruned[0]:>7.1f}x")
+            index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -9,14 +9,14 @@ full evidence package. No embeddings, no vector DB, no external APIs, no LLM cal
 
 import argparse
 import json
-import os
-import re
 import uuid
 from datetime import datetime, timezone
 from pathlib import Path
 
 import yaml
 
+from retrieval.lexical_index import SCORERS, LexicalIndex, parse_metadata, tokenize, unique_tokens  # noqa: F401
+
 # ---------------------------------------------------------------------------
 # Paths (relative to this script)
 # ---------------------------------------------------------------------------
@@ -25,6 +25,7 @@ MODULE_DIR = SCRIPT_DIR.parent
 CORPUS_DIR = MODULE_DIR / "corpus" / "sample-documents"
 CONFIG_DIR = MODULE_DIR / "config"
 OUTPUT_DIR = MODULE_DIR / "evidence" / "samples" / "sample-001"
+INDEX_PATH = MODULE_DIR / "corpus" / ".index" / "lexical.sqlite3"
 
 # ---------------------------------------------------------------------------
 # Config loader — reads policy-constraints.yaml for retrieval/grounding params
@@ -36,28 +37,15 @@ def load_config(config_dir: Path) -> dict:
         return yaml.safe_load(f)
 
 # ---------------------------------------------------------------------------
-# Tokeniser (deliberately simple — lowercase + split on non-alpha)
+# Tokeniser (deliberately simple — lowercase + split on non-alpha) and
+# metadata parser live in retrieval/lexical_index.py, shared with the index
 # ---------------------------------------------------------------------------
 
-def tokenize(text: str) -> list[str]:
-    return [t for t in re.split(r"[^a-z0-9]+", text.lower()) if t]
-
-
-def unique_tokens(text: str) -> set[str]:
-    return set(tokenize(text))
-
 # ---------------------------------------------------------------------------
-# Corpus loader
+# Corpus loader — full scan, used with --no-index and as the reference the
+# index must reproduce
 # ---------------------------------------------------------------------------
 
-def parse_metadata(content: str) -> dict:
-    """Extract **key:** value metadata fields from document content."""
-    meta = {}
-    for match in re.finditer(r"\*\*(\w+):\*\*\s*(.+)", content):
-        meta[match.group(1).strip()] = match.group(2).strip()
-    return meta
-
-
 def load_corpus(corpus_dir: Path) -> list[dict]:
     docs = []
     for fp in sorted(corpus_dir.glob("doc-*.md")):
@@ -73,7 +61,8 @@ def load_corpus(corpus_dir: Path) -> list[dict]:
     return docs
 
 # ---------------------------------------------------------------------------
-# Scoring — token-overlap (Jaccard-like)
+# Scoring — token-overlap (Jaccard-like). LexicalIndex.score_documents
+# returns the same scores from postings, without tokenizing the corpus.
 # ---------------------------------------------------------------------------
 
 def score_documents(query: str, docs: list[dict]) -> list[dict]:
@@ -87,10 +76,23 @@ def score_documents(query: str, docs: list[dict]) -> list[dict]:
     scored.sort(key=lambda d: d["score"], reverse=True)
     return scored
 
+
+def overlap(doc: dict) -> float:
+    """Query-term coverage of a scored doc, whichever scorer ranked it."""
+    return doc.get("overlap", doc["score"])
+
 # ---------------------------------------------------------------------------
-# Snippet extractor — finds the best paragraph containing query tokens
+# Snippet extractor — finds the best paragraph containing query tokens.
+# LexicalIndex.best_paragraph finds the same paragraph from paragraph
+# postings built at ingest; only truncate_snippet runs per query.
 # ---------------------------------------------------------------------------
 
+def truncate_snippet(text: str, max_len: int = 300) -> str:
+    if len(text) > max_len:
+        text = text[:max_len].rsplit(" ", 1)[0] + "…"
+    return text
+
+
 def extract_snippet(content: str, query_tokens: set[str], max_len: int = 300) -> str:
     paragraphs = [p.strip() for p in content.split("\n\n") if p.strip()]
     best, best_score = "", 0
@@ -100,9 +102,7 @@ def extract_snippet(content: str, query_tokens: set[str], max_len: int = 300) ->
         if overlap > best_score:
             best_score = overlap
             best = para
-    if len(best) > max_len:
-        best = best[:max_len].rsplit(" ", 1)[0] + "…"
-    return best
+    return truncate_snippet(best, max_len)
 
 # ---------------------------------------------------------------------------
 # Response builders
@@ -147,7 +147,10 @@ def build_user_response(trace_id: str, query: str, top_docs: list[dict],
         }
 
     for idx, doc in enumerate(top_docs, start=1):
-        snippet = extract_snippet(doc["content"], query_tokens)
+        if "paragraph" in doc:
+            snippet = truncate_snippet(doc["paragraph"])
+        else:
+            snippet = extract_snippet(doc["content"], query_tokens)
         citations.append({
             "citation_id": idx,
             "source_id": doc["doc_id"],
@@ -176,17 +179,22 @@ def build_user_response(trace_id: str, query: str, top_docs: list[dict],
 
 def build_auditor_response(trace_id: str, query: str, scored: list[dict],
                            top_k: int, similarity_threshold: float,
-                           grounding_status: str) -> dict:
-    above = [d for d in scored if d["score"] >= similarity_threshold]
+                           grounding_status: str, total_documents: int | None = None,
+                           passages_above_threshold: int | None = None) -> dict:
+    # When scored holds only the top k, the caller passes the corpus-wide
+    # count of docs above threshold (LexicalIndex.count_at_least).
+    above = [d for d in scored if overlap(d) >= similarity_threshold]
+    if passages_above_threshold is None:
+        passages_above_threshold = len(above)
     refusal_code = "INSUFFICIENT_GROUNDING" if grounding_status == "REFUSED" else None
     return {
         "trace_id": trace_id,
         "timestamp": datetime.now(timezone.utc).isoformat(),
         "corpus_release_id": "sample-docs-v1",
         "retrieval": {
-            "total_documents": len(scored),
+            "total_documents": len(scored) if total_documents is None else total_documents,
             "passages_retrieved": top_k,
-            "passages_above_threshold": len(above),
+            "passages_above_threshold": passages_above_threshold,
             "similarity_threshold": similarity_threshold,
             "top_scores": [
                 {"doc_id": d["doc_id"], "score": d["score"]}
@@ -206,13 +214,14 @@ def build_auditor_response(trace_id: str, query: str, scored: list[dict],
 # Trace builder
 # ---------------------------------------------------------------------------
 
-def build_trace(trace_id: str, query: str, scored: list[dict]) -> dict:
+def build_trace(trace_id: str, query: str, scored: list[dict],
+                total_documents: int | None = None) -> dict:
     return {
         "trace_id": trace_id,
         "run_timestamp": datetime.now(timezone.utc).isoformat(),
         "query": query,
         "corpus_dir": str(CORPUS_DIR),
-        "total_documents_loaded": len(scored),
+        "total_documents_loaded": len(scored) if total_documents is None else total_documents,
         "scores": [
             {"doc_id": d["doc_id"], "score": d["score"],
              "matched_tokens": d["matched_tokens"]}
@@ -277,23 +286,55 @@ def main():
     config_top_k = config.get("retrieval", {}).get("top_k", 10)
     similarity_threshold = config.get("retrieval", {}).get("similarity_threshold", 0.75)
     min_supporting = config.get("grounding", {}).get("min_supporting_passages", 1)
+    config_scoring = config.get("retrieval", {}).get("scoring", "overlap")
+    bm25_params = config.get("retrieval", {}).get("bm25", {})
 
     parser = argparse.ArgumentParser(description="Minimal lexical RAG demo")
     parser.add_argument("--query", required=True, help="Query string")
     parser.add_argument("--top-k", type=int, default=config_top_k,
                         help=f"Number of top docs (default: {config_top_k} from config)")
+    parser.add_argument("--index", type=Path, default=INDEX_PATH,
+                        help="Inverted index file; built or refreshed from the corpus as needed")
+    parser.add_argument("--no-index", action="store_true",
+                        help="Score by reading and tokenizing every document (reference path)")
+    parser.add_argument("--scoring", choices=SCORERS, default=config_scoring,
+                        help=f"Ranking function (default: {config_scoring} from config); "
+                             "the threshold always applies to query-term overlap")
+    parser.add_argument("--exhaustive", action="store_true",
+                        help="Score every document and record all scores in the trace, "
+                             "instead of the pruned top-k search")
     args = parser.parse_args()
+    if args.no_index and args.scoring != "overlap":
+        parser.error("--no-index supports --scoring overlap only")
 
     trace_id = str(uuid.uuid4())
     query_tokens = unique_tokens(args.query)
 
     # Load & score
-    docs = load_corpus(CORPUS_DIR)
-    scored = score_documents(args.query, docs)
-    top_docs = scored[: args.top_k]
-
-    # Filter by similarity threshold and determine grounding
-    docs_above_threshold = [d for d in top_docs if d["score"] >= similarity_threshold]
+    n_above = None
+    if args.no_index:
+        docs = load_corpus(CORPUS_DIR)
+        n_docs = len(docs)
+        scored = score_documents(args.query, docs)
+        top_docs = scored[: args.top_k]
+    else:
+        index = LexicalIndex.open_or_build(CORPUS_DIR, args.index)
+        n_docs = index.document_count()
+        scoring = dict(scoring=args.scoring, k1=bm25_params.get("k1", 1.2), b=bm25_params.get("b", 0.75))
+        if args.exhaustive:
+            scored = index.score_documents(args.query, **scoring)
+        else:
+            # Same top_k as the exhaustive ranking; the trace covers these only.
+            scored = index.top_k(args.query, args.top_k, **scoring)
+            n_above = index.count_at_least(args.query, similarity_threshold)
+        top_docs = scored[: args.top_k]
+        for doc in top_docs:
+            doc["paragraph"] = index.best_paragraph(doc["doc_ord"], query_tokens)
+        index.close()
+
+    # Filter by similarity threshold and determine grounding. BM25 scores are
+    # unbounded, so the threshold is applied to query-term overlap.
+    docs_above_threshold = [d for d in top_docs if overlap(d) >= similarity_threshold]
     grounding_status = determine_grounding(docs_above_threshold, min_supporting)
 
     # Build responses
@@ -301,8 +342,8 @@ def main():
                                     query_tokens, grounding_status)
     auditor_resp = build_auditor_response(trace_id, args.query, scored,
                                           args.top_k, similarity_threshold,
-                                          grounding_status)
-    trace = build_trace(trace_id, args.query, scored)
+                                          grounding_status, n_docs, n_above)
+    trace = build_trace(trace_id, args.query, scored, n_docs)
     evidence_md = build_evidence_md(args.query, user_resp, auditor_resp, trace)
 
     # Write outputs
@@ -319,11 +360,11 @@ def main():
     # Console summary
     print(f"Trace ID:  {trace_id}")
     print(f"Query:     {args.query}")
-    print(f"Corpus:    {len(docs)} documents loaded")
-    print(f"Config:    top_k={args.top_k}, threshold={similarity_threshold}")
+    print(f"Corpus:    {n_docs} documents loaded")
+    print(f"Config:    top_k={args.top_k}, threshold={similarity_threshold}, scoring={args.scoring}")
     print(f"Top {args.top_k}:")
     for d in top_docs:
-        marker = " [above]" if d["score"] >= similarity_threshold else " [below]"
+        marker = " [above]" if overlap(d) >= similarity_threshold else " [below]"
         print(f"  {d['doc_id']:40s}  score={d['score']}{marker}")
     print(f"\nAbove threshold: {len(docs_above_threshold)}/{len(top_docs)}")
     print(f"Grounding: {user_resp['grounding_status']}")
@@ -0,0 +1,774 @@
+"""
+lexical_index.py — Persistent inverted index for minirag lexical retrieval.
+
+Scoring every document means tokenizing every document on every query,
+so query latency grows with total corpus bytes. This index tokenizes
+each document once, at build time, into a SQLite file:
+
+    docs      one row per document: ordinal, doc_id, filename, metadata,
+              distinct-token count, token count, content
+    manifest  (filename, doc_ord, size, mtime_ns, content_hash) — what each
+              document was indexed from
+    postings  (term, doc_ord, tf) — one row per distinct term per document
+    terms     (term, df, max_tf, min_length) — document frequency of every
+              term, and its largest tf and shortest document, which bound
+              the term's BM25 contribution
+    paragraphs
+              (doc_ord, para_no, start, end) — character offsets of each
+              non-blank paragraph, as minirag.extract_snippet splits them
+              (on blank lines, stripped)
+    para_postings
+              (term, doc_ord, para_no) — which paragraphs contain each term
+    meta      format version, corpus fingerprint, document count, total
+              and average document length
+
+A query looks up the postings of its own distinct tokens only. Two
+scorers are available:
+
+    overlap   minirag.score_documents, exactly: len(query tokens ∩ doc
+              tokens) / len(query tokens)
+    bm25      Okapi BM25 over the query's distinct tokens, from the stored
+              tf, df and document lengths: sum over terms of
+              idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len / avg_len)),
+              idf = ln(1 + (N - df + 0.5) / (df + 0.5))
+
+Scores are rounded to 4 places and ordered descending, ties in corpus
+(filename) order. Every result also carries "overlap", the query-term
+coverage, which grounding thresholds apply to under either scorer.
+
+score_documents() scores every document that shares a term with the
+query. top_k() returns the same first k results with MaxScore dynamic
+pruning: query terms are ordered by their score upper bound, and once
+the k-th best score reaches the summed bounds of the weakest terms,
+those terms stop producing candidates — their postings are no longer
+read, and a document is only probed for them while it can still enter
+the top k. Common terms are the weakest, so their long postings lists
+are the ones skipped.
+
+best_paragraph() picks a document's snippet paragraph from the paragraph
+postings of the query's terms — the first paragraph with the most
+distinct query terms, exactly as extract_snippet scans for it — and
+slices it out of the stored content by offset. No paragraph is split or
+tokenized at query time.
+
+The index is updated in place, not rebuilt, when the corpus changes.
+update() stats every file against the manifest. A file whose size
+and mtime match is skipped unread. Otherwise it is hashed, and only
+added, changed or deleted content is re-tokenized: its postings are
+deleted and reinserted, and the df counts adjusted. The max_tf/min_length
+bounds are only ever widened, so after deletions they stay valid upper
+bounds. Ordinals are spaced ORD_GAP apart in filename order, so a new
+file takes a free ordinal between its neighbours and doc_ord order stays
+corpus order. Only when a gap is used up does the index fall back to a
+full rebuild.
+
+Build, update or inspect from src/:
+    python -m retrieval.lexical_index build
+    python -m retrieval.lexical_index update
+    python -m retrieval.lexical_index stats
+"""
+
+import argparse
+import hashlib
+import heapq
+import math
+import os
+import re
+import sqlite3
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Iterable
+
+FORMAT_VERSION = "5"
+
+ORD_GAP = 1 << 20
+
+SCORERS = ("overlap", "bm25")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS docs (
+    doc_ord        INTEGER PRIMARY KEY,
+    doc_id         TEXT NOT NULL,
+    filename       TEXT NOT NULL UNIQUE,
+    collection     TEXT,
+    effective_date TEXT,
+    n_unique       INTEGER NOT NULL,
+    length         INTEGER NOT NULL,
+    content        TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS manifest (
+    filename     TEXT PRIMARY KEY,
+    doc_ord      INTEGER NOT NULL,
+    size         INTEGER,
+    mtime_ns     INTEGER,
+    content_hash TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS postings (
+    term    TEXT NOT NULL,
+    doc_ord INTEGER NOT NULL,
+    tf      INTEGER NOT NULL,
+    PRIMARY KEY (term, doc_ord)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS paragraphs (
+    doc_ord INTEGER NOT NULL,
+    para_no INTEGER NOT NULL,
+    start   INTEGER NOT NULL,
+    "end"   INTEGER NOT NULL,
+    PRIMARY KEY (doc_ord, para_no)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS para_postings (
+    term    TEXT NOT NULL,
+    doc_ord INTEGER NOT NULL,
+    para_no INTEGER NOT NULL,
+    PRIMARY KEY (term, doc_ord, para_no)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS terms (
+    term       TEXT PRIMARY KEY,
+    df         INTEGER NOT NULL,
+    max_tf     INTEGER NOT NULL,
+    min_length INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+# ---------------------------------------------------------------------------
+# Tokeniser and metadata — shared with minirag.py so the index and the
+# reference scorer cannot drift apart
+# ---------------------------------------------------------------------------
+
+def tokenize(text: str) -> list[str]:
+    return [t for t in re.split(r"[^a-z0-9]+", text.lower()) if t]
+
+
+def unique_tokens(text: str) -> set[str]:
+    return set(tokenize(text))
+
+
+def parse_metadata(content: str) -> dict:
+    """Extract **key:** value metadata fields from document content."""
+    meta = {}
+    for match in re.finditer(r"\*\*(\w+):\*\*\s*(.+)", content):
+        meta[match.group(1).strip()] = match.group(2).strip()
+    return meta
+
+
+def _is_corpus_file(name: str) -> bool:
+    return name.startswith("doc-") and name.endswith(".md")
+
+
+def scan_corpus(corpus_dir: Path) -> dict[str, os.stat_result]:
+    """stat() of every doc-*.md file in corpus_dir, by filename in corpus order."""
+    with os.scandir(corpus_dir) as entries:
+        found = {e.name: e.stat() for e in entries if _is_corpus_file(e.name) and e.is_file()}
+    return dict(sorted(found.items()))
+
+
+def corpus_files(corpus_dir: Path) -> list[Path]:
+    """The documents minirag indexes, in corpus order."""
+    return [Path(corpus_dir) / name for name in scan_corpus(corpus_dir)]
+
+
+def _fingerprint(stats: dict[str, os.stat_result]) -> str:
+    listing = "".join(f"{name}\0{st.st_size}\0{st.st_mtime_ns}\n" for name, st in stats.items())
+    return hashlib.sha256(listing.encode()).hexdigest()[:16]
+
+
+def corpus_fingerprint(corpus_dir: Path) -> str:
+    """Hash of every document's name, size and mtime (stat only, no reads)."""
+    return _fingerprint(scan_corpus(corpus_dir))
+
+# ---------------------------------------------------------------------------
+# Index
+# ---------------------------------------------------------------------------
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def _doc_row(doc_ord: int, filename: str, content: str) -> tuple[tuple, dict[str, int]]:
+    meta = parse_metadata(content)
+    tokens = tokenize(content)
+    tf: dict[str, int] = defaultdict(int)
+    for token in tokens:
+        tf[token] += 1
+    row = (doc_ord, meta.get("doc_id", Path(filename).stem), filename, meta.get("collection"),
+           meta.get("effective_date"), len(tf), len(tokens), content)
+    return row, tf
+
+
+def split_paragraphs(content: str) -> list[tuple[int, int]]:
+    """
+    (start, end) offsets of the paragraphs of content: the non-blank
+    pieces between blank lines ("\n\n"), stripped. content[start:end]
+    is each paragraph of minirag.extract_snippet, in the same order.
+    """
+    spans, pos = [], 0
+    for piece in content.split("\n\n"):
+        stripped = piece.strip()
+        if stripped:
+            start = pos + len(piece) - len(piece.lstrip())
+            spans.append((start, start + len(stripped)))
+        pos += len(piece) + 2
+    return spans
+
+
+def _insert_paragraphs(conn: sqlite3.Connection, doc_ord: int, content: str) -> None:
+    spans = split_paragraphs(content)
+    conn.executemany("INSERT INTO paragraphs VALUES (?, ?, ?, ?)",
+                     ((doc_ord, para_no, start, end) for para_no, (start, end) in enumerate(spans)))
+    conn.executemany("INSERT INTO para_postings VALUES (?, ?, ?)",
+                     ((term, doc_ord, para_no) for para_no, (start, end) in enumerate(spans)
+                      for term in unique_tokens(content[start:end])))
+
+
+def _write_corpus_stats(conn: sqlite3.Connection, n: int, total: int) -> None:
+    """Store N and total and average document length for BM25."""
+    conn.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", [
+        ("doc_count", str(n)),
+        ("total_length", str(total)),
+        ("avg_length", repr(total / n if n else 0.0)),
+    ])
+
+
+class _NoFreeOrdinal(Exception):
+    """No ordinal left between a new file's neighbours; rebuild instead."""
+
+
+def bm25_idf(n_docs: int, df: int) -> float:
+    return math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+
+
+class LexicalIndex:
+    """A built index, opened read-mostly. Use build() or open()."""
+
+    def __init__(self, conn: sqlite3.Connection, path: Path):
+        self.conn = conn
+        self.path = Path(path)
+
+    # -- lifecycle ----------------------------------------------------------
+
+    @classmethod
+    def build(cls, corpus_dir: Path, path: Path) -> "LexicalIndex":
+        """Tokenize every document in corpus_dir into a new index at path."""
+        stats = scan_corpus(corpus_dir)  # before reading: a later write shows as a change
+        documents = ((name, (Path(corpus_dir) / name).read_text(encoding="utf-8"), st.st_size, st.st_mtime_ns)
+                     for name, st in stats.items())
+        return cls.build_from_documents(documents, path, _fingerprint(stats))
+
+    @classmethod
+    def build_from_documents(cls, documents: Iterable[tuple], path: Path,
+                             fingerprint: str = "") -> "LexicalIndex":
+        """
+        Build an index at path from (filename, content[, size, mtime_ns])
+        tuples, which must come in corpus (filename) order. build() feeds
+        it the corpus files; benchmarks feed it generated documents
+        without touching disk.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.unlink(missing_ok=True)
+
+        conn = sqlite3.connect(tmp)
+        conn.executescript(SCHEMA)
+        with conn:
+            for i, (filename, content, *stat) in enumerate(documents):
+                doc_ord = i * ORD_GAP
+                row, tf = _doc_row(doc_ord, filename, content)
+                conn.execute("INSERT INTO docs VALUES (?, ?, ?, ?, ?, ?, ?, ?)", row)
+                size, mtime_ns = stat or (None, None)
+                conn.execute("INSERT INTO manifest VALUES (?, ?, ?, ?, ?)",
+                             (filename, doc_ord, size, mtime_ns, content_hash(content)))
+                conn.executemany("INSERT INTO postings VALUES (?, ?, ?)",
+                                 ((term, doc_ord, n) for term, n in tf.items()))
+                _insert_paragraphs(conn, doc_ord, content)
+            conn.execute(
+                "INSERT INTO terms SELECT p.term, COUNT(*), MAX(p.tf), MIN(d.length) "
+                "FROM postings p JOIN docs d ON d.doc_ord = p.doc_ord GROUP BY p.term")
+            conn.executemany("INSERT INTO meta VALUES (?, ?)", [
+                ("format_version", FORMAT_VERSION),
+                ("corpus_fingerprint", fingerprint),
+            ])
+            _write_corpus_stats(conn, *conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(length), 0) FROM docs").fetchone())
+        conn.close()
+        tmp.replace(path)
+        return cls.open(path)
+
+    @classmethod
+    def open(cls, path: Path) -> "LexicalIndex":
+        """Open an existing index. Raises FileNotFoundError if missing."""
+        path = Path(path)
+        if not path.exists():
+            raise FileNotFoundError(path)
+        return cls(sqlite3.connect(path), path)
+
+    @classmethod
+    def open_or_build(cls, corpus_dir: Path, path: Path) -> "LexicalIndex":
+        """
+        Open the index at path and bring it up to date with corpus_dir:
+        unchanged if the corpus fingerprint matches, otherwise updated in
+        place. Built from scratch when missing, from an older format, or
+        when update() runs out of ordinals.
+        """
+        try:
+            index = cls.open(path)
+        except FileNotFoundError:
+            return cls.build(corpus_dir, path)
+        if index.meta("format_version") != FORMAT_VERSION:
+            index.close()
+            return cls.build(corpus_dir, path)
+        try:
+            index.update(corpus_dir)
+        except _NoFreeOrdinal:
+            index.close()
+            return cls.build(corpus_dir, path)
+        return index
+
+    def update(self, corpus_dir: Path, filenames: Iterable[str] | None = None) -> dict[str, int]:
+        """
+        Apply corpus_dir's changes since the last build or update, in one
+        transaction. Returns counts of added, changed, deleted, touched
+        (new mtime, same content) and unchanged files. If the corpus
+        fingerprint still matches, nothing is compared or read.
+
+        With filenames, only those files are checked (a missing one counts
+        as deleted) and nothing else is stat'ed — for callers that know
+        what they wrote. The stored fingerprint is left as is, so the next
+        full update() re-verifies the whole corpus.
+
+        Raises _NoFreeOrdinal (after rolling back) if a new file has no
+        free ordinal between its neighbours; open_or_build() rebuilds then.
+        """
+        corpus_dir = Path(corpus_dir)
+        counts = dict.fromkeys(("added", "changed", "deleted", "touched", "unchanged"), 0)
+        query = "SELECT filename, doc_ord, size, mtime_ns, content_hash FROM manifest"
+        # Stat before reading: a file written meanwhile shows as changed next time.
+        if filenames is None:
+            stats = scan_corpus(corpus_dir)
+            fingerprint = _fingerprint(stats)
+            if fingerprint == self.meta("corpus_fingerprint"):
+                counts["unchanged"] = len(stats)
+                return counts
+            manifest = {row[0]: row[1:] for row in self.conn.execute(query)}
+        else:
+            names = sorted({Path(f).name for f in filenames if _is_corpus_file(Path(f).name)})
+            stats = {}
+            for name in names:
+                try:
+                    stats[name] = (corpus_dir / name).stat()
+                except FileNotFoundError:
+                    pass
+            fingerprint = None
+            placeholders = ",".join("?" * len(names))
+            manifest = {row[0]: row[1:] for row in self.conn.execute(
+                f"{query} WHERE filename IN ({placeholders})", names)}
+        n_docs = int(self.meta("doc_count") or 0)
+        total_length = int(self.meta("total_length") or 0)
+
+        with self.conn:
+            for filename in sorted(manifest.keys() - stats.keys()):
+                total_length -= self._remove(manifest[filename][0])
+                n_docs -= 1
+                counts["deleted"] += 1
+            for filename, st in stats.items():
+                entry = manifest.get(filename)
+                if entry is not None and entry[1:3] == (st.st_size, st.st_mtime_ns):
+                    counts["unchanged"] += 1
+                    continue
+                content = (corpus_dir / filename).read_text(encoding="utf-8")
+                if entry is not None and entry[3] == content_hash(content):
+                    self.conn.execute("UPDATE manifest SET size = ?, mtime_ns = ? WHERE filename = ?",
+                                      (st.st_size, st.st_mtime_ns, filename))
+                    counts["touched"] += 1
+                    continue
+                if entry is not None:
+                    doc_ord = entry[0]
+                    total_length -= self._remove(doc_ord)
+                    counts["changed"] += 1
+                else:
+                    doc_ord = self._free_ordinal(filename)
+                    n_docs += 1
+                    counts["added"] += 1
+                total_length += self._insert(doc_ord, filename, content, st.st_size, st.st_mtime_ns)
+            _write_corpus_stats(self.conn, n_docs, total_length)
+            if fingerprint is not None:
+                self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('corpus_fingerprint', ?)",
+                                  (fingerprint,))
+        return counts
+
+    def _free_ordinal(self, filename: str) -> int:
+        """An unused doc_ord between filename's neighbours in corpus order."""
+        before = self.conn.execute(
+            "SELECT doc_ord FROM manifest WHERE filename < ? ORDER BY filename DESC LIMIT 1", (filename,)).fetchone()
+        after = self.conn.execute(
+            "SELECT doc_ord FROM manifest WHERE filename > ? ORDER BY filename LIMIT 1", (filename,)).fetchone()
+        before, after = (row[0] if row else None for row in (before, after))
+        if after is None:
+            return 0 if before is None else before + ORD_GAP
+        if before is None:
+            before = after - 2 * ORD_GAP
+        doc_ord = (before + after) // 2
+        if doc_ord == before:
+            raise _NoFreeOrdinal(filename)
+        return doc_ord
+
+    def _insert(self, doc_ord: int, filename: str, content: str, size: int, mtime_ns: int) -> int:
+        """Index one document; returns its token count."""
+        row, tf = _doc_row(doc_ord, filename, content)
+        length = row[6]
+        self.conn.execute("INSERT INTO docs VALUES (?, ?, ?, ?, ?, ?, ?, ?)", row)
+        self.conn.execute("INSERT OR REPLACE INTO manifest VALUES (?, ?, ?, ?, ?)",
+                          (filename, doc_ord, size, mtime_ns, content_hash(content)))
+        self.conn.executemany("INSERT INTO postings VALUES (?, ?, ?)",
+                              ((term, doc_ord, n) for term, n in tf.items()))
+        self.conn.executemany(
+            "INSERT INTO terms VALUES (?, 1, ?, ?) ON CONFLICT (term) DO UPDATE SET "
+            "df = df + 1, max_tf = MAX(max_tf, excluded.max_tf), "
+            "min_length = MIN(min_length, excluded.min_length)",
+            ((term, n, length) for term, n in tf.items()))
+        _insert_paragraphs(self.conn, doc_ord, content)
+        return length
+
+    def _remove(self, doc_ord: int) -> int:
+        """Unindex one document; returns its token count."""
+        filename, content, length = self.conn.execute(
+            "SELECT filename, content, length FROM docs WHERE doc_ord = ?", (doc_ord,)).fetchone()
+        terms = [(term,) for term in unique_tokens(content)]
+        self.conn.executemany(
+            "DELETE FROM postings WHERE term = ? AND doc_ord = ?", ((t, doc_ord) for (t,) in terms))
+        self.conn.executemany(
+            "DELETE FROM para_postings WHERE term = ? AND doc_ord = ?", ((t, doc_ord) for (t,) in terms))
+        self.conn.execute("DELETE FROM paragraphs WHERE doc_ord = ?", (doc_ord,))
+        self.conn.executemany("UPDATE terms SET df = df - 1 WHERE term = ?", terms)
+        self.conn.executemany("DELETE FROM terms WHERE term = ? AND df = 0", terms)
+        self.conn.execute("DELETE FROM docs WHERE doc_ord = ?", (doc_ord,))
+        self.conn.execute("DELETE FROM manifest WHERE filename = ?", (filename,))
+        return length
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def meta(self, key: str) -> str | None:
+        try:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        except sqlite3.DatabaseError:
+            return None
+        return row[0] if row else None
+
+    # -- queries ------------------------------------------------------------
+
+    def document_count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+    def score_documents(self, query: str, include_unmatched: bool = True,
+                        scoring: str = "overlap", k1: float = 1.2, b: float = 0.75) -> list[dict]:
+        """
+        Score documents against the query.
+
+        scoring="overlap" is identical to minirag.score_documents;
+        scoring="bm25" ranks by BM25 with parameters k1 and b. Only the
+        postings of the query's distinct tokens are read. With
+        include_unmatched=True, documents sharing no token with the query
+        follow with score 0.0 (metadata only), as the full scan lists them.
+        Result dicts carry doc_id, filename, collection, effective_date,
+        score, overlap, matched_tokens and doc_ord — not content; see
+        content().
+        """
+        if scoring not in SCORERS:
+            raise ValueError(f"Unknown scoring {scoring!r}; expected one of {SCORERS}")
+        q_tokens = unique_tokens(query)
+        matched: dict[int, list[str]] = defaultdict(list)
+        bm25: dict[int, float] = defaultdict(float)
+        docs: dict[int, tuple] = {}
+        if q_tokens:
+            terms = sorted(q_tokens)
+            placeholders = ",".join("?" * len(terms))
+            idf = {}
+            if scoring == "bm25":
+                n_docs = int(self.meta("doc_count") or 0)
+                avg_length = float(self.meta("avg_length") or 0.0) or 1.0
+                idf = {term: bm25_idf(n_docs, df) for term, df in self.conn.execute(
+                    f"SELECT term, df FROM terms WHERE term IN ({placeholders})", terms)}
+            rows = self.conn.execute(
+                "SELECT p.term, p.tf, d.length, d.doc_ord, d.doc_id, d.filename, d.collection, "
+                "d.effective_date FROM postings p JOIN docs d ON d.doc_ord = p.doc_ord "
+                f"WHERE p.term IN ({placeholders}) ORDER BY p.term, p.doc_ord",
+                terms,
+            )
+            for term, tf, length, doc_ord, *doc in rows:
+                matched[doc_ord].append(term)
+                docs[doc_ord] = doc
+                if idf:
+                    norm = k1 * (1 - b + b * length / avg_length)
+                    bm25[doc_ord] += idf[term] * tf * (k1 + 1) / (tf + norm)
+
+        n_query = len(q_tokens)
+        scored = []
+        for doc_ord, terms in matched.items():
+            overlap = round(len(terms) / n_query, 4)
+            score = round(bm25[doc_ord], 4) if scoring == "bm25" else overlap
+            scored.append(self._result(doc_ord, *docs[doc_ord], score, overlap, sorted(terms)))
+        scored.sort(key=lambda d: (-d["score"], d["filename"]))
+
+        if include_unmatched:
+            rows = self.conn.execute(
+                "SELECT doc_ord, doc_id, filename, collection, effective_date FROM docs ORDER BY filename")
+            scored.extend(self._result(*row, 0.0, 0.0, []) for row in rows if row[0] not in matched)
+        return scored
+
+    def count_at_least(self, query: str, min_overlap: float) -> int:
+        """
+        Number of documents whose overlap with the query is >= min_overlap,
+        as score_documents() rounds it — without scoring them. One
+        GROUP BY over the query terms' postings; for callers of top_k()
+        that still need the corpus-wide count.
+        """
+        q_tokens = unique_tokens(query)
+        n_query = len(q_tokens)
+        if min_overlap <= 0:
+            return self.document_count()
+        min_terms = next((m for m in range(1, n_query + 1) if round(m / n_query, 4) >= min_overlap), None)
+        if min_terms is None:
+            return 0
+        terms = sorted(q_tokens)
+        placeholders = ",".join("?" * len(terms))
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM (SELECT doc_ord FROM postings "
+            f"WHERE term IN ({placeholders}) GROUP BY doc_ord HAVING COUNT(*) >= ?)",
+            (*terms, min_terms)).fetchone()[0]
+
+    def top_k(self, query: str, k: int, include_unmatched: bool = True,
+              scoring: str = "overlap", k1: float = 1.2, b: float = 0.75) -> list[dict]:
+        """
+        The first k results of score_documents(), found by MaxScore pruning
+        instead of scoring every matching document.
+
+        Postings lists are walked in doc_ord (corpus) order. A document
+        enters the top k only with a strictly higher rounded score than the
+        current k-th, so ties keep the earlier document, as the full sort
+        does. With include_unmatched=True, fewer than k matches are padded
+        with unmatched documents in corpus order, score 0.0.
+        """
+        if scoring not in SCORERS:
+            raise ValueError(f"Unknown scoring {scoring!r}; expected one of {SCORERS}")
+        q_tokens = unique_tokens(query)
+        top: list[tuple] = []  # min-heap of (score, -doc_ord, doc_ord, overlap, matched)
+        if q_tokens and k > 0:
+            top = self._max_score(sorted(q_tokens), k, scoring, k1, b)
+
+        top.sort(key=lambda entry: (-entry[0], entry[2]))
+        found = {entry[2]: entry for entry in top}
+        results = []
+        if found:
+            placeholders = ",".join("?" * len(found))
+            rows = {row[0]: row for row in self.conn.execute(
+                "SELECT doc_ord, doc_id, filename, collection, effective_date FROM docs "
+                f"WHERE doc_ord IN ({placeholders})", list(found))}
+            results = [self._result(*rows[doc_ord], score, overlap, matched)
+                       for score, _, doc_ord, overlap, matched in top]
+        if include_unmatched and len(results) < k:
+            rows = self.conn.execute(
+                "SELECT doc_ord, doc_id, filename, collection, effective_date FROM docs "
+                "ORDER BY filename LIMIT ?", (k + len(found),))
+            unmatched = (self._result(*row, 0.0, 0.0, []) for row in rows if row[0] not in found)
+            results.extend(unmatched)
+            del results[k:]
+        return results
+
+    def _max_score(self, terms: list[str], k: int, scoring: str, k1: float, b: float) -> list[tuple]:
+        n_query = len(terms)
+        bm25 = scoring == "bm25"
+        placeholders = ",".join("?" * n_query)
+        stats = self.conn.execute(
+            f"SELECT term, df, max_tf, min_length FROM terms WHERE term IN ({placeholders})", terms).fetchall()
+        if not stats:
+            return []
+        n_docs = int(self.meta("doc_count") or 0)
+        avg_length = float(self.meta("avg_length") or 0.0) or 1.0
+
+        def weight(idf: float, tf: int, length: int) -> float:
+            # Same expression as score_documents, so sums agree to the bit.
+            norm = k1 * (1 - b + b * length / avg_length)
+            return idf * tf * (k1 + 1) / (tf + norm)
+
+        # (upper bound, term, idf); weakest first, commonest first on ties.
+        bounded = []
+        for term, df, max_tf, min_length in stats:
+            idf = bm25_idf(n_docs, df)
+            upper = weight(idf, max_tf, min_length) if bm25 else 1 / n_query
+            bounded.append((upper, -df, term, idf))
+        bounded.sort()
+        prefix, total = [], 0.0
+        for upper, *_ in bounded:
+            total += upper
+            prefix.append(total)
+
+        def cannot_enter(bound: float) -> bool:
+            # Entry needs a rounded score strictly above the k-th best.
+            return len(top) == k and round(bound + 1e-9, 4) <= top[0][0]
+
+        def postings(term: str):
+            return self.conn.execute(
+                "SELECT p.doc_ord, p.tf, d.length FROM postings p JOIN docs d ON d.doc_ord = p.doc_ord "
+                "WHERE p.term = ? ORDER BY p.doc_ord", (term,))
+
+        top: list[tuple] = []
+        n_weak = 0  # bounded[:n_weak] are non-essential: probed, not walked
+        cursors = {i: postings(bounded[i][2]) for i in range(len(bounded))}
+        heads = []  # (doc_ord, i, tf, length) — next posting of each essential term
+        for i, cursor in cursors.items():
+            row = cursor.fetchone()
+            if row is not None:
+                heads.append((row[0], i, row[1], row[2]))
+        heapq.heapify(heads)
+
+        while heads and n_weak < len(bounded):
+            doc_ord = heads[0][0]
+            hits: dict[str, tuple[float, int]] = {}
+            length = 0
+            while heads and heads[0][0] == doc_ord:
+                _, i, tf, length = heapq.heappop(heads)
+                if i < n_weak:
+                    continue  # term turned non-essential; stop walking it
+                _, _, term, idf = bounded[i]
+                hits[term] = (idf, tf)
+                row = cursors[i].fetchone()
+                if row is not None:
+                    heapq.heappush(heads, (row[0], i, row[1], row[2]))
+            if not hits:
+                continue
+
+            partial = sum(weight(idf, tf, length) for idf, tf in hits.values()) if bm25 else len(hits) / n_query
+            remaining = prefix[n_weak - 1] if n_weak else 0.0
+            for i in range(n_weak - 1, -1, -1):
+                if cannot_enter(partial + remaining):
+                    break
+                upper, _, term, idf = bounded[i]
+                remaining -= upper
+                row = self.conn.execute(
+                    "SELECT tf FROM postings WHERE term = ? AND doc_ord = ?", (term, doc_ord)).fetchone()
+                if row is not None:
+                    hits[term] = (idf, row[0])
+                    partial += weight(idf, row[0], length) if bm25 else 1 / n_query
+            if cannot_enter(partial + remaining):
+                continue
+
+            overlap = round(len(hits) / n_query, 4)
+            if bm25:
+                total = 0.0
+                for term in sorted(hits):
+                    idf, tf = hits[term]
+                    total += weight(idf, tf, length)
+                score = round(total, 4)
+            else:
+                score = overlap
+            entry = (score, -doc_ord, doc_ord, overlap, sorted(hits))
+            if len(top) < k:
+                heapq.heappush(top, entry)
+            elif entry[:2] > top[0][:2]:
+                heapq.heapreplace(top, entry)
+            else:
+                continue
+            while n_weak < len(bounded) and cannot_enter(prefix[n_weak]):
+                cursors[n_weak].close()
+                n_weak += 1
+        return top
+
+    @staticmethod
+    def _result(doc_ord, doc_id, filename, collection, effective_date, score, overlap,
+                matched_tokens) -> dict:
+        return {
+            "doc_id": doc_id,
+            "filename": filename,
+            "collection": collection,
+            "effective_date": effective_date,
+            "score": score,
+            "overlap": overlap,
+            "matched_tokens": matched_tokens,
+            "doc_ord": doc_ord,
+        }
+
+    def content(self, doc_ord: int) -> str:
+        """Full text of one document, as indexed."""
+        return self.conn.execute("SELECT content FROM docs WHERE doc_ord = ?", (doc_ord,)).fetchone()[0]
+
+    def best_paragraph(self, doc_ord: int, query_tokens: set[str]) -> str:
+        """
+        The paragraph of the document sharing the most distinct tokens with
+        query_tokens, earliest on ties; "" if none shares any. Untruncated:
+        minirag.extract_snippet(content, query_tokens) is this paragraph
+        passed through truncate_snippet().
+        """
+        if not query_tokens:
+            return ""
+        terms = sorted(query_tokens)
+        placeholders = ",".join("?" * len(terms))
+        counts = self.conn.execute(
+            "SELECT para_no, COUNT(*) FROM para_postings "
+            f"WHERE term IN ({placeholders}) AND doc_ord = ? GROUP BY para_no",
+            (*terms, doc_ord)).fetchall()
+        if not counts:
+            return ""
+        para_no = min(counts, key=lambda row: (-row[1], row[0]))[0]
+        return self.conn.execute(
+            'SELECT substr(d.content, p.start + 1, p."end" - p.start) FROM paragraphs p '
+            "JOIN docs d ON d.doc_ord = p.doc_ord WHERE p.doc_ord = ? AND p.para_no = ?",
+            (doc_ord, para_no)).fetchone()[0]
+
+    def stats(self) -> dict:
+        docs, tokens = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(length), 0) FROM docs").fetchone()
+        terms = self.conn.execute("SELECT COUNT(*) FROM terms").fetchone()[0]
+        postings = self.conn.execute("SELECT COUNT(*) FROM postings").fetchone()[0]
+        paragraphs = self.conn.execute("SELECT COUNT(*) FROM paragraphs").fetchone()[0]
+        return {
+            "path": str(self.path),
+            "documents": docs,
+            "tokens": tokens,
+            "terms": terms,
+            "postings": postings,
+            "paragraphs": paragraphs,
+            "bytes": self.path.stat().st_size,
+            "avg_length": round(float(self.meta("avg_length") or 0.0), 2),
+            "corpus_fingerprint": self.meta("corpus_fingerprint"),
+        }
+
+
+def main() -> None:
+    module_dir = Path(__file__).resolve().parent.parent.parent
+    parser = argparse.ArgumentParser(description="Build or inspect the minirag lexical index")
+    parser.add_argument("command", choices=("build", "update", "stats"))
+    parser.add_argument("files", nargs="*", help="update: check only these corpus files")
+    parser.add_argument("--corpus-dir", type=Path, default=module_dir / "corpus" / "sample-documents")
+    parser.add_argument("--index", type=Path, default=module_dir / "corpus" / ".index" / "lexical.sqlite3")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        index = LexicalIndex.build(args.corpus_dir, args.index)
+    elif args.command == "update":
+        start = time.perf_counter()
+        index = LexicalIndex.open(args.index)
+        counts = None
+        if index.meta("format_version") == FORMAT_VERSION:
+            try:
+                counts = index.update(args.corpus_dir, args.files or None)
+            except _NoFreeOrdinal:
+                pass
+        if counts is None:
+            index.close()
+            index = LexicalIndex.build(args.corpus_dir, args.index)
+            counts = {"rebuilt": index.document_count()}
+        print(f"{'update':20s} {counts} in {(time.perf_counter() - start) * 1e3:.1f} ms")
+    else:
+        index = LexicalIndex.open(args.index)
+    for key, value in index.stats().items():
+        print(f"{key:20s} {value}")
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark: AuditSink sustained records/sec and backpressure.
+
+Writes the same classified results through AuditSink under each fsync
+policy, with and without gzip, and reports producer-side and end-to-end
+records/sec. A burst run with overflow="drop" and a small queue shows
+how many records are shed when producers outpace the disk. The
+synchronous baseline is json.dumps + write + fsync per record, which is
+what an in-line audit log would cost on the request path.
+
+Run from the module root:
+    python -m benchmarks.audit_sink --records 200000
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from itertools import cycle, islice
+
+from benchmarks.queries import ACCEPTANCE_QUERIES
+from src.audit import AuditSink
+from src.classifier import classify
+
+
+def synchronous(results: list, directory: str) -> float:
+    """Per-record json.dumps + write + fsync; returns records/sec."""
+    path = os.path.join(directory, "sync.jsonl")
+    start = time.perf_counter()
+    with open(path, "ab") as f:
+        for result in results:
+            f.write((json.dumps(result.to_dict()) + "\n").encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+    return len(results) / (time.perf_counter() - start)
+
+
+def buffered(results: list, directory: str, **options) -> tuple[float, float, int]:
+    """Returns (producer records/sec, end-to-end records/sec, dropped)."""
+    sink = AuditSink(directory, **options)
+    start = time.perf_counter()
+    for result in results:
+        sink.write(result)
+    produced = time.perf_counter() - start
+    sink.close()
+    total = time.perf_counter() - start
+    stats = sink.stats()
+    return len(results) / produced, stats.written / total, stats.dropped
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=100000,
+                        help="Records per run (default: 100000)")
+    parser.add_argument("--sync-records", type=int, default=2000,
+                        help="Records for the per-record fsync baseline (default: 2000)")
+    parser.add_argument("--batch-size", type=int, default=512)
+    args = parser.parse_args()
+
+    templates = [classify(q) for q in ACCEPTANCE_QUERIES]
+    results = list(islice(cycle(templates), args.records))
+
+    print(f"{args.records} records, batch_size={args.batch_size}")
+    print(f"{'mode':<28} {'producer/s':>12} {'written/s':>12} {'dropped':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        rate = synchronous(results[:args.sync_records], tmp)
+        print(f"{'sync write+fsync/record':<28} {rate:>12,.0f} {rate:>12,.0f} {0:>8}")
+
+        runs = [
+            ("fsync=never", dict(fsync="never")),
+            ("fsync=interval", dict(fsync="interval")),
+            ("fsync=batch", dict(fsync="batch")),
+            ("fsync=batch gzip", dict(fsync="batch", compress=True)),
+            ("burst drop, queue=1000", dict(fsync="batch", max_queue=1000,
+                                            overflow="drop")),
+        ]
+        for i, (label, options) in enumerate(runs):
+            produced, written, dropped = buffered(
+                results, os.path.join(tmp, str(i)),
+                batch_size=args.batch_size, **options,
+            )
+            print(f"{label:<28} {produced:>12,.0f} {written:>12,.0f} {dropped:>8}")
+
+
+if __name__ == "__main__":
+    main()
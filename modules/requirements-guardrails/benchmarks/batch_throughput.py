@@ -0,0 +1,43 @@
+"""
+Benchmark: classify_many() throughput by worker count.
+
+Runs the same query stream through classify_many() at each worker
+count and reports queries/sec, so the process-pool fan-out can be sized
+for re-scoring the historical query log.
+
+Run from the module root:
+    python -m benchmarks.batch_throughput --queries 50000 --workers 1 2 4 8
+"""
+
+import argparse
+import os
+import time
+from itertools import cycle, islice
+
+from benchmarks.queries import ACCEPTANCE_QUERIES as QUERIES
+from src.classifier import classify_many
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--queries", type=int, default=20000,
+                        help="Number of queries per run (default: 20000)")
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    parser.add_argument("--chunksize", type=int, default=256)
+    args = parser.parse_args()
+
+    print(f"{args.queries} queries, chunksize={args.chunksize}, "
+          f"cpu_count={os.cpu_count()}")
+    print(f"{'workers':>8} {'seconds':>8} {'queries/sec':>12} {'per worker':>11}")
+    for workers in args.workers:
+        stream = islice(cycle(QUERIES), args.queries)
+        start = time.perf_counter()
+        count = sum(1 for _ in classify_many(stream, workers, args.chunksize))
+        elapsed = time.perf_counter() - start
+        rate = count / elapsed
+        print(f"{workers:>8} {elapsed:>8.2f} {rate:>12,.0f} {rate / workers:>11,.0f}")
+
+
+if __name__ == "__main__":
+    main()
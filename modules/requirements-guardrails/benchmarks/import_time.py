@@ -0,0 +1,63 @@
+"""
+Benchmark: cold-start import time with and without the ruleset artifact.
+
+Each run starts a fresh interpreter and times `import src.classifier`,
+so every run pays the full cold-start cost an autoscaled or serverless
+worker sees. The artifact is built to a temporary path first; the YAML
+runs disable it via GUARDRAILS_RULESET_ARTIFACT="".
+
+Run from the module root:
+    python -m benchmarks.import_time --runs 20
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from src.rules.artifact import write_artifact
+from src.rules.registry import load_ruleset
+
+_PROBE = (
+    "import time; t = time.perf_counter(); import src.classifier; "
+    "print(time.perf_counter() - t)"
+)
+
+
+def time_imports(runs: int, artifact: str) -> list[float]:
+    """Import src.classifier in `runs` fresh interpreters; seconds each."""
+    env = dict(os.environ, GUARDRAILS_RULESET_ARTIFACT=artifact)
+    return [
+        float(subprocess.run([sys.executable, "-c", _PROBE], env=env, check=True,
+                             capture_output=True, text=True).stdout)
+        for _ in range(runs)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=20,
+                        help="Fresh interpreters per mode (default: 20)")
+    args = parser.parse_args()
+
+    config_dir = Path(__file__).parent.parent / "src" / "config"
+    with tempfile.TemporaryDirectory() as tmp:
+        artifact = str(Path(tmp) / "ruleset.compiled")
+        write_artifact(load_ruleset(config_dir), Path(artifact))
+
+        print(f"{args.runs} cold imports of src.classifier per mode")
+        print(f"{'mode':<10} {'median ms':>10} {'min ms':>8} {'max ms':>8}")
+        medians = {}
+        for mode, path in (("yaml", ""), ("artifact", artifact)):
+            times = time_imports(args.runs, path)
+            medians[mode] = statistics.median(times)
+            print(f"{mode:<10} {medians[mode] * 1e3:>10.1f} "
+                  f"{min(times) * 1e3:>8.1f} {max(times) * 1e3:>8.1f}")
+        print(f"speedup: {medians['yaml'] / medians['artifact']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,582 @@
+"""
+Rule-cost profiler: what each guardrail rule costs and how often it decides.
+
+Replays a JSONL query corpus (same format as the batch CLI) and reports,
+per rule and per pattern:
+
+    cpu       CPU time to evaluate the rule over the corpus. Keyword and
+              regex rules are timed pattern by pattern, standalone. For
+              keywords that is their marginal cost, since in production
+              they share one automaton scan; both scans' totals are
+              reported separately.
+              Heuristic rules are timed through the classifier's dispatch.
+    fired     Queries on which the rule fired.
+    decided   Queries on which the rule is in the bucket resolve_priority
+              picked (same classification and category as the result),
+              i.e. it determined the routing. `sole` counts queries where
+              it was the only rule in that bucket.
+    flags     Catastrophic-backtracking candidates among regex patterns:
+              static checks on the parsed pattern (nested unbounded
+              quantifiers, adjacent unbounded quantifiers that can match
+              the same characters, quantified overlapping alternation)
+              plus adversarial timing that measures how match time grows
+              with input length. Each timing runs in a child process that
+              is killed once it exceeds a hard time limit.
+
+Run from the module root:
+    python -m benchmarks.profile_rules --in queries.jsonl --sort cpu
+    python -m benchmarks.profile_rules --synthetic 5000 --json profile.json
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import re
+import string
+import sys
+import time
+from collections import Counter
+
+try:  # Python 3.11+
+    from re import _parser as sre_parse
+except ImportError:  # pragma: no cover
+    import sre_parse
+
+from benchmarks.queries import synthetic_queries
+from src.classifier import (
+    _apply_context_first_override,
+    _confirm_matches,
+    _evaluate_heuristic,
+    _read_records,
+    _resolve_decision,
+)
+from src.models import Category
+from src.rules.heuristics import detect_produce_intent
+from src.rules.query_view import QueryView
+from src.rules.yaml_evaluator import active_ruleset, evaluate_category
+
+_CATEGORIES = (Category.COMPLIANCE, Category.SUITABILITY, Category.PROHIBITED)
+_UNBOUNDED = sre_parse.MAXREPEAT
+_REPEATS = (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT)
+_ALPHABET = frozenset(string.printable.lower())
+_CATEGORY_TESTS = {
+    sre_parse.CATEGORY_DIGIT: str.isdigit,
+    sre_parse.CATEGORY_NOT_DIGIT: lambda c: not c.isdigit(),
+    sre_parse.CATEGORY_SPACE: str.isspace,
+    sre_parse.CATEGORY_NOT_SPACE: lambda c: not c.isspace(),
+    sre_parse.CATEGORY_WORD: lambda c: c.isalnum() or c == "_",
+    sre_parse.CATEGORY_NOT_WORD: lambda c: not (c.isalnum() or c == "_"),
+}
+
+
+# ── CPU attribution ──────────────────────────────────────────────
+
+
+def _cpu_ns(fn, items, repeat: int) -> int:
+    """Best-of-`repeat` process CPU time for fn over every item."""
+    best = None
+    for _ in range(repeat):
+        start = time.process_time_ns()
+        for item in items:
+            fn(item)
+        elapsed = time.process_time_ns() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def profile_costs(ruleset, views: list[QueryView], repeat: int) -> tuple[dict, dict, dict]:
+    """Time every pattern, heuristic rule and shared phase over the corpus.
+
+    Returns:
+        (rule_id -> ns, (rule_id, pattern) -> ns, phase -> ns)
+    """
+    lowers = [v.lower for v in views]
+    texts = [v.text for v in views]
+    rule_ns: dict[str, int] = {}
+    pattern_ns: dict[tuple[str, str], int] = {}
+
+    for category in _CATEGORIES:
+        for spec in ruleset.rules_in(category):
+            if spec.detection_type == "keyword":
+                total = 0
+                for pattern in spec.patterns:
+                    p = pattern.lower()
+                    ns = _cpu_ns(lambda q, p=p: p in q, lowers, repeat)
+                    pattern_ns[(spec.rule_id, pattern)] = ns
+                    total += ns
+                rule_ns[spec.rule_id] = total
+            elif spec.detection_type == "regex":
+                total = 0
+                for pattern in spec.patterns:
+                    compiled = re.compile(pattern, re.IGNORECASE)
+                    ns = _cpu_ns(compiled.search, texts, repeat)
+                    pattern_ns[(spec.rule_id, pattern)] = ns
+                    total += ns
+                rule_ns[spec.rule_id] = total
+            else:
+                rule_ns[spec.rule_id] = _cpu_ns(
+                    lambda v, r=spec.rule_id: _evaluate_heuristic(r, v, ruleset),
+                    views, repeat,
+                )
+
+    phase_ns = {
+        "normalize": _cpu_ns(QueryView.from_text, texts, repeat),
+        "keyword_scan (combined)": _cpu_ns(ruleset.match_keywords, texts, repeat),
+        "regex_scan (per rule)": _cpu_ns(ruleset.match_regex, texts, repeat),
+        "produce_intent": _cpu_ns(detect_produce_intent, views, repeat),
+    }
+    fired = [ruleset.match(v) for v in views]
+    for category in _CATEGORIES:
+        pairs = list(zip(views, fired))
+        phase_ns[f"evaluate_category.{category.value}"] = _cpu_ns(
+            lambda vf, c=category: evaluate_category(vf[0], c, vf[1], ruleset),
+            pairs, repeat,
+        )
+    return rule_ns, pattern_ns, phase_ns
+
+
+# ── Selectivity ──────────────────────────────────────────────────
+
+
+def profile_decisions(ruleset, views: list[QueryView]) -> tuple[Counter, Counter, Counter]:
+    """Count, per rule, queries where it fired, decided, and decided alone."""
+    fired, decided, sole = Counter(), Counter(), Counter()
+    for view in views:
+        matches = _confirm_matches(view, ruleset, ruleset.match(view))
+        cls, cat, _ = _resolve_decision(matches, detect_produce_intent(view))
+        fired.update({m.rule_id for m in matches})
+        deciders = {t.rule_id for c, k, t in _apply_context_first_override(matches)
+                    if (c, k) == (cls, cat)}
+        decided.update(deciders)
+        if len(deciders) == 1:
+            sole.update(deciders)
+    return fired, decided, sole
+
+
+# ── Backtracking risk ────────────────────────────────────────────
+
+
+def _first_chars(items) -> set | None:
+    """Approximate set of first characters a subpattern can match.
+
+    None means "broad" (any character or a character class).
+    """
+    for op, av in items:
+        if op == sre_parse.LITERAL:
+            return {chr(av).lower()}
+        if op == sre_parse.SUBPATTERN:
+            return _first_chars(av[-1])
+        if op == sre_parse.BRANCH:
+            out: set = set()
+            for branch in av[1]:
+                first = _first_chars(branch)
+                if first is None:
+                    return None
+                out |= first
+            return out
+        if op in _REPEATS:
+            if av[0] == 0:
+                return None
+            return _first_chars(av[2])
+        if op == sre_parse.AT:
+            continue
+        return None
+    return set()
+
+
+def _contains_repeat(items) -> bool:
+    for op, av in items:
+        if op in _REPEATS and av[1] > 1:
+            return True
+        for child in _children(op, av):
+            if _contains_repeat(child):
+                return True
+    return False
+
+
+def _children(op, av) -> list:
+    if op == sre_parse.SUBPATTERN:
+        return [av[-1]]
+    if op == sre_parse.BRANCH:
+        return list(av[1])
+    if op in _REPEATS:
+        return [av[2]]
+    if op in (sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+        return [av[1]]
+    return []
+
+
+def _broad(items) -> bool:
+    """True if a repeated body can consume arbitrary/class characters."""
+    return _first_chars(items) is None
+
+
+def _in_class(items, char: str) -> bool:
+    """True if a parsed character class ([...], \\s, ...) matches `char`."""
+    hit = negate = False
+    for op, av in items:
+        if op == sre_parse.NEGATE:
+            negate = True
+        elif op == sre_parse.LITERAL:
+            hit |= chr(av).lower() == char
+        elif op == sre_parse.RANGE:
+            hit |= any(av[0] <= ord(c) <= av[1] for c in (char, char.upper()))
+        elif op == sre_parse.CATEGORY:
+            hit |= _CATEGORY_TESTS.get(av, lambda c: True)(char)
+    return hit != negate
+
+
+def _start_set(items) -> set:
+    """Printable characters (lowercased) a subpattern's match can start with.
+
+    Unlike _first_chars this resolves classes, so \\s and \\w come out
+    disjoint. Constructs it does not model count as matching anything.
+    """
+    for i, (op, av) in enumerate(items):
+        if op == sre_parse.LITERAL:
+            return {chr(av).lower()}
+        if op == sre_parse.NOT_LITERAL:
+            return set(_ALPHABET - {chr(av).lower()})
+        if op == sre_parse.IN:
+            return {c for c in _ALPHABET if _in_class(av, c)}
+        if op == sre_parse.SUBPATTERN:
+            return _start_set(av[-1])
+        if op == sre_parse.BRANCH:
+            return set().union(*(_start_set(branch) for branch in av[1]))
+        if op in _REPEATS:
+            first = _start_set(av[2])
+            return first | _start_set(items[i + 1:]) if av[0] == 0 else first
+        if op == sre_parse.AT:
+            continue
+        return set(_ALPHABET)
+    return set()
+
+
+def _overlapping_alternation(items) -> bool:
+    """True if an alternation in `items` has branches that can start alike.
+
+    The parser factors a common prefix out of the branches, so (a|a)
+    arrives as LITERAL a + BRANCH [[], []]: duplicate empty branches
+    count as overlapping too.
+    """
+    for op, av in items:
+        if op == sre_parse.BRANCH:
+            seen: set = set()
+            empty = 0
+            for branch in av[1]:
+                if not branch:
+                    empty += 1
+                    continue
+                first = _first_chars(branch)
+                if first is None or first & seen:
+                    return True
+                seen |= first
+            if empty > 1:
+                return True
+        for child in _children(op, av):
+            if _overlapping_alternation(child):
+                return True
+    return False
+
+
+def static_risks(pattern: str) -> list[str]:
+    """Structural backtracking red flags in a regex pattern."""
+    risks: list[str] = []
+
+    def walk(items) -> None:
+        unbounded_broad = 0
+        previous: set = set()  # start set of an unbounded repeat just before
+        for op, av in items:
+            if op in _REPEATS and av[1] == _UNBOUNDED:
+                body = av[2]
+                if _contains_repeat(body):
+                    risks.append("nested unbounded quantifier")
+                if _overlapping_alternation(body):
+                    risks.append("quantified overlapping alternation")
+                if _broad(body):
+                    unbounded_broad += 1
+                start = _start_set(body)
+                if previous & start:
+                    risks.append("adjacent unbounded quantifiers over shared characters")
+                previous = start
+            else:
+                previous = set()
+            for child in _children(op, av):
+                walk(child)
+        if unbounded_broad >= 2:
+            risks.append("multiple unbounded broad quantifiers in sequence")
+
+    walk(sre_parse.parse(pattern, re.IGNORECASE))
+    return sorted(set(risks))
+
+
+def _literal_prefix(pattern: str) -> str:
+    prefix = []
+    for op, av in sre_parse.parse(pattern, re.IGNORECASE):
+        if op != sre_parse.LITERAL:
+            break
+        prefix.append(chr(av))
+    return "".join(prefix)
+
+
+def _attack_strings(pattern: str, n: int) -> list[str]:
+    """Failing inputs that make the engine explore many paths.
+
+    Each is a pumped unit followed by a character no pattern accepts.
+    Pumping the pattern's own literal prefix ("is is is ...") forces a
+    fresh match attempt at every repetition.
+    """
+    prefix = _literal_prefix(pattern)
+    units = ["a", " ", "1", "aa "]
+    attacks = [prefix + unit * n + "\x00" for unit in units]
+    if prefix:
+        attacks.append((prefix + " ") * n + "\x00")
+    return attacks
+
+
+def _worst_time(compiled: re.Pattern, pattern: str, n: int, repeat: int = 3) -> float:
+    """Slowest attack string at length n, each timed best-of-`repeat`.
+
+    Searches under 10 ms are repeated so a scheduler hiccup on one of
+    them does not read as super-linear growth.
+    """
+    worst = 0.0
+    for attack in _attack_strings(pattern, n):
+        best = math.inf
+        for _ in range(repeat):
+            start = time.perf_counter()
+            compiled.search(attack)
+            best = min(best, time.perf_counter() - start)
+            if best > 0.01:
+                break
+        worst = max(worst, best)
+    return worst
+
+
+def _probe_worker(conn, pattern: str) -> None:
+    """Child process: answer each n received with _worst_time(n)."""
+    compiled = re.compile(pattern, re.IGNORECASE)
+    while True:
+        try:
+            n = conn.recv()
+        except EOFError:
+            return
+        conn.send(_worst_time(compiled, pattern, n))
+
+
+class _Prober:
+    """Runs a pattern's adversarial searches in a child process.
+
+    A single search can run for minutes (re cannot be interrupted), so
+    the child is killed once a probe outlives `timeout` seconds.
+    """
+
+    def __init__(self, pattern: str, timeout: float):
+        self.timeout = timeout
+        self._conn, child = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(
+            target=_probe_worker, args=(child, pattern), daemon=True,
+        )
+        self._process.start()
+        child.close()
+
+    def worst_time(self, n: int) -> float | None:
+        """Worst search seconds at length n, or None past the time limit."""
+        self._conn.send(n)
+        if not self._conn.poll(self.timeout):
+            return None
+        return self._conn.recv()
+
+    def close(self) -> None:
+        self._process.kill()
+        self._process.join()
+        self._conn.close()
+
+
+def adversarial_growth(pattern: str, budget: float = 0.05, timeout: float = 1.0) -> dict:
+    """Measure how worst-case search time grows with input length.
+
+    An exponential probe grows n slowly and stops as soon as one search
+    exceeds `budget` seconds. A polynomial probe then doubles n and
+    estimates the exponent k in time ~ n^k from the last doubling; the
+    last exponential-probe size is its first sample, so a search over
+    budget at the first doubling still yields an estimate. A search over
+    budget is itself not "ok".
+
+    Every probe runs under a hard `timeout` (seconds); hitting it ends
+    measurement with verdict "exceeded budget", `n` the length that hit
+    it and `seconds` the timeout, a lower bound.
+    """
+    prober = _Prober(pattern, timeout)
+    try:
+        timings = []
+        for n in range(8, 33, 4):
+            t = prober.worst_time(n)
+            if t is None:
+                return {"verdict": "exceeded budget", "n": n, "seconds": timeout, "exponent": None}
+            if t > budget:
+                return {"verdict": "exponential", "n": n, "seconds": round(t, 6), "exponent": None}
+            timings = [(n, t)]
+
+        for n in (64, 128, 256, 512, 1024, 2048, 4096):
+            t = prober.worst_time(n)
+            if t is None:
+                return {"verdict": "exceeded budget", "n": n, "seconds": timeout, "exponent": None}
+            timings.append((n, t))
+            if t > budget:
+                break
+    finally:
+        prober.close()
+
+    (n1, t1), (n2, t2) = timings[-2], timings[-1]
+    exponent = math.log2(t2 / t1) / math.log2(n2 / n1) if t1 > 0 and t2 > 0 else 0.0
+    verdict = "ok"
+    if t2 > budget or (exponent >= 1.6 and t2 > 1e-4):
+        verdict = "polynomial"
+    return {"verdict": verdict, "n": n2, "seconds": round(t2, 6),
+            "exponent": round(exponent, 2)}
+
+
+# ── Report ───────────────────────────────────────────────────────
+
+
+def build_report(ruleset, queries: list[str], repeat: int, adversarial: bool) -> dict:
+    views = [QueryView.from_text(q) for q in queries]
+    rule_ns, pattern_ns, phase_ns = profile_costs(ruleset, views, repeat)
+    fired, decided, sole = profile_decisions(ruleset, views)
+    n = len(views) or 1
+    total_rule_ns = sum(rule_ns.values()) or 1
+
+    rules = []
+    patterns = []
+    for category in _CATEGORIES:
+        for spec in ruleset.rules_in(category):
+            flags: set[str] = set()
+            if spec.detection_type == "regex":
+                for pattern in spec.patterns:
+                    risks = static_risks(pattern)
+                    growth = adversarial_growth(pattern) if adversarial else None
+                    if growth and growth["verdict"] == "exceeded budget":
+                        risks.append("adversarial search exceeded budget")
+                    elif growth and growth["verdict"] != "ok":
+                        risks.append(f"{growth['verdict']} growth")
+                    flags.update(risks)
+                    patterns.append({
+                        "rule_id": spec.rule_id,
+                        "pattern": pattern,
+                        "us_per_query": round(pattern_ns[(spec.rule_id, pattern)] / n / 1e3, 4),
+                        "flags": risks,
+                        "adversarial": growth,
+                    })
+            elif spec.detection_type == "keyword":
+                for pattern in spec.patterns:
+                    patterns.append({
+                        "rule_id": spec.rule_id,
+                        "pattern": pattern,
+                        "us_per_query": round(pattern_ns[(spec.rule_id, pattern)] / n / 1e3, 4),
+                        "flags": [],
+                        "adversarial": None,
+                    })
+            rules.append({
+                "rule_id": spec.rule_id,
+                "type": spec.detection_type,
+                "patterns": len(spec.patterns),
+                "cpu_ms": round(rule_ns[spec.rule_id] / 1e6, 3),
+                "us_per_query": round(rule_ns[spec.rule_id] / n / 1e3, 4),
+                "cpu_share": round(rule_ns[spec.rule_id] / total_rule_ns, 4),
+                "fired": fired[spec.rule_id],
+                "decided": decided[spec.rule_id],
+                "sole": sole[spec.rule_id],
+                "selectivity": round(decided[spec.rule_id] / n, 4),
+                "flags": sorted(flags),
+            })
+
+    return {
+        "queries": len(views),
+        "ruleset_version": ruleset.version,
+        "repeat": repeat,
+        "phases_us_per_query": {k: round(v / n / 1e3, 4) for k, v in phase_ns.items()},
+        "rules": rules,
+        "patterns": patterns,
+    }
+
+
+_SORT_KEYS = {
+    "cpu": lambda r: -r["us_per_query"],
+    "fired": lambda r: -r["fired"],
+    "decided": lambda r: -r["decided"],
+    "selectivity": lambda r: -r["selectivity"],
+    "rule": lambda r: r["rule_id"],
+}
+
+
+def print_report(report: dict, sort: str, top_patterns: int) -> None:
+    print(f"{report['queries']} queries, ruleset {report['ruleset_version']}, "
+          f"best of {report['repeat']}")
+    print("\nShared phases (us/query):")
+    for phase, us in report["phases_us_per_query"].items():
+        print(f"  {phase:<36} {us:>9.3f}")
+
+    print(f"\n{'rule_id':<46} {'type':<9} {'us/q':>8} {'share':>6} "
+          f"{'fired':>7} {'decided':>7} {'sole':>6}  flags")
+    for r in sorted(report["rules"], key=_SORT_KEYS[sort]):
+        print(f"{r['rule_id']:<46} {r['type']:<9} {r['us_per_query']:>8.3f} "
+              f"{r['cpu_share']:>6.1%} {r['fired']:>7} {r['decided']:>7} "
+              f"{r['sole']:>6}  {', '.join(r['flags'])}")
+
+    print(f"\nMost expensive patterns (standalone us/query, top {top_patterns}):")
+    ranked = sorted(report["patterns"], key=lambda p: -p["us_per_query"])
+    for p in ranked[:top_patterns]:
+        flags = f"  [{', '.join(p['flags'])}]" if p["flags"] else ""
+        print(f"  {p['us_per_query']:>8.4f}  {p['rule_id']:<44} {p['pattern']!r}{flags}")
+    flagged = [p for p in report["patterns"] if p["flags"]]
+    if flagged:
+        print("\nBacktracking candidates:")
+        for p in flagged:
+            growth = p["adversarial"] or {}
+            print(f"  {p['rule_id']:<44} {p['pattern']!r}: {', '.join(p['flags'])}"
+                  f" (worst {growth.get('seconds', 0) * 1e3:.2f} ms at n={growth.get('n')},"
+                  f" exponent {growth.get('exponent')})")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.profile_rules",
+        description="Attribute guardrail evaluation cost to rules and patterns.",
+    )
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--in", dest="input",
+                        help="JSONL query corpus (objects with --field, or bare strings)")
+    source.add_argument("--synthetic", type=int, default=2000,
+                        help="Use N synthetic queries when --in is not given (default: 2000)")
+    parser.add_argument("--field", default="query")
+    parser.add_argument("--limit", type=int, help="Use at most N corpus queries")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Timing repetitions; the minimum is reported (default: 3)")
+    parser.add_argument("--sort", choices=sorted(_SORT_KEYS), default="cpu")
+    parser.add_argument("--top-patterns", type=int, default=15)
+    parser.add_argument("--no-adversarial", action="store_true",
+                        help="Skip adversarial regex timing (static checks only)")
+    parser.add_argument("--json", dest="json_out", help="Also write the report as JSON")
+    args = parser.parse_args(argv)
+
+    if args.input:
+        with open(args.input, encoding="utf-8") as f:
+            queries = [q for _, q in _read_records(f, args.field, "id")]
+    else:
+        queries = synthetic_queries(args.synthetic, seed=0)
+    if args.limit:
+        queries = queries[:args.limit]
+
+    report = build_report(active_ruleset(), queries, args.repeat, not args.no_adversarial)
+    print_report(report, args.sort, args.top_patterns)
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nwrote {args.json_out}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""
+Benchmark query sources: the acceptance samples and a seeded synthetic
+generator.
+
+The synthetic generator varies the three things that drive classify()
+cost: query length, how densely the query is packed with rule signals,
+and how often it is phrased as a produce-intent request.
+"""
+
+import random
+
+from src.rules.heuristics import _PRODUCE_SIGNALS
+from src.rules.yaml_evaluator import active_ruleset
+
+# The sample inputs exercised by tests/test_acceptance.py.
+ACCEPTANCE_QUERIES = [
+    "What is my current account balance in my Roth IRA?",
+    "What should I invest in right now?",
+    "Write me a message to send to my client saying this fund is "
+    "guaranteed to outperform the market.",
+    "Should I buy NVIDIA stock today?",
+    "What are the expense ratios for the index funds available in my 401k?",
+    "Help me write an email to prospects highlighting the high returns "
+    "of our growth fund.",
+    "I'm 35 years old, have a high risk tolerance, won't need this money "
+    "for 25+ years, and I'm looking to maximize growth. What asset "
+    "allocation would you suggest for my Roth IRA?",
+    "What are the tax implications if I convert my traditional IRA to a Roth?",
+    "Can you explain how dollar-cost averaging works?",
+    "What's the weather today?",
+    "My advisor said this fund is guaranteed, should I be worried?",
+]
+
+# Neutral words that should not fire any rule on their own.
+_FILLER = [
+    "the", "a", "my", "our", "about", "please", "today", "this", "that",
+    "client", "team", "quarter", "plan", "review", "question", "thanks",
+    "could", "you", "with", "for", "and", "details", "update", "report",
+    "meeting", "weekly", "notes", "summary", "compare", "two", "options",
+]
+
+# Regex rules have no literal vocabulary to draw from, so these phrases
+# stand in for them: each fires at least one regex rule on its own
+# (tests/test_rule_matching.py checks every regex rule is covered).
+REGEX_PHRASES = [
+    "should I buy",
+    "should I sell",
+    "should I invest in",
+    "is this fund a good investment",
+    "what would you recommend",
+    "what do you recommend",
+    "what should I invest in",
+    "which etf should",
+    "which bond should",
+    "should I buy NVDA",
+    "should I sell my tech stock",
+    "buy or sell TSLA",
+]
+
+
+def _signal_vocabulary() -> list[str]:
+    """Every keyword pattern and heuristic signal in the active ruleset,
+    plus REGEX_PHRASES."""
+    vocab = set()
+    ruleset = active_ruleset()
+    for config in ruleset.configs.values():
+        for rule in config["rules"]:
+            spec = ruleset.rule(rule["id"])
+            vocab.update(spec.patterns if spec.detection_type == "keyword" else ())
+            for signals in spec.signals.values():
+                vocab.update(signals)
+    # Drop descriptive placeholder entries such as the jurisdiction note.
+    vocab = {v for v in vocab if len(v.split()) <= 4}
+    return sorted(vocab | set(REGEX_PHRASES))
+
+
+def synthetic_queries(
+    n: int,
+    seed: int = 0,
+    length: int = 20,
+    signal_density: float = 0.1,
+    produce_ratio: float = 0.1,
+) -> list[str]:
+    """Generate a reproducible list of synthetic queries.
+
+    Args:
+        n: Number of queries.
+        seed: RNG seed; the same arguments always yield the same list.
+        length: Approximate words per query (each query varies +/- 50%).
+        signal_density: Probability that each word slot is a rule
+            signal (keyword pattern, heuristic signal or regex-firing
+            phrase) instead of filler.
+        produce_ratio: Fraction of queries phrased as produce-intent
+            requests ("write me ...", "draft a ...").
+    """
+    rng = random.Random(seed)
+    signals = _signal_vocabulary()
+    produce = [s.strip() for s in _PRODUCE_SIGNALS]
+    queries = []
+    for _ in range(n):
+        words = max(1, int(length * rng.uniform(0.5, 1.5)))
+        parts = [
+            rng.choice(signals) if rng.random() < signal_density else rng.choice(_FILLER)
+            for _ in range(words)
+        ]
+        if rng.random() < produce_ratio:
+            parts.insert(0, rng.choice(produce))
+        query = " ".join(parts)
+        queries.append(query[0].upper() + query[1:] + rng.choice(["?", ".", ""]))
+    return queries
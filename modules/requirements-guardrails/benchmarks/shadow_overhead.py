@@ -0,0 +1,85 @@
+"""
+Benchmark: latency overhead of shadowing a candidate ruleset.
+
+Compares, per query:
+    classify            production only
+    shadow              ShadowEvaluator.classify (merged scan, shared
+                        QueryView and heuristics)
+    classify x2         the naive alternative: classify() under each ruleset
+
+for a candidate identical to production and for one with an edited
+keyword pattern and an edited heuristic signal list (no heuristic
+sharing). Reported overhead is relative to production-only classify.
+
+Run from the module root:
+    python -m benchmarks.shadow_overhead --rounds 20
+"""
+
+import argparse
+import shutil
+import tempfile
+from pathlib import Path
+
+from benchmarks.queries import ACCEPTANCE_QUERIES, synthetic_queries
+from benchmarks.suite import measure
+from src.classifier import _classify_view, classify
+from src.rules.query_view import QueryView
+from src.rules.registry import CONFIG_FILES, load_ruleset
+from src.shadow import ShadowEvaluator
+
+CONFIG_DIR = Path(__file__).parent.parent / "src" / "config"
+
+_EDITS = [
+    ("compliance.yaml", '- "sure thing"', '- "sure bet"'),
+    ("suitability.yaml", '- "conservative"', '- "cautious"'),
+]
+
+
+def _edited_candidate(tmp: Path):
+    for filename in CONFIG_FILES.values():
+        shutil.copy(CONFIG_DIR / filename, tmp / filename)
+    for filename, old, new in _EDITS:
+        path = tmp / filename
+        path.write_text(path.read_text(encoding="utf-8").replace(old, new), encoding="utf-8")
+    return load_ruleset(tmp)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--synthetic", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    queries = list(ACCEPTANCE_QUERIES) + synthetic_queries(args.synthetic, seed=1)
+    with tempfile.TemporaryDirectory() as tmp:
+        candidates = {
+            "identical": load_ruleset(CONFIG_DIR),
+            "edited": _edited_candidate(Path(tmp)),
+        }
+
+    baseline = measure(lambda q, v: classify(q), queries, args.rounds)
+    print(f"{len(queries)} queries x {args.rounds} rounds")
+    print(f"{'candidate':<10} {'mode':<12} {'p50 us':>8} {'p99 us':>8} "
+          f"{'+p50 us':>8} {'+p50 %':>7}")
+    print(f"{'-':<10} {'classify':<12} {baseline['p50_us']:>8.1f} {baseline['p99_us']:>8.1f}")
+    for name, candidate in candidates.items():
+        shadow = ShadowEvaluator(candidate)
+
+        def twice(q, v, candidate=candidate):
+            classify(q)
+            view = QueryView.from_text(q)
+            _classify_view(view, candidate, candidate.match(view))
+
+        for mode, fn in (("shadow", lambda q, v: shadow.classify(q)),
+                         ("classify x2", twice)):
+            r = measure(fn, queries, args.rounds)
+            extra = r["p50_us"] - baseline["p50_us"]
+            print(f"{name:<10} {mode:<12} {r['p50_us']:>8.1f} {r['p99_us']:>8.1f} "
+                  f"{extra:>8.1f} {100 * extra / baseline['p50_us']:>6.0f}%")
+        stats = shadow.stats()
+        print(f"{'':<10} {'':<12} diffs={stats.diffs}/{stats.shadowed}, "
+              f"candidate-side mean {stats.mean_overhead_us:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
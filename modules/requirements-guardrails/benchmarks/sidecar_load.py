@@ -0,0 +1,158 @@
+"""
+Benchmark: guardrails sidecar latency under fixed request rates.
+
+Open-loop load: requests are scheduled at a constant rate regardless of
+how fast responses come back, and latency is measured from each
+request's *scheduled* send time. A saturated server therefore shows up
+as growing p99 rather than as a quietly lower request rate (coordinated
+omission). Requests are spread over a pool of keep-alive connections.
+
+By default a sidecar is started as a subprocess; pass --port/--unix to
+target one that is already running. The load generator shares the
+box, so on small hosts it competes with the server for CPU.
+
+Run from the module root:
+    python -m benchmarks.sidecar_load --rates 1000 5000 10000 --workers 4
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from itertools import cycle
+
+from benchmarks.queries import ACCEPTANCE_QUERIES
+from benchmarks.suite import percentile
+
+
+async def _open(args):
+    if args.unix:
+        return await asyncio.open_unix_connection(args.unix)
+    return await asyncio.open_connection("127.0.0.1", args.port)
+
+
+async def _request(reader, writer, body: bytes) -> int:
+    writer.write(
+        b"POST /classify HTTP/1.1\r\nHost: guardrails\r\n"
+        b"Content-Type: application/json\r\n"
+        b"Content-Length: " + str(len(body)).encode() + b"\r\n\r\n" + body
+    )
+    head = await reader.readuntil(b"\r\n\r\n")
+    status = int(head.split(b" ", 2)[1])
+    length = 0
+    for line in head.split(b"\r\n"):
+        if line.lower().startswith(b"content-length:"):
+            length = int(line.split(b":", 1)[1])
+    await reader.readexactly(length)
+    return status
+
+
+async def run_rate(args, rate: int) -> dict:
+    """Drive one rate for args.duration seconds; return latency stats."""
+    pending: asyncio.Queue = asyncio.Queue()
+    latencies: list[float] = []
+    errors = 0
+    bodies = cycle([json.dumps({"query": q}).encode() for q in ACCEPTANCE_QUERIES])
+    total = int(rate * args.duration)
+
+    async def connection() -> None:
+        nonlocal errors
+        reader, writer = await _open(args)
+        try:
+            while True:
+                scheduled, body = await pending.get()
+                if body is None:
+                    return
+                try:
+                    status = await _request(reader, writer, body)
+                    if status != 200:
+                        errors += 1
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    errors += 1
+                    reader, writer = await _open(args)
+                latencies.append(time.perf_counter() - scheduled)
+        finally:
+            writer.close()
+
+    tasks = [asyncio.create_task(connection()) for _ in range(args.connections)]
+    start = time.perf_counter()
+    sent = 0
+    while sent < total:
+        due = min(total, int((time.perf_counter() - start) * rate) + 1)
+        while sent < due:
+            pending.put_nowait((start + sent / rate, next(bodies)))
+            sent += 1
+        await asyncio.sleep(0.001)
+    for _ in tasks:
+        pending.put_nowait((0.0, None))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "rate": rate,
+        "achieved": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1e3,
+        "p99_ms": percentile(latencies, 99) * 1e3,
+        "max_ms": latencies[-1] * 1e3 if latencies else 0.0,
+        "errors": errors,
+    }
+
+
+def _start_server(args) -> subprocess.Popen:
+    cmd = [sys.executable, "-m", "src.server", "--workers", str(args.workers),
+           "--max-batch", str(args.max_batch), "--max-wait-ms", str(args.max_wait_ms)]
+    cmd += ["--unix", args.unix] if args.unix else ["--port", str(args.port)]
+    proc = subprocess.Popen(cmd, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if args.unix:
+                with socket.socket(socket.AF_UNIX) as s:
+                    s.connect(args.unix)
+            else:
+                socket.create_connection(("127.0.0.1", args.port), timeout=0.2).close()
+            return proc
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("sidecar did not start within 30s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rates", type=int, nargs="+", default=[1000, 5000, 10000])
+    parser.add_argument("--duration", type=float, default=10.0,
+                        help="Seconds per rate (default: 10)")
+    parser.add_argument("--connections", type=int, default=64)
+    parser.add_argument("--port", type=int, default=8088)
+    parser.add_argument("--unix", help="Unix socket path instead of TCP")
+    parser.add_argument("--external", action="store_true",
+                        help="Target an already-running sidecar")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=1.0)
+    args = parser.parse_args()
+
+    proc = None if args.external else _start_server(args)
+    try:
+        print(f"{args.connections} connections, {args.duration:.0f}s per rate, "
+              f"workers={args.workers}, cpu_count={os.cpu_count()}")
+        print(f"{'rate':>7} {'achieved':>9} {'p50 ms':>8} {'p99 ms':>8} "
+              f"{'max ms':>8} {'errors':>7}")
+        for rate in args.rates:
+            r = asyncio.run(run_rate(args, rate))
+            print(f"{r['rate']:>7} {r['achieved']:>9,.0f} {r['p50_ms']:>8.2f} "
+                  f"{r['p99_ms']:>8.2f} {r['max_ms']:>8.2f} {r['errors']:>7}")
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+
+if __name__ == "__main__":
+    main()
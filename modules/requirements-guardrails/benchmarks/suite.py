@@ -0,0 +1,239 @@
+"""
+Guardrails performance benchmark suite.
+
+Measures per-call latency (p50/p95/p99) and throughput for classify(),
+the compiled rule scan, evaluate_category() per category, and each
+heuristic, on the acceptance samples and on seeded synthetic datasets
+that vary query length, signal density and produce-intent phrasing.
+
+Results are written as machine-readable JSON. A later run can compare
+against a saved baseline and exits non-zero when any p50 regresses past
+the threshold, so the suite can gate rule or code changes.
+
+Run from the module root:
+    python -m benchmarks.suite --output baseline.json
+    python -m benchmarks.suite --compare baseline.json --threshold 0.2
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+from collections.abc import Callable
+from datetime import datetime, timezone
+
+from benchmarks.queries import ACCEPTANCE_QUERIES, synthetic_queries
+from src.classifier import _has_gate_signals, classify, classify_fast
+from src.models import Category
+from src.rules.heuristics import (
+    detect_produce_intent,
+    has_account_type_context,
+    has_jurisdiction_context,
+    has_risk_tolerance_context,
+    has_time_horizon_context,
+    has_unbalanced_claims,
+    is_out_of_scope,
+    is_recommendation_request,
+)
+from src.rules.query_view import QueryView
+from src.rules.yaml_evaluator import active_ruleset, evaluate_category
+
+# Synthetic dataset name -> synthetic_queries() keyword arguments.
+SYNTHETIC_DATASETS: dict[str, dict] = {
+    "synthetic_short": {"length": 8, "signal_density": 0.1, "produce_ratio": 0.1},
+    "synthetic_medium": {"length": 40, "signal_density": 0.1, "produce_ratio": 0.1},
+    "synthetic_long": {"length": 200, "signal_density": 0.1, "produce_ratio": 0.1},
+    "synthetic_dense": {"length": 40, "signal_density": 0.5, "produce_ratio": 0.1},
+    "synthetic_produce": {"length": 40, "signal_density": 0.2, "produce_ratio": 1.0},
+}
+
+
+def _targets() -> dict[str, Callable[[str, QueryView], object]]:
+    """Benchmark target name -> fn(query, view).
+
+    Targets below classify() receive the pre-built QueryView, matching
+    how classify() calls them, so they measure rule cost rather than
+    normalization. QueryView construction is its own target.
+    """
+    ruleset = active_ruleset()
+    targets: dict[str, Callable[[str, QueryView], object]] = {
+        "classify": lambda q, v: classify(q),
+        "classify_fast": lambda q, v: classify_fast(q),
+        "query_view": lambda q, v: QueryView.from_text(q),
+        "rule_scan": lambda q, v: ruleset.match(v),
+    }
+    for category in (Category.COMPLIANCE, Category.SUITABILITY, Category.PROHIBITED):
+        targets[f"evaluate_category.{category.value}"] = (
+            lambda q, v, c=category: evaluate_category(v, c, None, ruleset)
+        )
+    heuristics = {
+        "detect_produce_intent": lambda q, v: detect_produce_intent(v),
+        "has_unbalanced_claims": lambda q, v: has_unbalanced_claims(v, ruleset),
+        "is_recommendation_request": lambda q, v: is_recommendation_request(v, ruleset),
+        "has_risk_tolerance_context": lambda q, v: has_risk_tolerance_context(v, ruleset),
+        "has_time_horizon_context": lambda q, v: has_time_horizon_context(v, ruleset),
+        "has_jurisdiction_context": lambda q, v: has_jurisdiction_context(v),
+        "has_account_type_context": lambda q, v: has_account_type_context(v, ruleset),
+        "is_out_of_scope": lambda q, v: is_out_of_scope(v),
+        "gate.tax_signals": lambda q, v: _has_gate_signals(
+            v, "suitability.missing_jurisdiction", "tax_signals", ruleset),
+        "gate.account_signals": lambda q, v: _has_gate_signals(
+            v, "suitability.missing_account_type", "account_signals", ruleset),
+    }
+    targets.update({f"heuristic.{k}": fn for k, fn in heuristics.items()})
+    return targets
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already-sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1,
+                      int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def measure(fn: Callable[[str, QueryView], object], queries: list[str],
+            rounds: int) -> dict:
+    """Time each call individually and summarize the distribution."""
+    views = [QueryView.from_text(q) for q in queries]
+    for q, v in zip(queries, views):  # warm-up
+        fn(q, v)
+    samples = []
+    clock = time.perf_counter_ns
+    total_start = clock()
+    for _ in range(rounds):
+        for q, v in zip(queries, views):
+            start = clock()
+            fn(q, v)
+            samples.append(clock() - start)
+    total_ns = clock() - total_start
+    samples.sort()
+    return {
+        "calls": len(samples),
+        "p50_us": round(percentile(samples, 50) / 1000, 3),
+        "p95_us": round(percentile(samples, 95) / 1000, 3),
+        "p99_us": round(percentile(samples, 99) / 1000, 3),
+        "ops_per_sec": round(len(samples) / (total_ns / 1e9), 1),
+    }
+
+
+def run_suite(n_synthetic: int, seed: int, rounds: int,
+              only: list[str] | None = None) -> dict:
+    """Run every target over every dataset and return the report dict."""
+    datasets = {"acceptance": ACCEPTANCE_QUERIES}
+    for name, params in SYNTHETIC_DATASETS.items():
+        datasets[name] = synthetic_queries(n_synthetic, seed=seed, **params)
+
+    # The rule-scan numbers only cover the regex path if queries reach it.
+    ruleset = active_ruleset()
+    regex_queries = {name: sum(1 for q in queries if ruleset.match_regex(q))
+                     for name, queries in datasets.items()}
+    if not any(regex_queries[name] for name in SYNTHETIC_DATASETS):
+        raise RuntimeError("No synthetic query fires a regex rule; "
+                           "the regex path would go unmeasured")
+
+    targets = _targets()
+    if only:
+        targets = {k: v for k, v in targets.items()
+                   if any(k.startswith(prefix) for prefix in only)}
+
+    results: dict[str, dict] = {}
+    for dataset, queries in datasets.items():
+        # Acceptance has few queries; repeat it for a stable distribution.
+        reps = rounds * max(1, n_synthetic // len(queries)) if dataset == "acceptance" else rounds
+        results[dataset] = {
+            name: measure(fn, queries, reps) for name, fn in targets.items()
+        }
+
+    return {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "ruleset_version": ruleset.version,
+            "seed": seed,
+            "synthetic_queries": n_synthetic,
+            "rounds": rounds,
+            "regex_queries": regex_queries,
+        },
+        "results": results,
+    }
+
+
+def compare(report: dict, baseline: dict, threshold: float,
+            min_delta_us: float = 1.0) -> list[str]:
+    """Return regression lines where p50 grew by more than `threshold`.
+
+    Changes smaller than `min_delta_us` in absolute terms are ignored so
+    timer noise on sub-microsecond targets does not fail the gate.
+    """
+    regressions = []
+    for dataset, targets in report["results"].items():
+        for name, stats in targets.items():
+            base = baseline.get("results", {}).get(dataset, {}).get(name)
+            if not base or not base["p50_us"]:
+                continue
+            change = stats["p50_us"] / base["p50_us"] - 1
+            if change > threshold and stats["p50_us"] - base["p50_us"] >= min_delta_us:
+                regressions.append(
+                    f"{dataset:18s} {name:40s} p50 {base['p50_us']:>9.2f} -> "
+                    f"{stats['p50_us']:>9.2f} us ({change:+.0%})"
+                )
+    return regressions
+
+
+def print_report(report: dict) -> None:
+    """Print a human-readable table of the report."""
+    regex_queries = report["meta"].get("regex_queries", {})
+    for dataset, targets in report["results"].items():
+        print(f"\n== {dataset} ({regex_queries.get(dataset, '?')} queries fire a regex rule)")
+        print(f"{'target':40s} {'p50 us':>9} {'p95 us':>9} {'p99 us':>9} {'ops/sec':>12}")
+        for name, s in targets.items():
+            print(f"{name:40s} {s['p50_us']:>9.2f} {s['p95_us']:>9.2f} "
+                  f"{s['p99_us']:>9.2f} {s['ops_per_sec']:>12,.0f}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Guardrails performance benchmark suite.")
+    parser.add_argument("--synthetic", type=int, default=500,
+                        help="Queries per synthetic dataset (default: 500)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rounds", type=int, default=3,
+                        help="Passes over each dataset (default: 3)")
+    parser.add_argument("--only", nargs="+", metavar="PREFIX",
+                        help="Only run targets whose name starts with PREFIX")
+    parser.add_argument("--output", help="Write the JSON report to this path")
+    parser.add_argument("--compare", metavar="BASELINE",
+                        help="Compare against a saved JSON report")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Allowed p50 regression vs. baseline (default: 0.2)")
+    parser.add_argument("--min-delta-us", type=float, default=1.0,
+                        help="Ignore p50 changes smaller than this (default: 1.0)")
+    parser.add_argument("--quiet", action="store_true", help="Skip the table")
+    args = parser.parse_args(argv)
+
+    report = run_suite(args.synthetic, args.seed, args.rounds, args.only)
+    if not args.quiet:
+        print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold, args.min_delta_us)
+        if regressions:
+            print(f"\n{len(regressions)} p50 regression(s) over "
+                  f"{args.threshold:.0%}:", file=sys.stderr)
+            for line in regressions:
+                print("  " + line, file=sys.stderr)
+            return 1
+        print(f"\nNo p50 regressions over {args.threshold:.0%} vs {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,393 @@
+"""
+Buffered, append-only audit sink for GuardrailResult records.
+
+Every classification must reach the audit log (17a-4 books-and-records
+expectations), but a synchronous json.dumps + write + fsync per request
+puts disk latency on the request path. AuditSink decouples the two:
+
+    request thread --write()--> bounded queue --> flusher thread --> JSONL
+
+The flusher drains the queue in batches, serializes each record with
+GuardrailResult.to_dict(), and appends one JSON object per line. Files
+rotate by size and/or age, can be gzip-compressed, and are fsynced per
+the configured durability policy.
+
+Backpressure: when the queue is full, overflow="block" makes write()
+wait (optionally up to put_timeout) and overflow="drop" rejects the
+record immediately. Either way a rejected record is counted in
+stats().dropped and write() returns False, so callers can decide
+whether an unaudited request may proceed.
+"""
+
+import gzip
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+from src.models import GuardrailResult
+
+logger = logging.getLogger(__name__)
+
+FSYNC_POLICIES = ("never", "batch", "interval")
+OVERFLOW_POLICIES = ("block", "drop")
+
+_STOP = object()
+
+
+@dataclass(frozen=True)
+class AuditSinkStats:
+    """Point-in-time sink counters.
+
+    Attributes:
+        written: Records written to disk.
+        dropped: Records rejected because the queue was full.
+        failed: Records lost to write errors (see the log).
+        errors: Write, fsync, and close errors (see the log). The flusher
+            keeps running after an error; the next batch opens a new file
+            if the current one had to be abandoned.
+        batches: Batches written.
+        rotations: Files closed due to size/age rotation.
+        queue_depth: Records waiting to be written.
+    """
+
+    written: int
+    dropped: int
+    failed: int
+    errors: int
+    batches: int
+    rotations: int
+    queue_depth: int
+
+
+class AuditSink:
+    """Background JSONL writer for GuardrailResult records.
+
+    Usage:
+        with AuditSink("audit/", compress=True) as sink:
+            sink.write(classify(query))
+
+    Records are written in the order write() accepted them. Results
+    should not be mutated after being handed to write(); they are
+    serialized later, on the flusher thread.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        basename: str = "guardrail-audit",
+        max_queue: int = 10_000,
+        batch_size: int = 512,
+        flush_interval: float = 0.5,
+        rotate_bytes: int | None = 64 * 1024 * 1024,
+        rotate_seconds: float | None = None,
+        compress: bool = False,
+        fsync: str = "interval",
+        fsync_interval: float = 1.0,
+        overflow: str = "block",
+        put_timeout: float | None = None,
+    ):
+        """
+        Args:
+            directory: Where audit files are written (created if needed).
+            basename: File name prefix.
+            max_queue: Queue capacity; the backpressure bound.
+            batch_size: Maximum records per write.
+            flush_interval: Longest a record waits in the queue before
+                a partial batch is written.
+            rotate_bytes: Start a new file once this many uncompressed
+                bytes were written to the current one (None: no limit).
+            rotate_seconds: Start a new file once the current one is this
+                old (None: no limit).
+            compress: Write gzip-compressed files (.jsonl.gz).
+            fsync: "batch" fsyncs after every batch, "interval" at most
+                every fsync_interval seconds (checked again while idle, so
+                the last batches before a lull are not left unsynced),
+                "never" leaves it to the OS, on rotation and close() too.
+                Python buffers are flushed after every batch regardless.
+            fsync_interval: Seconds between fsyncs for fsync="interval".
+            overflow: "block" or "drop" when the queue is full.
+            put_timeout: For overflow="block", the longest write() waits
+                before dropping (None: wait indefinitely).
+
+        Raises:
+            ValueError: On an unknown policy or non-positive size.
+        """
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {FSYNC_POLICIES}")
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {OVERFLOW_POLICIES}")
+        if max_queue < 1 or batch_size < 1:
+            raise ValueError("max_queue and batch_size must be >= 1")
+
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.basename = basename
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.rotate_bytes = rotate_bytes
+        self.rotate_seconds = rotate_seconds
+        self.compress = compress
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.overflow = overflow
+        self.put_timeout = put_timeout
+
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._counter_lock = threading.Lock()
+        self._written = 0
+        self._dropped = 0
+        self._failed = 0
+        self._errors = 0
+        self._batches = 0
+        self._rotations = 0
+        # Guards _closed and counts write() calls between their closed
+        # check and their put, so close() can enqueue _STOP after the last.
+        self._state = threading.Condition()
+        self._closed = False
+        self._writers = 0
+
+        self._file = None
+        self._file_bytes = 0
+        self._file_opened = 0.0
+        self._last_fsync = time.monotonic()
+        self._unsynced = False
+        self._sequence = 0
+        self.current_path: Path | None = None
+
+        self._thread = threading.Thread(
+            target=self._run, name="guardrail-audit-flusher", daemon=True,
+        )
+        self._thread.start()
+
+    # ── Producer side ────────────────────────────────────────────
+
+    def write(self, result: GuardrailResult | dict) -> bool:
+        """Enqueue a record for writing.
+
+        Args:
+            result: A GuardrailResult, or an already-serialized dict.
+
+        Returns:
+            True if the record was accepted, False if it was dropped
+            because the queue was full.
+
+        Raises:
+            RuntimeError: If the sink is closed.
+        """
+        with self._state:
+            if self._closed:
+                raise RuntimeError("AuditSink is closed")
+            self._writers += 1
+        try:
+            if self.overflow == "drop":
+                self._queue.put_nowait(result)
+            else:
+                self._queue.put(result, timeout=self.put_timeout)
+            return True
+        except queue.Full:
+            with self._counter_lock:
+                self._dropped += 1
+            return False
+        finally:
+            with self._state:
+                self._writers -= 1
+                if not self._writers:
+                    self._state.notify_all()
+
+    def flush(self) -> None:
+        """Block until every accepted record has been written."""
+        self._queue.join()
+
+    def close(self) -> None:
+        """Write all pending records, fsync (unless fsync="never"), and stop
+        the flusher.
+
+        Waits for write() calls already past their closed check, so every
+        record write() accepted is written before the flusher stops.
+        """
+        with self._state:
+            if self._closed:
+                return
+            self._closed = True
+            self._state.wait_for(lambda: not self._writers)
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def __enter__(self) -> "AuditSink":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def stats(self) -> AuditSinkStats:
+        """Return current counters."""
+        with self._counter_lock:
+            return AuditSinkStats(
+                written=self._written,
+                dropped=self._dropped,
+                failed=self._failed,
+                errors=self._errors,
+                batches=self._batches,
+                rotations=self._rotations,
+                queue_depth=self._queue.qsize(),
+            )
+
+    # ── Flusher side ─────────────────────────────────────────────
+
+    def _run(self) -> None:
+        """Flusher loop: collect a batch, write it, repeat until stopped.
+
+        Nothing here may raise: if this thread died, a blocking write()
+        and close() would wait forever on the full queue. Errors are
+        logged and counted in stats() instead.
+        """
+        stopping = False
+        while not stopping:
+            batch = []
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                self._idle()
+                continue
+            if item is _STOP:
+                stopping = True
+            else:
+                batch.append(item)
+            while not stopping and len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                else:
+                    batch.append(item)
+
+            try:
+                if batch:
+                    self._write_batch(batch)
+            finally:
+                for _ in range(len(batch) + (1 if stopping else 0)):
+                    self._queue.task_done()
+
+        self._close_file()
+
+    def _idle(self) -> None:
+        """No records for flush_interval: rotate by age, catch up on fsync."""
+        try:
+            self._maybe_rotate()
+            if self._unsynced and self._fsync_due():
+                self._fsync()
+        except Exception:
+            self._error("Audit sink failed to fsync %s", self.current_path)
+
+    def _write_batch(self, batch: list) -> None:
+        """Serialize and append one batch, then apply fsync policy."""
+        try:
+            lines = "".join(
+                json.dumps(r.to_dict() if isinstance(r, GuardrailResult) else r)
+                + "\n"
+                for r in batch
+            ).encode("utf-8")
+        except Exception:
+            self._error("Audit sink failed to serialize %d records", len(batch))
+            with self._counter_lock:
+                self._failed += len(batch)
+            return
+        try:
+            self._maybe_rotate()
+            if self._file is None:
+                self._open_file()
+            self._file.write(lines)
+            self._file.flush()
+        except Exception:
+            self._error("Audit sink failed to write %d records", len(batch))
+            with self._counter_lock:
+                self._failed += len(batch)
+            # A partly written (possibly gzip) segment is not appended to again.
+            self._close_file()
+            return
+        self._file_bytes += len(lines)
+        self._unsynced = True
+        with self._counter_lock:
+            self._written += len(batch)
+            self._batches += 1
+        if self._fsync_due():
+            try:
+                self._fsync()
+            except Exception:
+                self._error("Audit sink failed to fsync %s", self.current_path)
+
+    def _error(self, message: str, *args) -> None:
+        """Log the exception being handled and count it in stats().errors."""
+        logger.exception(message, *args)
+        with self._counter_lock:
+            self._errors += 1
+
+    def _maybe_rotate(self) -> None:
+        """Close the current file if it exceeded its size or age budget."""
+        if self._file is None:
+            return
+        too_big = self.rotate_bytes is not None and self._file_bytes >= self.rotate_bytes
+        too_old = (self.rotate_seconds is not None
+                   and time.monotonic() - self._file_opened >= self.rotate_seconds)
+        if too_big or too_old:
+            self._close_file()
+            with self._counter_lock:
+                self._rotations += 1
+
+    def _open_file(self) -> None:
+        """Open a new, uniquely named segment file for appending."""
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        suffix = ".jsonl.gz" if self.compress else ".jsonl"
+        while True:
+            self._sequence += 1
+            path = self.directory / f"{self.basename}-{stamp}-{self._sequence:04d}{suffix}"
+            if not path.exists():
+                break
+        self.current_path = path
+        self._file = gzip.open(path, "ab") if self.compress else open(path, "ab")
+        self._file_bytes = 0
+        self._file_opened = time.monotonic()
+
+    def _fsync_due(self) -> bool:
+        """True if the fsync policy calls for an fsync now."""
+        return self.fsync == "batch" or (
+            self.fsync == "interval"
+            and time.monotonic() - self._last_fsync >= self.fsync_interval
+        )
+
+    def _fsync(self) -> None:
+        """Force the current file to stable storage."""
+        raw = self._file.fileobj if self.compress else self._file
+        raw.flush()
+        os.fsync(raw.fileno())
+        self._last_fsync = time.monotonic()
+        self._unsynced = False
+
+    def _close_file(self) -> None:
+        """Flush, fsync (unless fsync="never"), and close the current file.
+
+        Errors are logged and counted; the file is let go either way, and
+        the next batch starts a new one.
+        """
+        if self._file is None:
+            return
+        try:
+            self._file.flush()
+            if self.fsync != "never":
+                self._fsync()
+        except Exception:
+            self._error("Audit sink failed to fsync %s", self.current_path)
+        try:
+            self._file.close()
+        except Exception:
+            self._error("Audit sink failed to close %s", self.current_path)
+        self._file = None
+        self._unsynced = False
@@ -0,0 +1,160 @@
+"""
+Opt-in memoization layer in front of classify().
+
+Production traffic repeats a lot (canned prompts, retries, UI buttons
+that resend the same text). CachedClassifier answers repeats from a
+bounded LRU cache with optional TTL instead of re-running every rule.
+
+Cache key: (query text, ruleset version). The query is used exactly as
+given. Every cheaper normalization changes rule semantics somewhere:
+state abbreviations and the [A-Z] security-ticker regex are
+case-sensitive, and produce-intent signals depend on trailing spaces.
+Including the ruleset version means a hot reload can never serve a
+decision made under old rules.
+
+Audit contract: every call returns a distinct GuardrailResult with its
+own fresh request_id and timestamp, whether it was a hit or a miss.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, replace
+
+from src.classifier import classify
+from src.models import GuardrailResult, new_request_id, utc_timestamp
+from src.rules.yaml_evaluator import active_ruleset
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """Point-in-time cache counters.
+
+    Attributes:
+        hits: Lookups answered from the cache.
+        misses: Lookups that ran the classifier (including expired entries).
+        evictions: Entries dropped to stay within maxsize.
+        expirations: Entries dropped because their TTL elapsed.
+        size: Entries currently cached.
+        maxsize: Configured capacity.
+    """
+
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    size: int
+    maxsize: int
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache (0.0 when unused)."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class CachedClassifier:
+    """Bounded LRU + TTL cache wrapping a classify function.
+
+    Thread-safe: the cache is guarded by a lock, but classification of
+    a miss runs outside it, so concurrent misses do not serialize.
+
+    Usage:
+        cached = CachedClassifier(maxsize=10_000, ttl=300)
+        result = cached.classify(query)
+        cached.stats().hit_rate
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 10_000,
+        ttl: float | None = 300.0,
+        classify_fn: Callable[[str], GuardrailResult] = classify,
+    ):
+        """
+        Args:
+            maxsize: Maximum cached entries; least recently used are
+                evicted first.
+            ttl: Seconds an entry stays valid, or None for no expiry.
+            classify_fn: The classifier to memoize.
+
+        Raises:
+            ValueError: If maxsize < 1 or ttl <= 0.
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize must be >= 1")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be positive or None")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._classify = classify_fn
+        self._entries: OrderedDict[tuple[str, str], tuple[float, GuardrailResult]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def classify(self, query: str) -> GuardrailResult:
+        """Classify a query, serving repeats from the cache."""
+        key = (query, active_ruleset().version)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, cached = entry
+                if self.ttl is None or now - stored_at < self.ttl:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return _reissue(cached)
+                del self._entries[key]
+                self._expirations += 1
+            self._misses += 1
+
+        result = self._classify(query)
+
+        # Store under the version the result was actually computed with,
+        # which can differ from `key` if a reload landed mid-call.
+        store_key = (query, result.ruleset_version or "")
+        with self._lock:
+            self._entries[store_key] = (time.monotonic(), _reissue(result))
+            self._entries.move_to_end(store_key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+        return result
+
+    __call__ = classify
+
+    def stats(self) -> CacheStats:
+        """Return the current hit/miss/eviction counters."""
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                expirations=self._expirations,
+                size=len(self._entries),
+                maxsize=self.maxsize,
+            )
+
+    def clear(self) -> None:
+        """Drop all cached entries. Counters are kept."""
+        with self._lock:
+            self._entries.clear()
+
+
+def _reissue(result: GuardrailResult) -> GuardrailResult:
+    """Copy a result with a fresh request_id and timestamp.
+
+    List fields are copied too, so a caller mutating its result cannot
+    corrupt the cached entry or other callers' results.
+    """
+    return replace(
+        result,
+        triggered_rules=list(result.triggered_rules),
+        missing_context=list(result.missing_context),
+        request_id=new_request_id(),
+        timestamp=utc_timestamp(),
+    )
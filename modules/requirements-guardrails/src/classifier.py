@@ -2,20 +2,44 @@
 Classifier orchestrator for the Requirements Guardrails module.
 
 Main entry point: classify(query) -> GuardrailResult
+Batch entry point: classify_many(queries) -> Iterator[GuardrailResult]
+Decision-only entry point: classify_fast(query) -> RoutingDecision
 
 Evaluates a query against all rule categories (compliance, suitability,
 prohibited), resolves heuristic rules via Python functions, applies
 produce-intent upgrades and context-first override logic, and returns
 a fully-populated GuardrailResult.
+
+Streaming CLI (run from the module root):
+    python -m src.classifier --in queries.jsonl --out results.jsonl --workers 4
 """
 
+import argparse
+import json
+import sys
+import time
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from itertools import islice
+
+from src.metrics import METRICS, CallRecorder
 from src.models import (
     Classification,
     Category,
     TriggeredRule,
     GuardrailResult,
+    RoutingDecision,
+)
+from src.rules.compiled import CompiledRuleSet, RuleSpec
+from src.rules.query_view import QueryView
+from src.rules.yaml_evaluator import (
+    active_ruleset,
+    evaluate_category,
+    get_signals,
+    RuleMatch,
 )
-from src.rules.yaml_evaluator import evaluate_category, get_rule_config, RuleMatch
 from src.rules.heuristics import (
     detect_produce_intent,
     has_unbalanced_claims,
@@ -26,25 +50,28 @@ from src.rules.heuristics import (
     has_account_type_context,
     is_out_of_scope,
     resolve_priority,
+    _CATEGORY_PRIORITY,
 )
 
 
 # ── Heuristic Dispatch ───────────────────────────────────────────
 
 
-def _has_gate_signals(query: str, rule_id: str, signal_key: str) -> bool:
+def _has_gate_signals(
+    view: QueryView, rule_id: str, signal_key: str, ruleset: CompiledRuleSet,
+) -> bool:
     """Check whether a rule's gate signals are present in the query.
 
-    Reads the specified signal list from the rule's YAML detection
-    config and performs case-insensitive substring matching.
+    Reads the specified pre-lowered signal set from the rule index and
+    performs case-insensitive substring matching.
     """
-    config = get_rule_config(rule_id)
-    signals = config["detection"][signal_key]
-    query_lower = query.lower()
-    return any(s.lower() in query_lower for s in signals)
+    signals = get_signals(rule_id, signal_key, ruleset)
+    return any(s in view.lower for s in signals)
 
 
-def _evaluate_heuristic(rule_id: str, query: str) -> bool:
+def _evaluate_heuristic(
+    rule_id: str, view: QueryView, ruleset: CompiledRuleSet,
+) -> bool:
     """Dispatch a heuristic rule to its Python implementation.
 
     Each heuristic rule has custom logic. Suitability rules use
@@ -53,27 +80,27 @@ def _evaluate_heuristic(rule_id: str, query: str) -> bool:
     account_type use their own YAML-defined gate signals.
     """
     if rule_id == "compliance.unbalanced_claims":
-        return has_unbalanced_claims(query)
+        return has_unbalanced_claims(view, ruleset)
 
     if rule_id == "prohibited.out_of_scope":
-        return is_out_of_scope(query)
+        return is_out_of_scope(view)
 
     # Suitability rules: gate signal + context absence
     if rule_id == "suitability.missing_risk_tolerance":
-        return (is_recommendation_request(query)
-                and not has_risk_tolerance_context(query))
+        return (is_recommendation_request(view, ruleset)
+                and not has_risk_tolerance_context(view, ruleset))
 
     if rule_id == "suitability.missing_time_horizon":
-        return (is_recommendation_request(query)
-                and not has_time_horizon_context(query))
+        return (is_recommendation_request(view, ruleset)
+                and not has_time_horizon_context(view, ruleset))
 
     if rule_id == "suitability.missing_jurisdiction":
-        return (_has_gate_signals(query, rule_id, "tax_signals")
-                and not has_jurisdiction_context(query))
+        return (_has_gate_signals(view, rule_id, "tax_signals", ruleset)
+                and not has_jurisdiction_context(view))
 
     if rule_id == "suitability.missing_account_type":
-        return (_has_gate_signals(query, rule_id, "account_signals")
-                and not has_account_type_context(query))
+        return (_has_gate_signals(view, rule_id, "account_signals", ruleset)
+                and not has_account_type_context(view, ruleset))
 
     return False
 
@@ -222,28 +249,107 @@ def classify(query: str) -> GuardrailResult:
         A GuardrailResult with classification, category, triggered_rules,
         missing_context, decision_reason, and next_action populated.
     """
-    # Step 1: Evaluate all categories
+    # Step 1: Evaluate all categories. The query is normalized once into
+    # a QueryView shared by every rule, and keyword and regex rules for
+    # every category come from a single compiled scan of that view.
+    # The ruleset is captured once, so a concurrent hot reload cannot
+    # mix rule versions within this call.
+    # `rec` is None unless metrics are enabled; every recording step
+    # below is guarded by that check so the disabled cost is nil.
+    rec = METRICS.start() if METRICS.enabled else None
+    ruleset = active_ruleset()
+    view = QueryView.from_text(query)
+    if rec is not None:
+        rec.phase("normalize")
+    fired_rules = ruleset.match(view)
+    if rec is not None:
+        rec.phase("rule_scan")
+    return _classify_view(view, ruleset, fired_rules, rec)
+
+
+def _classify_view(
+    view: QueryView,
+    ruleset: CompiledRuleSet,
+    fired_rules: set[str],
+    rec: CallRecorder | None = None,
+    heuristic_results: dict[str, bool] | None = None,
+) -> GuardrailResult:
+    """classify() from an already-scanned query: steps 1-8 after the scan.
+
+    Args:
+        view: The normalized query.
+        ruleset: Ruleset to evaluate against.
+        fired_rules: Keyword/regex rule IDs from scanning `view` with
+            `ruleset` (or an equivalent merged scan).
+        rec: Metrics recorder, or None.
+        heuristic_results: Optional rule_id -> fired memo. Entries are
+            reused and new results are stored, so a second ruleset with
+            the same heuristic signals can skip re-evaluation.
+    """
+    confirmed_matches = _confirm_matches(
+        view, ruleset, fired_rules, rec, heuristic_results,
+    )
+    return _finalize(confirmed_matches, detect_produce_intent(view), ruleset, rec)
+
+
+def _confirm_matches(
+    view: QueryView,
+    ruleset: CompiledRuleSet,
+    fired_rules: set[str],
+    rec: CallRecorder | None = None,
+    heuristic_results: dict[str, bool] | None = None,
+) -> list[RuleMatch]:
+    """Steps 1-2 of classify(): candidate rules per category, then heuristics.
+
+    Arguments as for _classify_view(). Returns the confirmed matches in
+    category and YAML order.
+    """
     all_matches: list[RuleMatch] = []
     for category in [Category.COMPLIANCE, Category.SUITABILITY, Category.PROHIBITED]:
-        all_matches.extend(evaluate_category(query, category))
+        all_matches.extend(
+            evaluate_category(view, category, fired_rules, ruleset)
+        )
+        if rec is not None:
+            rec.phase(f"evaluate_category.{category.value}")
+            rec.evaluated.extend(s.rule_id for s in ruleset.rules_in(category))
 
     # Step 2: Resolve heuristic rules — keep only confirmed matches
     confirmed_matches: list[RuleMatch] = []
     for match in all_matches:
         if match.is_heuristic:
-            if _evaluate_heuristic(match.rule_id, query):
+            if heuristic_results is not None and match.rule_id in heuristic_results:
+                fired = heuristic_results[match.rule_id]
+            elif rec is None:
+                fired = _evaluate_heuristic(match.rule_id, view, ruleset)
+            else:
+                fired = rec.time_rule(match.rule_id, _evaluate_heuristic,
+                                      match.rule_id, view, ruleset)
+            if heuristic_results is not None:
+                heuristic_results[match.rule_id] = fired
+            if fired:
                 confirmed_matches.append(match)
         else:
             # Already confirmed by keyword/regex matching
             confirmed_matches.append(match)
+    if rec is not None:
+        rec.phase("heuristics")
+    return confirmed_matches
 
-    # Step 3: Apply produce-intent upgrade
-    # Mutates RuleMatch.classification in place. Assumes upgrade target
-    # is BLOCK (see context-first override comment for implications).
-    if detect_produce_intent(query):
-        for match in confirmed_matches:
-            if match.produce_intent_upgrade is not None:
-                match.classification = match.produce_intent_upgrade
+
+def _finalize(
+    confirmed_matches: list[RuleMatch],
+    produce_intent: bool,
+    ruleset: CompiledRuleSet,
+    rec: CallRecorder | None = None,
+) -> GuardrailResult:
+    """Steps 3-8 of classify(): upgrade, override, resolve, and build the result.
+
+    Shared with ClassificationSession, which confirms matches from state
+    accumulated across turns instead of from a single query.
+    """
+    final_cls, final_cat, missing_context = _resolve_decision(
+        confirmed_matches, produce_intent, rec,
+    )
 
     # Step 4: Build triggered_rules for audit (ALL confirmed rules,
     # including those that will be suppressed by context-first override)
@@ -252,9 +358,64 @@ def classify(query: str) -> GuardrailResult:
         for m in confirmed_matches
     ]
 
+    # Step 7: Build human-readable fields
+    decision_reason = _build_decision_reason(
+        final_cls, confirmed_matches, missing_context,
+    )
+    next_action = _build_next_action(
+        final_cls, confirmed_matches, missing_context,
+    )
+
+    # Step 8: Construct result
+    result = GuardrailResult(
+        classification=final_cls,
+        category=final_cat,
+        decision_reason=decision_reason,
+        next_action=next_action,
+        triggered_rules=triggered_rules,
+        missing_context=missing_context,
+        ruleset_version=ruleset.version,
+    )
+    if rec is not None:
+        rec.phase("resolve")
+        rec.outcome = (final_cls.value, final_cat.value)
+        METRICS.commit(rec)
+    return result
+
+
+def _resolve_decision(
+    confirmed_matches: list[RuleMatch],
+    produce_intent: bool,
+    rec: CallRecorder | None = None,
+) -> tuple[Classification, Category, list[str]]:
+    """Steps 3, 5 and 6: the routing decision without the audit fields.
+
+    Applies the produce-intent upgrade (mutating the matches), the
+    context-first override and priority resolution.
+
+    Returns:
+        (classification, category, missing_context)
+    """
+    # Step 3: Apply produce-intent upgrade
+    # Mutates RuleMatch.classification in place. Assumes upgrade target
+    # is BLOCK (see context-first override comment for implications).
+    if produce_intent:
+        for match in confirmed_matches:
+            if match.produce_intent_upgrade is not None:
+                match.classification = match.produce_intent_upgrade
+                if rec is not None:
+                    rec.upgraded.append(match.rule_id)
+    if rec is not None:
+        rec.phase("produce_intent")
+
     # Step 5: Apply context-first override and resolve priority
     priority_input = _apply_context_first_override(confirmed_matches)
     final_cls, final_cat = resolve_priority(priority_input)
+    if rec is not None:
+        rec.fired.extend(m.rule_id for m in confirmed_matches)
+        routed = {t.rule_id for _, _, t in priority_input}
+        rec.suppressed.extend(m.rule_id for m in confirmed_matches
+                              if m.rule_id not in routed)
 
     # Step 6: Collect missing_context from suitability CLARIFY rules
     missing_context: list[str] = []
@@ -266,20 +427,282 @@ def classify(query: str) -> GuardrailResult:
                     if ctx not in missing_context:
                         missing_context.append(ctx)
 
-    # Step 7: Build human-readable fields
-    decision_reason = _build_decision_reason(
-        final_cls, confirmed_matches, missing_context,
+    return final_cls, final_cat, missing_context
+
+
+# ── Decision-Only Fast Path ──────────────────────────────────────
+#
+# classify_fast() returns the same (classification, category) as
+# classify() but stops evaluating as soon as the answer is fixed.
+#
+# Why early exit is exact: resolve_priority picks the highest
+# classification level, then the highest category at that level. So if
+# rules are visited level by level (BLOCK, ESCALATE, CLARIFY) and, within
+# a level, category by category in tiebreak order, the first confirmed
+# rule that survives priority resolution is the winner. Two details keep
+# this equivalent to the full path:
+#   - Produce intent is detected up front, so each rule is visited at
+#     its effective level (upgraded or default).
+#   - A compliance ESCALATE rule only wins if no suitability CLARIFY
+#     rule fires (context-first override). That check is resolved
+#     lazily, only when a compliance ESCALATE rule is confirmed.
+# Keyword/regex rules are confirmed from the single compiled scan;
+# heuristic rules are evaluated only when reached, at most once each.
+
+
+_DECISION_LEVELS = (
+    Classification.BLOCK,
+    Classification.ESCALATE,
+    Classification.CLARIFY,
+)
+
+
+def _effective_classification(spec: RuleSpec, produce_intent: bool) -> Classification:
+    """The level a rule would have after the produce-intent upgrade."""
+    if produce_intent and spec.produce_intent_upgrade is not None:
+        return spec.produce_intent_upgrade
+    return spec.classification
+
+
+@lru_cache(maxsize=8)
+def _fast_path_plan(
+    ruleset: CompiledRuleSet, produce_intent: bool,
+) -> tuple[tuple[tuple[Classification, Category, tuple[RuleSpec, ...]], ...],
+           tuple[RuleSpec, ...]]:
+    """Precompute the visiting order for one ruleset and produce flag.
+
+    Returns:
+        (steps, suitability_clarify) where steps is a tuple of
+        (level, category, rules at that effective level) in priority
+        order, and suitability_clarify lists the suitability rules whose
+        effective level is CLARIFY (the context-first override trigger).
+    """
+    categories = sorted(
+        ruleset.configs, key=lambda c: _CATEGORY_PRIORITY.get(c, -1), reverse=True,
     )
-    next_action = _build_next_action(
-        final_cls, confirmed_matches, missing_context,
+    steps = []
+    for level in _DECISION_LEVELS:
+        for category in categories:
+            specs = tuple(
+                spec for spec in ruleset.rules_in(category)
+                if _effective_classification(spec, produce_intent) == level
+            )
+            if specs:
+                steps.append((level, category, specs))
+    suitability_clarify = tuple(
+        spec for spec in ruleset.rules_in(Category.SUITABILITY)
+        if _effective_classification(spec, produce_intent) == Classification.CLARIFY
     )
+    return tuple(steps), suitability_clarify
 
-    # Step 8: Construct result
-    return GuardrailResult(
-        classification=final_cls,
-        category=final_cat,
-        decision_reason=decision_reason,
-        next_action=next_action,
-        triggered_rules=triggered_rules,
-        missing_context=missing_context,
+
+def classify_fast(query: str) -> RoutingDecision:
+    """Return only the routing decision, short-circuiting when it is fixed.
+
+    Produces exactly the classification and category classify() would
+    for the same query and ruleset, but skips building triggered_rules,
+    decision_reason, and next_action, and stops evaluating heuristics
+    as soon as no remaining rule can change the outcome. BLOCK traffic
+    from keyword/regex rules exits without running any heuristic except
+    produce-intent detection.
+
+    Args:
+        query: The user's input text.
+
+    Returns:
+        A RoutingDecision. Callers needing the audit record must use
+        classify().
+    """
+    ruleset = active_ruleset()
+    view = QueryView.from_text(query)
+    fired_rules = ruleset.match(view)
+    steps, suitability_clarify = _fast_path_plan(ruleset, detect_produce_intent(view))
+
+    heuristic_results: dict[str, bool] = {}
+
+    def confirmed(spec: RuleSpec) -> bool:
+        if spec.detection_type != "heuristic":
+            return spec.rule_id in fired_rules
+        if spec.rule_id not in heuristic_results:
+            heuristic_results[spec.rule_id] = _evaluate_heuristic(
+                spec.rule_id, view, ruleset,
+            )
+        return heuristic_results[spec.rule_id]
+
+    context_gap: bool | None = None
+    for level, category, specs in steps:
+        if not any(confirmed(spec) for spec in specs):
+            continue
+        if level == Classification.ESCALATE and category == Category.COMPLIANCE:
+            if context_gap is None:
+                context_gap = any(confirmed(spec) for spec in suitability_clarify)
+            if context_gap:
+                continue  # Suppressed by the context-first override
+        return RoutingDecision(level, category, ruleset.version)
+
+    return RoutingDecision(Classification.PROCEED, Category.NONE, ruleset.version)
+
+
+# ── Batch Classification ─────────────────────────────────────────
+
+
+def _classify_chunk(queries: list[str]) -> list[GuardrailResult]:
+    """Classify a chunk of queries. Module-level so worker processes can
+    unpickle it by reference."""
+    return [classify(q) for q in queries]
+
+
+def _map_chunks(fn, items: Iterable, workers: int, chunksize: int) -> Iterator:
+    """Apply a chunk function to `items`, yielding flattened results in order.
+
+    With workers > 1 chunks run in a process pool with at most
+    2 * workers chunks in flight, so the input is consumed lazily and
+    memory stays flat (ProcessPoolExecutor.map would submit the entire
+    iterable up front).
+
+    Raises:
+        ValueError: At call time, not on first iteration, if workers or
+            chunksize is less than 1.
+    """
+    if workers < 1 or chunksize < 1:
+        raise ValueError("workers and chunksize must be >= 1")
+    return _iter_chunks(fn, items, workers, chunksize)
+
+
+def _iter_chunks(fn, items: Iterable, workers: int, chunksize: int) -> Iterator:
+    """Generator behind _map_chunks, which validates its arguments."""
+    it = iter(items)
+    chunks = iter(lambda: list(islice(it, chunksize)), [])
+
+    if workers == 1:
+        for chunk in chunks:
+            yield from fn(chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight: deque = deque()
+        for chunk in chunks:
+            in_flight.append(pool.submit(fn, chunk))
+            if len(in_flight) >= 2 * workers:
+                yield from in_flight.popleft().result()
+        while in_flight:
+            yield from in_flight.popleft().result()
+
+
+def classify_many(
+    queries: Iterable[str],
+    workers: int = 1,
+    chunksize: int = 256,
+) -> Iterator[GuardrailResult]:
+    """Classify a stream of queries, yielding results in input order.
+
+    With workers=1 queries are classified in-process. With workers > 1
+    chunks of queries fan out to a process pool; only a bounded number
+    of chunks is in flight at once, so arbitrarily long inputs (e.g. a
+    multi-million-row query log) are processed in flat memory.
+
+    Args:
+        queries: Any iterable of query strings, consumed lazily.
+        workers: Number of worker processes. 1 disables the pool.
+        chunksize: Queries per task sent to a worker.
+
+    Yields:
+        One GuardrailResult per query, in the same order as the input.
+
+    Raises:
+        ValueError: If workers or chunksize is less than 1.
+    """
+    return _map_chunks(_classify_chunk, queries, workers, chunksize)
+
+
+# ── Streaming JSONL CLI ──────────────────────────────────────────
+
+
+def _read_records(lines: Iterable[str], field: str,
+                  id_field: str) -> Iterator[tuple[object, str]]:
+    """Parse JSONL input lazily into (record_id, query) pairs.
+
+    Each line is either a JSON object carrying the query under `field`
+    (and optionally an ID under `id_field`) or a bare JSON string.
+    Blank lines are skipped.
+    """
+    for line_no, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        if isinstance(record, str):
+            yield None, record
+        elif isinstance(record, dict) and isinstance(record.get(field), str):
+            yield record.get(id_field), record[field]
+        else:
+            raise ValueError(
+                f"line {line_no}: expected a JSON string or an object "
+                f"with a string {field!r} field"
+            )
+
+
+def _classify_records(id_field: str, records: list[tuple[object, str]]) -> list[str]:
+    """Classify (record_id, query) pairs into serialized JSONL lines.
+
+    Serialization happens in the worker so the parent process only
+    writes lines, keeping it off the critical path at high worker counts.
+    """
+    lines = []
+    for record_id, query in records:
+        out = classify(query).to_dict()
+        if record_id is not None:
+            out[id_field] = record_id
+        lines.append(json.dumps(out) + "\n")
+    return lines
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Stream a JSONL query file through the classifier into a JSONL file.
+
+    Writes one GuardrailResult.to_dict() per input query, in input
+    order, and reports throughput on stderr.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m src.classifier",
+        description="Classify a JSONL query log with the guardrails classifier.",
     )
+    parser.add_argument("--in", dest="input", required=True,
+                        help="Input JSONL path ('-' for stdin)")
+    parser.add_argument("--out", dest="output", required=True,
+                        help="Output JSONL path ('-' for stdout)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Worker processes (default: 1, in-process)")
+    parser.add_argument("--chunksize", type=int, default=256,
+                        help="Queries per worker task (default: 256)")
+    parser.add_argument("--field", default="query",
+                        help="Input object field holding the query (default: query)")
+    parser.add_argument("--id-field", default="id",
+                        help="Input field copied to the output record when "
+                             "present (default: id)")
+    args = parser.parse_args(argv)
+
+    src = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    dst = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    count = 0
+    start = time.perf_counter()
+    try:
+        records = _read_records(src, args.field, args.id_field)
+        worker_fn = partial(_classify_records, args.id_field)
+        for line in _map_chunks(worker_fn, records, args.workers, args.chunksize):
+            dst.write(line)
+            count += 1
+    finally:
+        if src is not sys.stdin:
+            src.close()
+        if dst is not sys.stdout:
+            dst.close()
+
+    elapsed = time.perf_counter() - start
+    rate = count / elapsed if elapsed > 0 else 0.0
+    print(f"classified {count} queries in {elapsed:.2f}s "
+          f"({rate:,.0f} queries/sec, workers={args.workers})", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
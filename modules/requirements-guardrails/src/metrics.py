@@ -0,0 +1,247 @@
+"""
+Optional per-rule instrumentation for classify().
+
+Off by default. When disabled, classify() pays one attribute check per
+call. When enabled, each call collects its observations locally and
+commits them under one lock acquisition at the end:
+
+    guardrail_classifications_total{classification, category}
+    guardrail_rule_evaluated_total{rule_id}
+    guardrail_rule_fired_total{rule_id}
+    guardrail_rule_suppressed_total{rule_id}   context-first override
+    guardrail_rule_upgraded_total{rule_id}     produce-intent upgrade
+    guardrail_rule_latency_seconds{rule_id}    heuristic rules
+    guardrail_phase_latency_seconds{phase}     normalize, rule_scan, ...
+
+Keyword and regex rules are all decided by one rule scan, so their
+cost is reported as the rule_scan phase rather than per rule.
+
+Usage:
+    from src import metrics
+    metrics.enable()
+    metrics.serve(port=9464)          # or: print(metrics.render_prometheus())
+
+Metrics are per process; classify_many(workers > 1) runs in child
+processes whose metrics are not aggregated here.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Histogram bucket upper bounds in seconds, from 1µs to 10ms; slower
+# observations land in +Inf.
+BUCKETS: tuple[float, ...] = (
+    1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5,
+    1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 1e-2,
+)
+_BUCKETS_NS = tuple(int(b * 1e9) for b in BUCKETS)
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram fed nanosecond observations."""
+
+    __slots__ = ("counts", "total_ns", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total_ns = 0
+        self.count = 0
+
+    def observe(self, ns: int) -> None:
+        self.counts[bisect_left(_BUCKETS_NS, ns)] += 1
+        self.total_ns += ns
+        self.count += 1
+
+
+class CallRecorder:
+    """Observations from a single classify() call.
+
+    Built only when metrics are enabled; committed once at the end of
+    the call so the shared registry lock is taken once per query.
+    """
+
+    __slots__ = ("evaluated", "fired", "suppressed", "upgraded",
+                 "rule_ns", "phase_ns", "outcome", "_mark")
+
+    def __init__(self):
+        self.evaluated: list[str] = []
+        self.fired: list[str] = []
+        self.suppressed: list[str] = []
+        self.upgraded: list[str] = []
+        self.rule_ns: list[tuple[str, int]] = []
+        self.phase_ns: list[tuple[str, int]] = []
+        self.outcome: tuple[str, str] | None = None
+        self._mark = time.perf_counter_ns()
+
+    def phase(self, name: str) -> None:
+        """Close the phase that started at the previous mark."""
+        now = time.perf_counter_ns()
+        self.phase_ns.append((name, now - self._mark))
+        self._mark = now
+
+    def time_rule(self, rule_id: str, fn, *args) -> bool:
+        """Call a heuristic rule's function and record its latency."""
+        start = time.perf_counter_ns()
+        result = fn(*args)
+        self.rule_ns.append((rule_id, time.perf_counter_ns() - start))
+        return result
+
+
+class GuardrailMetrics:
+    """Process-wide metric registry.
+
+    Attributes:
+        enabled: When False, classify() records nothing.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Zero every counter and histogram."""
+        with self._lock:
+            self.classifications: Counter = Counter()
+            self.evaluated: Counter = Counter()
+            self.fired: Counter = Counter()
+            self.suppressed: Counter = Counter()
+            self.upgraded: Counter = Counter()
+            self.rule_latency: dict[str, Histogram] = {}
+            self.phase_latency: dict[str, Histogram] = {}
+
+    def start(self) -> CallRecorder:
+        """Begin recording one classify() call."""
+        return CallRecorder()
+
+    def commit(self, rec: CallRecorder) -> None:
+        """Fold one call's observations into the registry."""
+        with self._lock:
+            if rec.outcome is not None:
+                self.classifications[rec.outcome] += 1
+            self.evaluated.update(rec.evaluated)
+            self.fired.update(rec.fired)
+            self.suppressed.update(rec.suppressed)
+            self.upgraded.update(rec.upgraded)
+            for rule_id, ns in rec.rule_ns:
+                hist = self.rule_latency.get(rule_id)
+                if hist is None:
+                    hist = self.rule_latency[rule_id] = Histogram()
+                hist.observe(ns)
+            for phase, ns in rec.phase_ns:
+                hist = self.phase_latency.get(phase)
+                if hist is None:
+                    hist = self.phase_latency[phase] = Histogram()
+                hist.observe(ns)
+
+    def render_prometheus(self) -> str:
+        """Return every metric in Prometheus text exposition format."""
+        lines: list[str] = []
+        with self._lock:
+            _render_counter(
+                lines, "guardrail_classifications_total",
+                "Classifications by final outcome.",
+                {(("classification", c), ("category", cat)): n
+                 for (c, cat), n in self.classifications.items()},
+            )
+            for name, help_text, counter in (
+                ("guardrail_rule_evaluated_total", "Times a rule was considered.", self.evaluated),
+                ("guardrail_rule_fired_total", "Times a rule fired (confirmed match).", self.fired),
+                ("guardrail_rule_suppressed_total",
+                 "Fired rules suppressed from routing by the context-first override.", self.suppressed),
+                ("guardrail_rule_upgraded_total",
+                 "Fired rules upgraded by produce intent.", self.upgraded),
+            ):
+                _render_counter(lines, name, help_text,
+                                {(("rule_id", r),): n for r, n in counter.items()})
+            _render_histograms(lines, "guardrail_rule_latency_seconds",
+                               "Heuristic rule evaluation latency.",
+                               "rule_id", self.rule_latency)
+            _render_histograms(lines, "guardrail_phase_latency_seconds",
+                               "classify() phase latency.",
+                               "phase", self.phase_latency)
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(pairs) -> str:
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _render_counter(lines: list[str], name: str, help_text: str, values: dict) -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} counter")
+    for labels, value in sorted(values.items()):
+        lines.append(f"{name}{_labels(labels)} {value}")
+
+
+def _render_histograms(lines: list[str], name: str, help_text: str,
+                       label: str, hists: dict[str, Histogram]) -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for key in sorted(hists):
+        hist = hists[key]
+        cumulative = 0
+        for bound, n in zip(BUCKETS, hist.counts):
+            cumulative += n
+            lines.append(f"{name}_bucket{_labels([(label, key), ('le', repr(bound))])} {cumulative}")
+        lines.append(f"{name}_bucket{_labels([(label, key), ('le', '+Inf')])} {hist.count}")
+        lines.append(f"{name}_sum{_labels([(label, key)])} {hist.total_ns / 1e9:.9f}")
+        lines.append(f"{name}_count{_labels([(label, key)])} {hist.count}")
+
+
+METRICS = GuardrailMetrics()
+
+
+def enable() -> None:
+    """Start recording metrics in classify()."""
+    METRICS.enabled = True
+
+
+def disable() -> None:
+    """Stop recording. Collected values are kept until reset()."""
+    METRICS.enabled = False
+
+
+def reset() -> None:
+    """Zero all collected metrics."""
+    METRICS.reset()
+
+
+def render_prometheus() -> str:
+    """Return the process's metrics in Prometheus text format."""
+    return METRICS.render_prometheus()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(port: int = 9464, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serve GET /metrics from a daemon thread.
+
+    Returns the server; call .shutdown() to stop it. Binds to localhost
+    by default — expose it deliberately, not by accident.
+    """
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="guardrail-metrics",
+                     daemon=True).start()
+    return server
@@ -67,6 +67,16 @@ class TriggeredRule:
     description: str
 
 
+def new_request_id() -> str:
+    """Return a fresh unique request identifier."""
+    return str(uuid4())
+
+
+def utc_timestamp() -> str:
+    """Return the current time as an ISO-8601 UTC timestamp."""
+    return datetime.now(timezone.utc).isoformat()
+
+
 @dataclass
 class GuardrailResult:
     """The complete output contract for a single classification request.
@@ -87,6 +97,9 @@ class GuardrailResult:
                          only one determines the final classification.
         missing_context: Fields the user must provide (CLARIFY only).
                          Empty list for non-CLARIFY decisions.
+        ruleset_version: Content hash of the guardrail ruleset the
+                         request was evaluated against, so audit records
+                         can be tied to the exact YAML rules in force.
     """
 
     classification: Classification
@@ -95,10 +108,9 @@ class GuardrailResult:
     next_action: str
     triggered_rules: list[TriggeredRule] = field(default_factory=list)
     missing_context: list[str] = field(default_factory=list)
-    request_id: str = field(default_factory=lambda: str(uuid4()))
-    timestamp: str = field(
-        default_factory=lambda: datetime.now(timezone.utc).isoformat()
-    )
+    ruleset_version: Optional[str] = None
+    request_id: str = field(default_factory=new_request_id)
+    timestamp: str = field(default_factory=utc_timestamp)
 
     def to_dict(self) -> dict:
         """Serialize to a plain dict for JSON output and audit logging."""
@@ -106,3 +118,24 @@ class GuardrailResult:
         result["classification"] = self.classification.value
         result["category"] = self.category.value
         return result
+
+
+@dataclass(frozen=True)
+class RoutingDecision:
+    """Decision-only output of the classify_fast() path.
+
+    Carries the routing decision without the audit fields of
+    GuardrailResult (triggered_rules, decision_reason, next_action).
+    Intended for edge pre-filters that only need to route; requests
+    that proceed past the edge are still fully classified and audited.
+
+    Attributes:
+        classification: Routing decision — always identical to what
+            classify() returns for the same query and ruleset.
+        category: Reporting category, identical to classify().
+        ruleset_version: Content hash of the ruleset used.
+    """
+
+    classification: Classification
+    category: Category
+    ruleset_version: Optional[str] = None
@@ -0,0 +1,157 @@
+"""
+Precompiled ruleset artifact for fast cold start.
+
+Parsing the three category YAML files and compiling the matchers
+dominates import time in short-lived workers. A build step serializes
+the compiled CompiledRuleSet (rule index, signal sets, keyword automaton,
+compiled regexes) into a single binary file:
+
+    magic (8s) | format version (H) | key (32s) | pickle payload
+
+The key is the ruleset version (content hash of the YAML sources)
+followed by a fingerprint of the compiler source files. At import the
+registry hashes the YAML bytes — cheap, no parsing — and loads the
+artifact only when both halves match; otherwise it falls back to
+compiling from YAML. An edited rule file or an updated compiler
+therefore can never serve a stale ruleset.
+
+The payload is a pickle. Only load artifacts produced by your own build
+(the default path lives inside the package, next to the YAML).
+
+Build (from the module root):
+    python -m src.rules.artifact build
+    python -m src.rules.artifact check
+"""
+
+import argparse
+import hashlib
+import logging
+import pickle
+import struct
+import sys
+from pathlib import Path
+
+from src.rules.compiled import CompiledRuleSet
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ARTIFACT_NAME = "ruleset.compiled"
+
+MAGIC = b"GRDRULES"
+# Bump when the artifact layout changes. Changes to the pickled classes
+# are covered by the compiler fingerprint.
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("!8sH32s")
+
+# Source files whose classes are pickled into the artifact.
+_COMPILER_SOURCES = ("compiled.py", "matcher.py")
+
+
+def compiler_fingerprint() -> str:
+    """Return a 16-hex-digit hash of the rule compiler's source code."""
+    digest = hashlib.sha256()
+    here = Path(__file__).parent
+    for name in _COMPILER_SOURCES:
+        digest.update(name.encode())
+        digest.update(b"\0")
+        digest.update((here / name).read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def artifact_key(version: str) -> bytes:
+    """Return the header key for a ruleset version under this compiler."""
+    return (version + compiler_fingerprint()).encode("ascii")
+
+
+def write_artifact(ruleset: CompiledRuleSet, path: Path) -> None:
+    """Serialize a compiled ruleset to `path` (atomically replaced).
+
+    Raises:
+        ValueError: If the ruleset has no version (ad-hoc rulesets
+            cannot be keyed to their sources).
+    """
+    if not ruleset.version:
+        raise ValueError("Cannot write an artifact for an unversioned ruleset")
+    path = Path(path)
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, artifact_key(ruleset.version))
+    payload = pickle.dumps(ruleset, protocol=pickle.HIGHEST_PROTOCOL)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(header + payload)
+    tmp.replace(path)
+
+
+def read_artifact(path: Path, version: str) -> CompiledRuleSet | None:
+    """Load the artifact at `path` if it was built from `version`.
+
+    Returns:
+        The compiled ruleset, or None when the file is missing, stale,
+        from another format version, or unreadable. Never raises for
+        a bad artifact — the caller falls back to YAML.
+    """
+    try:
+        data = Path(path).read_bytes()
+    except FileNotFoundError:
+        return None
+    except OSError as e:
+        logger.warning("Cannot read ruleset artifact %s: %s", path, e)
+        return None
+
+    if len(data) < _HEADER.size:
+        logger.warning("Ruleset artifact %s is truncated; compiling from YAML", path)
+        return None
+    magic, fmt, key = _HEADER.unpack_from(data)
+    if magic != MAGIC or fmt != FORMAT_VERSION:
+        logger.info("Ruleset artifact %s has an unknown format; compiling from YAML", path)
+        return None
+    if key != artifact_key(version):
+        logger.info("Ruleset artifact %s is stale; compiling from YAML", path)
+        return None
+
+    try:
+        ruleset = pickle.loads(data[_HEADER.size:])
+    except Exception:
+        logger.warning("Ruleset artifact %s is corrupt; compiling from YAML",
+                       path, exc_info=True)
+        return None
+    if not isinstance(ruleset, CompiledRuleSet) or ruleset.version != version:
+        logger.warning("Ruleset artifact %s holds the wrong ruleset; "
+                       "compiling from YAML", path)
+        return None
+    return ruleset
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Build or check the precompiled ruleset artifact."""
+    # Imported here: the registry imports this module to load artifacts.
+    from src.rules.registry import load_ruleset, ruleset_version, _read_sources
+
+    default_config = Path(__file__).parent.parent / "config"
+    parser = argparse.ArgumentParser(
+        prog="python -m src.rules.artifact",
+        description="Build or check the precompiled guardrail ruleset artifact.",
+    )
+    parser.add_argument("command", choices=("build", "check"))
+    parser.add_argument("--config-dir", type=Path, default=default_config,
+                        help="Directory holding the category YAML files")
+    parser.add_argument("--out", type=Path,
+                        help=f"Artifact path (default: <config-dir>/{DEFAULT_ARTIFACT_NAME})")
+    args = parser.parse_args(argv)
+    path = args.out or args.config_dir / DEFAULT_ARTIFACT_NAME
+
+    if args.command == "build":
+        ruleset = load_ruleset(args.config_dir)
+        write_artifact(ruleset, path)
+        print(f"wrote {path} (ruleset {ruleset.version}, "
+              f"{path.stat().st_size:,} bytes)")
+        return 0
+
+    version = ruleset_version(_read_sources(args.config_dir))
+    if read_artifact(path, version) is None:
+        print(f"{path} is missing or stale for ruleset {version}", file=sys.stderr)
+        return 1
+    print(f"{path} is current (ruleset {version})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+"""
+Compiled form of the YAML rule configs.
+
+CompiledRuleSet is built once from the loaded configs. It holds an
+immutable index of every rule (rule_id -> RuleSpec, with enum values
+resolved and signal lists pre-lowered) and answers a single question
+per query: which keyword and regex rules fire? Keyword rules go through
+the Aho-Corasick KeywordMatcher; regex patterns are compiled once at
+load time and searched per rule.
+"""
+
+import re
+from collections.abc import Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
+
+from src.models import Classification, Category
+from src.rules.matcher import KeywordMatcher
+from src.rules.query_view import QueryView, as_view
+
+
+@dataclass(frozen=True)
+class RuleSpec:
+    """A single YAML rule with every field resolved at load time.
+
+    Attributes:
+        rule_id: e.g. "compliance.guarantee_language"
+        category: Which category config the rule came from.
+        description: Human-readable description, whitespace-stripped.
+        classification: The rule's default classification.
+        detection_type: "keyword", "regex", or "heuristic".
+        produce_intent_upgrade: Upgraded classification when
+            produce-intent is detected, or None.
+        missing_context: From YAML missing_context (suitability rules).
+        patterns: Keyword/regex patterns as written in YAML.
+        signals: Heuristic signal lists (every list-valued detection key
+            other than patterns), lowercased and deduplicated.
+    """
+
+    rule_id: str
+    category: Category
+    description: str
+    classification: Classification
+    detection_type: str
+    produce_intent_upgrade: Classification | None
+    missing_context: tuple[str, ...]
+    patterns: tuple[str, ...]
+    signals: Mapping[str, frozenset[str]]
+
+    @classmethod
+    def from_config(cls, rule: dict, category: Category) -> "RuleSpec":
+        """Resolve a raw YAML rule dict into a RuleSpec."""
+        detection = rule["detection"]
+        upgrade_value = rule.get("produce_intent_upgrade")
+        return cls(
+            rule_id=rule["id"],
+            category=category,
+            description=rule["description"].strip(),
+            classification=Classification(rule["classification"]),
+            detection_type=detection["type"],
+            produce_intent_upgrade=(
+                Classification(upgrade_value) if upgrade_value else None
+            ),
+            missing_context=tuple(rule.get("missing_context", [])),
+            patterns=tuple(detection.get("patterns", [])),
+            signals=MappingProxyType({
+                key: frozenset(str(s).lower() for s in values)
+                for key, values in detection.items()
+                if key != "patterns" and isinstance(values, list)
+            }),
+        )
+
+    # MappingProxyType cannot be pickled; round-trip signals as a dict
+    # so rulesets can be stored as precompiled artifacts.
+    def __getstate__(self) -> dict:
+        state = dict(self.__dict__)
+        state["signals"] = dict(self.signals)
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        state["signals"] = MappingProxyType(state["signals"])
+        self.__dict__.update(state)
+
+
+def compile_regex_rules(
+    rules: list[tuple[str, list[str]]],
+) -> tuple[tuple[str, tuple[re.Pattern, ...]], ...]:
+    """Compile each regex rule's patterns once, case-insensitively.
+
+    Precompiled patterns skip the re module's cache lookup and, once a
+    rule set outgrows its 512-entry cache, recompiling every pattern on
+    every query. One combined lookahead pattern over all rules measured
+    slower than these per-pattern searches at every rule count, and a
+    union prefilter ahead of them saved nothing (benchmarks/regex_rules.py).
+
+    Args:
+        rules: (rule_id, patterns) pairs.
+
+    Returns:
+        (rule_id, compiled patterns) pairs, skipping rules without patterns.
+
+    Raises:
+        ValueError: If a pattern fails to compile, naming its rule.
+    """
+    compiled = []
+    for rule_id, patterns in rules:
+        try:
+            searches = tuple(re.compile(p, re.IGNORECASE) for p in patterns)
+        except re.error as e:
+            raise ValueError(f"Invalid regex in rule {rule_id}: {e.pattern!r} ({e})") from e
+        if searches:
+            compiled.append((rule_id, searches))
+    return tuple(compiled)
+
+
+class CompiledRuleSet:
+    """Rule index plus keyword and regex rules compiled for single-pass matching.
+
+    Attributes:
+        configs: The raw YAML config dicts the set was compiled from.
+        version: Content hash of the sources the set was compiled from
+            (see registry.ruleset_version); empty for ad-hoc sets.
+        keyword_matcher: Aho-Corasick automaton over keyword patterns.
+        regex_rules: (rule_id, compiled patterns) for every regex rule.
+    """
+
+    def __init__(self, configs: Mapping[Category, dict], version: str = ""):
+        self.configs = MappingProxyType(dict(configs))
+        self.version = version
+        self._raw_rules = MappingProxyType({
+            rule["id"]: rule
+            for config in configs.values()
+            for rule in config["rules"]
+        })
+        self._by_category = MappingProxyType({
+            category: tuple(
+                RuleSpec.from_config(rule, category) for rule in config["rules"]
+            )
+            for category, config in configs.items()
+        })
+        self._rules = MappingProxyType({
+            spec.rule_id: spec
+            for specs in self._by_category.values()
+            for spec in specs
+        })
+        self.keyword_matcher = KeywordMatcher(
+            (spec.rule_id, spec.patterns)
+            for spec in self._rules.values()
+            if spec.detection_type == "keyword"
+        )
+        self.regex_rules = compile_regex_rules([
+            (spec.rule_id, list(spec.patterns))
+            for spec in self._rules.values()
+            if spec.detection_type == "regex"
+        ])
+
+    # Read-only views that are stored as plain dicts when pickled.
+    _PROXIED_ATTRS = ("configs", "_raw_rules", "_by_category", "_rules")
+
+    def __getstate__(self) -> dict:
+        state = dict(self.__dict__)
+        for name in self._PROXIED_ATTRS:
+            state[name] = dict(state[name])
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        for name in self._PROXIED_ATTRS:
+            state[name] = MappingProxyType(state[name])
+        self.__dict__.update(state)
+
+    # ── Rule index ───────────────────────────────────────────────
+
+    def rules_in(self, category: Category) -> tuple[RuleSpec, ...]:
+        """Return the category's rules in YAML order.
+
+        Raises:
+            KeyError: If the category has no config (e.g. Category.NONE).
+        """
+        return self._by_category[category]
+
+    def rule(self, rule_id: str) -> RuleSpec | None:
+        """Return the RuleSpec for a rule ID, or None if unknown."""
+        return self._rules.get(rule_id)
+
+    def raw_rule(self, rule_id: str) -> dict | None:
+        """Return the raw YAML rule dict for a rule ID, or None if unknown."""
+        return self._raw_rules.get(rule_id)
+
+    def signals(self, rule_id: str, signal_key: str) -> frozenset[str]:
+        """Return a rule's pre-lowered signal set.
+
+        Raises:
+            KeyError: If the rule or the signal key does not exist — a
+                typo in a heuristic should fail loudly, not match nothing.
+        """
+        return self._rules[rule_id].signals[signal_key]
+
+    # ── Matching ─────────────────────────────────────────────────
+
+    def match_regex(self, query: str) -> set[str]:
+        """Return the IDs of all regex rules that match the query."""
+        return {
+            rule_id
+            for rule_id, patterns in self.regex_rules
+            if any(p.search(query) for p in patterns)
+        }
+
+    def match_keywords(self, query: str) -> set[str]:
+        """Return the IDs of all keyword rules with a pattern in the query."""
+        return self.keyword_matcher.scan(query.lower())
+
+    def match(self, query: "str | QueryView") -> set[str]:
+        """Return the IDs of every keyword and regex rule that fires."""
+        view = as_view(query)
+        return self.keyword_matcher.scan(view.lower) | self.match_regex(view.text)
@@ -6,14 +6,18 @@ Each function corresponds to a YAML rule with detection.type: heuristic,
 or to a cross-cutting classification mechanism (produce-intent detection,
 priority resolution).
 
-All functions receive the query text and return a boolean (whether the
-heuristic triggered) or a structured result.
+All functions receive the query — as plain text or as the QueryView the
+classifier builds once per call — and return a boolean (whether the
+heuristic triggered) or a structured result. Functions that read signal
+lists from YAML take an optional `ruleset`; the classifier passes the
+ruleset it captured for the call, and standalone callers get the active
+one.
 """
 
-import re
-
 from src.models import Classification, Category, TriggeredRule
-from src.rules.yaml_evaluator import get_rule_config
+from src.rules.compiled import CompiledRuleSet
+from src.rules.query_view import QueryView, as_view
+from src.rules.yaml_evaluator import get_signals
 
 
 # ── Produce-Intent Detection ─────────────────────────────────────
@@ -48,7 +52,7 @@ _PRODUCE_SIGNALS = [
 ]
 
 
-def detect_produce_intent(query: str) -> bool:
+def detect_produce_intent(query: str | QueryView) -> bool:
     """Determine whether the query asks the system to generate content.
 
     Returns True when the query asks the system to produce, write, draft,
@@ -63,28 +67,32 @@ def detect_produce_intent(query: str) -> bool:
     Used by the classifier to apply produce_intent_upgrade on eligible
     compliance rules.
     """
-    query_lower = query.lower()
+    query_lower = as_view(query).lower
     return any(signal in query_lower for signal in _PRODUCE_SIGNALS)
 
 
 # ── Compliance Heuristics ─────────────────────────────────────────
 
 
-def has_unbalanced_claims(query: str) -> bool:
+def has_unbalanced_claims(
+    query: str | QueryView, ruleset: CompiledRuleSet | None = None,
+) -> bool:
     """Detect benefit language without corresponding risk disclosure.
 
     Returns True when benefit_signals are present AND risk_signals
     are absent. Signal lists are loaded from compliance.yaml
     (compliance.unbalanced_claims rule).
     """
-    config = get_rule_config("compliance.unbalanced_claims")
-    detection = config["detection"]
-    benefit_signals = detection["benefit_signals"]
-    risk_signals = detection["risk_signals"]
+    benefit_signals = get_signals(
+        "compliance.unbalanced_claims", "benefit_signals", ruleset,
+    )
+    risk_signals = get_signals(
+        "compliance.unbalanced_claims", "risk_signals", ruleset,
+    )
 
-    query_lower = query.lower()
-    has_benefits = any(s.lower() in query_lower for s in benefit_signals)
-    has_risks = any(s.lower() in query_lower for s in risk_signals)
+    query_lower = as_view(query).lower
+    has_benefits = any(s in query_lower for s in benefit_signals)
+    has_risks = any(s in query_lower for s in risk_signals)
 
     return has_benefits and not has_risks
 
@@ -92,7 +100,9 @@ def has_unbalanced_claims(query: str) -> bool:
 # ── Suitability Heuristics ────────────────────────────────────────
 
 
-def is_recommendation_request(query: str) -> bool:
+def is_recommendation_request(
+    query: str | QueryView, ruleset: CompiledRuleSet | None = None,
+) -> bool:
     """Detect whether the query is seeking a recommendation or advice.
 
     Gate function for suitability.missing_risk_tolerance and
@@ -103,34 +113,41 @@ def is_recommendation_request(query: str) -> bool:
     Signal list loaded from suitability.missing_risk_tolerance
     (recommendation_signals shared across recommendation-gated rules).
     """
-    config = get_rule_config("suitability.missing_risk_tolerance")
-    signals = config["detection"]["recommendation_signals"]
-    query_lower = query.lower()
-    return any(s.lower() in query_lower for s in signals)
+    signals = get_signals(
+        "suitability.missing_risk_tolerance", "recommendation_signals", ruleset,
+    )
+    query_lower = as_view(query).lower
+    return any(s in query_lower for s in signals)
 
 
-def has_risk_tolerance_context(query: str) -> bool:
+def has_risk_tolerance_context(
+    query: str | QueryView, ruleset: CompiledRuleSet | None = None,
+) -> bool:
     """Check whether risk tolerance is stated in the query.
 
     Returns True if any context_signals from
     suitability.missing_risk_tolerance are present.
     """
-    config = get_rule_config("suitability.missing_risk_tolerance")
-    signals = config["detection"]["context_signals"]
-    query_lower = query.lower()
-    return any(s.lower() in query_lower for s in signals)
+    signals = get_signals(
+        "suitability.missing_risk_tolerance", "context_signals", ruleset,
+    )
+    query_lower = as_view(query).lower
+    return any(s in query_lower for s in signals)
 
 
-def has_time_horizon_context(query: str) -> bool:
+def has_time_horizon_context(
+    query: str | QueryView, ruleset: CompiledRuleSet | None = None,
+) -> bool:
     """Check whether time horizon is stated in the query.
 
     Returns True if any context_signals from
     suitability.missing_time_horizon are present.
     """
-    config = get_rule_config("suitability.missing_time_horizon")
-    signals = config["detection"]["context_signals"]
-    query_lower = query.lower()
-    return any(s.lower() in query_lower for s in signals)
+    signals = get_signals(
+        "suitability.missing_time_horizon", "context_signals", ruleset,
+    )
+    query_lower = as_view(query).lower
+    return any(s in query_lower for s in signals)
 
 
 _US_STATE_NAMES = [
@@ -149,17 +166,19 @@ _US_STATE_NAMES = [
 
 # All 50 states + DC. Case-sensitive word-boundary matching reduces
 # false positives from common English words (in, or, me, oh, ok, hi).
-_US_STATE_ABBREVS = [
+# A frozenset lookup against the query's original-case word tokens is
+# equivalent to searching for rf"\b{abbrev}\b" in the query text.
+_US_STATE_ABBREVS = frozenset([
     "AL", "AK", "AZ", "AR", "CA", "CO", "CT", "DE", "FL", "GA",
     "HI", "ID", "IL", "IN", "IA", "KS", "KY", "LA", "ME", "MD",
     "MA", "MI", "MN", "MS", "MO", "MT", "NE", "NV", "NH", "NJ",
     "NM", "NY", "NC", "ND", "OH", "OK", "OR", "PA", "RI", "SC",
     "SD", "TN", "TX", "UT", "VT", "VA", "WA", "WV", "WI", "WY",
     "DC",
-]
+])
 
 
-def has_jurisdiction_context(query: str) -> bool:
+def has_jurisdiction_context(query: str | QueryView) -> bool:
     """Check whether jurisdiction/state is stated in the query.
 
     Returns True if US state names (case-insensitive substring match)
@@ -170,25 +189,25 @@ def has_jurisdiction_context(query: str) -> bool:
     all-caps queries where common words like "IN" appear as
     standalone tokens. Full state names are the reliable path.
     """
-    query_lower = query.lower()
-    if any(state in query_lower for state in _US_STATE_NAMES):
+    view = as_view(query)
+    if any(state in view.lower for state in _US_STATE_NAMES):
         return True
-    for abbrev in _US_STATE_ABBREVS:
-        if re.search(rf"\b{abbrev}\b", query):
-            return True
-    return False
+    return not _US_STATE_ABBREVS.isdisjoint(view.original_tokens)
 
 
-def has_account_type_context(query: str) -> bool:
+def has_account_type_context(
+    query: str | QueryView, ruleset: CompiledRuleSet | None = None,
+) -> bool:
     """Check whether account type is identifiable in the query.
 
     Returns True if any type_signals from
     suitability.missing_account_type are present.
     """
-    config = get_rule_config("suitability.missing_account_type")
-    signals = config["detection"]["type_signals"]
-    query_lower = query.lower()
-    return any(s.lower() in query_lower for s in signals)
+    signals = get_signals(
+        "suitability.missing_account_type", "type_signals", ruleset,
+    )
+    query_lower = as_view(query).lower
+    return any(s in query_lower for s in signals)
 
 
 # ── Prohibited Heuristics ─────────────────────────────────────────
@@ -211,7 +230,7 @@ _FINANCIAL_DOMAIN_SIGNALS = [
 ]
 
 
-def is_out_of_scope(query: str) -> bool:
+def is_out_of_scope(query: str | QueryView) -> bool:
     """Detect queries entirely outside the financial services domain.
 
     Returns True when the query has no financial content signals.
@@ -229,7 +248,7 @@ def is_out_of_scope(query: str) -> bool:
     incidentally (e.g., "what's the balance of power") would pass
     through, which is an acceptable false negative for v1.
     """
-    query_lower = query.lower()
+    query_lower = as_view(query).lower
     return not any(signal in query_lower for signal in _FINANCIAL_DOMAIN_SIGNALS)
 
 
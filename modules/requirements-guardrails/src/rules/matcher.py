@@ -0,0 +1,90 @@
+"""
+Multi-pattern keyword matcher for keyword-type YAML rules.
+
+Compiles every keyword pattern from every rule category into a single
+Aho-Corasick automaton. A query is scanned once, left to right, and the
+scan reports the IDs of all rules with at least one pattern present —
+the same answer as checking `pattern.lower() in query.lower()` for each
+pattern, at a cost that no longer grows with the number of patterns.
+"""
+
+from collections import deque
+from collections.abc import Iterable
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton mapping keyword patterns to rule IDs.
+
+    Matching is case-insensitive: patterns are lowercased at build time
+    and callers pass an already-lowercased query to scan().
+
+    Attributes:
+        rule_ids: Every rule ID that contributed at least one pattern.
+    """
+
+    def __init__(self, rules: Iterable[tuple[str, Iterable[str]]]):
+        """Build the automaton.
+
+        Args:
+            rules: (rule_id, patterns) pairs. Empty patterns are ignored —
+                an empty string would otherwise match every query.
+        """
+        # State 0 is the root. _goto[s] maps a character to the next state,
+        # _fail[s] is the failure link, _out[s] holds rule IDs that end at s
+        # (including those inherited through failure links).
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[frozenset[str]] = [frozenset()]
+        rule_ids: set[str] = set()
+
+        pending_out: list[set[str]] = [set()]
+        for rule_id, patterns in rules:
+            for pattern in patterns:
+                pattern = pattern.lower()
+                if not pattern:
+                    continue
+                state = 0
+                for ch in pattern:
+                    nxt = self._goto[state].get(ch)
+                    if nxt is None:
+                        nxt = len(self._goto)
+                        self._goto[state][ch] = nxt
+                        self._goto.append({})
+                        self._fail.append(0)
+                        pending_out.append(set())
+                    state = nxt
+                pending_out[state].add(rule_id)
+                rule_ids.add(rule_id)
+
+        # Breadth-first pass to resolve failure links and merge outputs.
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                pending_out[nxt] |= pending_out[self._fail[nxt]]
+
+        self._out = [frozenset(o) for o in pending_out]
+        self.rule_ids: frozenset[str] = frozenset(rule_ids)
+
+    def scan(self, query_lower: str) -> set[str]:
+        """Return the IDs of all rules with a pattern in the query.
+
+        Args:
+            query_lower: The query text, already lowercased.
+        """
+        goto, fail, out = self._goto, self._fail, self._out
+        fired: set[str] = set()
+        state = 0
+        for ch in query_lower:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                fired |= out[state]
+        return fired
@@ -0,0 +1,65 @@
+"""
+Normalized view of a query, computed once per classification.
+
+The evaluator, every heuristic and the jurisdiction detector all need
+the same derived forms of the query text — lowercase text, word tokens,
+token positions. QueryView computes them once so a single classify()
+call normalizes the query exactly once.
+"""
+
+import re
+from dataclasses import dataclass
+from functools import cached_property
+
+# Same definition of "word" as the regex \b boundary: a maximal run of
+# \w characters. A literal token T is bounded by \b on both sides
+# exactly when T appears as one of these runs.
+_WORD = re.compile(r"\w+")
+
+
+@dataclass(frozen=True)
+class QueryView:
+    """Pre-normalized forms of one query.
+
+    Attributes:
+        text: The original query text.
+        lower: text.lower(), used for case-insensitive substring checks.
+        original_tokens: Word tokens in their original case, in order.
+        tokens: Set of lowercase word tokens (computed on first access).
+        token_spans: (start, end) character offsets of each word token
+            in `text`, in order of appearance (computed on first access).
+    """
+
+    text: str
+    lower: str
+    original_tokens: tuple[str, ...]
+
+    @classmethod
+    def from_text(cls, text: str) -> "QueryView":
+        """Build a QueryView by normalizing the query text once."""
+        return cls(
+            text=text,
+            lower=text.lower(),
+            original_tokens=tuple(_WORD.findall(text)),
+        )
+
+    # No rule reads these on the classify() path, so they are not built
+    # per query; cached_property stores into __dict__, past frozen=True.
+    @cached_property
+    def tokens(self) -> frozenset[str]:
+        return frozenset(t.lower() for t in self.original_tokens)
+
+    @cached_property
+    def token_spans(self) -> tuple[tuple[int, int], ...]:
+        return tuple(m.span() for m in _WORD.finditer(self.text))
+
+
+def as_view(query: "str | QueryView") -> QueryView:
+    """Return the query as a QueryView, building one from plain text.
+
+    Lets rule functions accept either a raw string (standalone use) or
+    the view already built by the classifier.
+    """
+    if isinstance(query, QueryView):
+        return query
+    return QueryView.from_text(query)
@@ -0,0 +1,202 @@
+"""
+Versioned, hot-reloadable registry of compiled guardrail rulesets.
+
+The registry owns the active CompiledRuleSet. A reload reads the three
+category YAML files, hashes their bytes into a ruleset version, compiles
+a new CompiledRuleSet off to the side, and then swaps it in with a single
+reference assignment. Callers that captured the previous ruleset (e.g.
+an in-flight classify()) keep evaluating against it; new calls see the
+new version. A config change that fails to parse or compile never
+replaces a working ruleset.
+
+When given an artifact path, loading first tries the precompiled
+artifact for the current source hash (see artifact.py) and parses YAML
+only if it is missing or stale. PyYAML is imported on that fallback
+path only, so an artifact load skips it entirely.
+"""
+
+import hashlib
+import logging
+import threading
+from pathlib import Path
+
+from src.models import Category
+from src.rules.artifact import read_artifact
+from src.rules.compiled import CompiledRuleSet
+
+logger = logging.getLogger(__name__)
+
+# Category -> YAML file in the config directory. Category.NONE has no
+# rules and is intentionally absent.
+CONFIG_FILES: dict[Category, str] = {
+    Category.COMPLIANCE: "compliance.yaml",
+    Category.SUITABILITY: "suitability.yaml",
+    Category.PROHIBITED: "prohibited.yaml",
+}
+
+
+def _read_sources(config_dir: Path) -> dict[Category, bytes]:
+    """Read the raw bytes of every category config file."""
+    return {
+        category: (config_dir / filename).read_bytes()
+        for category, filename in CONFIG_FILES.items()
+    }
+
+
+def ruleset_version(sources: dict[Category, bytes]) -> str:
+    """Return the content hash identifying a set of config sources.
+
+    The version is the first 16 hex digits of a SHA-256 over each file
+    name and its bytes, so any edit to any category file — and nothing
+    else — produces a new version.
+    """
+    digest = hashlib.sha256()
+    for category, filename in CONFIG_FILES.items():
+        digest.update(filename.encode())
+        digest.update(b"\0")
+        digest.update(sources[category])
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+def load_ruleset(config_dir: Path, artifact_path: Path | None = None) -> CompiledRuleSet:
+    """Load, version, and compile the rule configs in a directory.
+
+    Args:
+        config_dir: Directory holding the category YAML files.
+        artifact_path: Precompiled artifact to use when it matches the
+            sources' content hash. None always compiles from YAML.
+
+    Raises:
+        OSError: If a config file cannot be read.
+        yaml.YAMLError: If a config file is not valid YAML.
+        ValueError: If a rule fails to compile (e.g. an invalid regex).
+    """
+    sources = _read_sources(config_dir)
+    version = ruleset_version(sources)
+    if artifact_path is not None:
+        ruleset = read_artifact(artifact_path, version)
+        if ruleset is not None:
+            return ruleset
+
+    import yaml
+
+    configs = {
+        category: yaml.safe_load(data.decode("utf-8"))
+        for category, data in sources.items()
+    }
+    return CompiledRuleSet(configs, version=version)
+
+
+class RulesetRegistry:
+    """Holds the active CompiledRuleSet and swaps in new versions.
+
+    Reading `active` is a single attribute load, so it is safe from any
+    thread without locking. Reloads are serialized by an internal lock.
+    """
+
+    def __init__(self, config_dir: Path, artifact_path: Path | None = None):
+        """Load and compile the initial ruleset.
+
+        Args:
+            config_dir: Directory holding the category YAML files.
+            artifact_path: Precompiled artifact tried before YAML on
+                every load (see load_ruleset).
+
+        Raises:
+            The errors of load_ruleset(). A registry cannot start
+            without a valid ruleset.
+        """
+        self.config_dir = Path(config_dir)
+        self.artifact_path = Path(artifact_path) if artifact_path else None
+        self._lock = threading.Lock()
+        self._active = load_ruleset(self.config_dir, self.artifact_path)
+        self._stat = self._stat_sources()
+        self._watcher: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    @property
+    def active(self) -> CompiledRuleSet:
+        """The ruleset new evaluations should use."""
+        return self._active
+
+    @property
+    def version(self) -> str:
+        """Version hash of the active ruleset."""
+        return self._active.version
+
+    def _stat_sources(self) -> tuple:
+        """Cheap change signal: (mtime_ns, size) of each config file."""
+        stats = []
+        for filename in CONFIG_FILES.values():
+            try:
+                st = (self.config_dir / filename).stat()
+                stats.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                stats.append(None)
+        return tuple(stats)
+
+    def reload(self) -> bool:
+        """Recompile from disk and swap if the content hash changed.
+
+        Returns:
+            True if a new ruleset version was activated.
+
+        Raises:
+            The errors of load_ruleset(). The active ruleset is left
+            unchanged when loading fails.
+        """
+        with self._lock:
+            self._stat = self._stat_sources()
+            candidate = load_ruleset(self.config_dir, self.artifact_path)
+            if candidate.version == self._active.version:
+                return False
+            previous = self._active.version
+            self._active = candidate
+        logger.info("Activated guardrail ruleset %s (was %s)",
+                    candidate.version, previous)
+        return True
+
+    def check_for_changes(self) -> bool:
+        """Reload if any config file's mtime or size changed.
+
+        Load errors are logged and swallowed so a bad edit cannot take
+        down a watching worker; the previous ruleset stays active.
+
+        Returns:
+            True if a new ruleset version was activated.
+        """
+        if self._stat_sources() == self._stat:
+            return False
+        try:
+            return self.reload()
+        except Exception:
+            logger.exception("Guardrail ruleset reload failed; keeping version %s",
+                             self._active.version)
+            return False
+
+    def start_watching(self, interval: float = 2.0) -> None:
+        """Poll the config directory in a daemon thread every `interval` seconds.
+
+        Polling keeps the module dependency-free (no filesystem-event
+        library) and costs one stat() per config file per interval.
+        """
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self._stop.clear()
+
+        def _watch() -> None:
+            while not self._stop.wait(interval):
+                self.check_for_changes()
+
+        self._watcher = threading.Thread(
+            target=_watch, name="guardrail-ruleset-watcher", daemon=True,
+        )
+        self._watcher.start()
+
+    def stop_watching(self) -> None:
+        """Stop the watcher thread, if running."""
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
@@ -1,37 +1,58 @@
 """
-YAML rule evaluator — loads rule configs at module import time and
-evaluates queries against keyword and regex rules.
+YAML rule evaluator — loads rule configs at module import time (via the
+ruleset registry) and evaluates queries against keyword and regex rules.
 
 For heuristic-type rules, returns metadata (rule ID, heuristic function name)
 so the classifier orchestrator knows which Python function to call.
 """
 
-import re
+import os
 from dataclasses import dataclass, field
 from pathlib import Path
 
-import yaml
-
 from src.models import Classification, Category, TriggeredRule
+from src.rules.artifact import DEFAULT_ARTIFACT_NAME
+from src.rules.compiled import CompiledRuleSet, RuleSpec
+from src.rules.registry import RulesetRegistry
+from src.rules.query_view import QueryView
 
 
 # ── Module-level config loading ──────────────────────────────────
 
 _CONFIG_DIR = Path(__file__).parent.parent / "config"
 
+# Precompiled artifact built by `python -m src.rules.artifact build`.
+# GUARDRAILS_RULESET_ARTIFACT overrides the path; set it to an empty
+# string to always compile from YAML.
+_ARTIFACT_PATH = os.environ.get(
+    "GUARDRAILS_RULESET_ARTIFACT", str(_CONFIG_DIR / DEFAULT_ARTIFACT_NAME),
+) or None
+
+# Loaded and compiled once at import time — from the artifact when it
+# matches the YAML content hash, otherwise from YAML. The registry can
+# later swap in a recompiled ruleset (reload() or start_watching());
+# evaluation code reads the registry's active ruleset rather than a
+# module constant.
+REGISTRY = RulesetRegistry(_CONFIG_DIR, artifact_path=_ARTIFACT_PATH)
 
-def _load_config(filename: str) -> dict:
-    """Load and return a single YAML config file."""
-    with open(_CONFIG_DIR / filename) as f:
-        return yaml.safe_load(f)
 
+def active_ruleset() -> CompiledRuleSet:
+    """Return the ruleset new evaluations should use.
+
+    Callers evaluating one query across several steps should fetch this
+    once and pass it along, so a concurrent reload cannot mix versions
+    within a single classification.
+    """
+    return REGISTRY.active
 
-# Loaded once at import time — these are module-level constants.
-COMPLIANCE_CONFIG = _load_config("compliance.yaml")
-SUITABILITY_CONFIG = _load_config("suitability.yaml")
-PROHIBITED_CONFIG = _load_config("prohibited.yaml")
 
-# Explicit mapping from Category enum to loaded config dict.
+# Import-time snapshot of the raw configs, kept for callers that read
+# them directly. These do not follow hot reloads — use active_ruleset().
+COMPLIANCE_CONFIG = REGISTRY.active.configs[Category.COMPLIANCE]
+SUITABILITY_CONFIG = REGISTRY.active.configs[Category.SUITABILITY]
+PROHIBITED_CONFIG = REGISTRY.active.configs[Category.PROHIBITED]
+
+# Explicit mapping from Category enum to loaded config dict (snapshot).
 # Category.NONE is intentionally absent — calling evaluate_category
 # with NONE is a caller bug.
 _CATEGORY_CONFIG_MAP: dict[Category, dict] = {
@@ -71,29 +92,29 @@ class RuleMatch:
 # ── Pattern matching ─────────────────────────────────────────────
 
 
-def _evaluate_keyword_rule(query: str, patterns: list[str]) -> bool:
-    """Return True if any keyword pattern is found in the query.
+def match_rules(
+    query: str | QueryView,
+    ruleset: CompiledRuleSet | None = None,
+) -> set[str]:
+    """Return the IDs of all keyword and regex rules that fire for the query.
 
-    Both the query and each pattern are normalized to lowercase
-    before comparison so matching is case-insensitive.
+    Keyword matching is case-insensitive substring matching; regex
+    patterns are matched with re.IGNORECASE anywhere in the query.
+    Both are answered from one pass each over the compiled ruleset
+    (the active one unless `ruleset` is given).
     """
-    query_lower = query.lower()
-    return any(pattern.lower() in query_lower for pattern in patterns)
-
-
-def _evaluate_regex_rule(query: str, patterns: list[str]) -> bool:
-    """Return True if any regex pattern matches within the query.
-
-    Each pattern is compiled with re.IGNORECASE for
-    case-insensitive matching.
-    """
-    return any(re.search(pattern, query, re.IGNORECASE) for pattern in patterns)
+    return (ruleset or active_ruleset()).match(query)
 
 
 # ── Category evaluation ──────────────────────────────────────────
 
 
-def evaluate_category(query: str, category: Category) -> list[RuleMatch]:
+def evaluate_category(
+    query: str | QueryView,
+    category: Category,
+    fired_rules: set[str] | None = None,
+    ruleset: CompiledRuleSet | None = None,
+) -> list[RuleMatch]:
     """Evaluate all rules in a category against the query.
 
     For keyword/regex rules: returns a RuleMatch only if the rule fired.
@@ -101,9 +122,15 @@ def evaluate_category(query: str, category: Category) -> list[RuleMatch]:
     letting the orchestrator decide whether the heuristic function fires.
 
     Args:
-        query: The user's input text.
+        query: The user's input text, or the QueryView built for it.
         category: Which rule category to evaluate (COMPLIANCE,
             SUITABILITY, or PROHIBITED).
+        fired_rules: Keyword/regex rule IDs already computed by
+            match_rules(). Callers evaluating several categories pass
+            this to scan the query once; when omitted the query is
+            scanned here.
+        ruleset: The compiled ruleset to evaluate against. Defaults to
+            the registry's active ruleset.
 
     Returns:
         List of RuleMatch objects for rules that triggered (keyword/regex)
@@ -119,59 +146,29 @@ def evaluate_category(query: str, category: Category) -> list[RuleMatch]:
             "NONE means no guardrail triggered — there are no rules to evaluate."
         )
 
-    config = _CATEGORY_CONFIG_MAP[category]
+    ruleset = ruleset or active_ruleset()
     matches: list[RuleMatch] = []
-
-    for rule in config["rules"]:
-        detection = rule["detection"]
-        detection_type = detection["type"]
-
-        # Build common RuleMatch fields
-        rule_classification = Classification(rule["classification"])
-        upgrade_value = rule.get("produce_intent_upgrade")
-        produce_upgrade = Classification(upgrade_value) if upgrade_value else None
-        missing_ctx = rule.get("missing_context", [])
-
-        if detection_type == "heuristic":
-            # Always return heuristic rules — the orchestrator will
-            # call the corresponding Python function to decide.
-            matches.append(
-                RuleMatch(
-                    rule_id=rule["id"],
-                    description=rule["description"].strip(),
-                    classification=rule_classification,
-                    category=category,
-                    is_heuristic=True,
-                    produce_intent_upgrade=produce_upgrade,
-                    missing_context=missing_ctx,
-                )
+    if fired_rules is None:
+        fired_rules = ruleset.match(query)
+
+    for spec in ruleset.rules_in(category):
+        # Heuristic rules are always returned — the orchestrator will
+        # call the corresponding Python function to decide. Keyword and
+        # regex rules are returned only if the compiled scan fired them.
+        is_heuristic = spec.detection_type == "heuristic"
+        if not is_heuristic and spec.rule_id not in fired_rules:
+            continue
+        matches.append(
+            RuleMatch(
+                rule_id=spec.rule_id,
+                description=spec.description,
+                classification=spec.classification,
+                category=category,
+                is_heuristic=is_heuristic,
+                produce_intent_upgrade=spec.produce_intent_upgrade,
+                missing_context=list(spec.missing_context),
             )
-        elif detection_type == "keyword":
-            if _evaluate_keyword_rule(query, detection["patterns"]):
-                matches.append(
-                    RuleMatch(
-                        rule_id=rule["id"],
-                        description=rule["description"].strip(),
-                        classification=rule_classification,
-                        category=category,
-                        is_heuristic=False,
-                        produce_intent_upgrade=produce_upgrade,
-                        missing_context=missing_ctx,
-                    )
-                )
-        elif detection_type == "regex":
-            if _evaluate_regex_rule(query, detection["patterns"]):
-                matches.append(
-                    RuleMatch(
-                        rule_id=rule["id"],
-                        description=rule["description"].strip(),
-                        classification=rule_classification,
-                        category=category,
-                        is_heuristic=False,
-                        produce_intent_upgrade=produce_upgrade,
-                        missing_context=missing_ctx,
-                    )
-                )
+        )
 
     return matches
 
@@ -179,22 +176,48 @@ def evaluate_category(query: str, category: Category) -> list[RuleMatch]:
 # ── Config lookup ────────────────────────────────────────────────
 
 
-def get_rule_config(rule_id: str) -> dict | None:
+def get_rule_config(
+    rule_id: str, ruleset: CompiledRuleSet | None = None,
+) -> dict | None:
     """Look up the raw YAML config dict for a specific rule by ID.
 
-    Used by heuristic functions to read signal lists from the YAML
-    (e.g., benefit_signals, context_signals) rather than hardcoding
-    values that are already in the config files.
+    O(1) lookup in the compiled rule index. Heuristics should prefer
+    get_signals(), which returns pre-lowered signal sets.
 
     Args:
         rule_id: Rule identifier in "category.rule_name" format,
             e.g. "compliance.unbalanced_claims".
+        ruleset: Ruleset to read from. Defaults to the active ruleset.
 
     Returns:
         The raw rule dict from YAML, or None if the rule_id is not found.
     """
-    for config in _CATEGORY_CONFIG_MAP.values():
-        for rule in config["rules"]:
-            if rule["id"] == rule_id:
-                return rule
-    return None
+    return (ruleset or active_ruleset()).raw_rule(rule_id)
+
+
+def get_rule(
+    rule_id: str, ruleset: CompiledRuleSet | None = None,
+) -> RuleSpec | None:
+    """Return the resolved RuleSpec for a rule ID, or None if not found."""
+    return (ruleset or active_ruleset()).rule(rule_id)
+
+
+def get_signals(
+    rule_id: str, signal_key: str, ruleset: CompiledRuleSet | None = None,
+) -> frozenset[str]:
+    """Return a heuristic rule's signal list as a pre-lowered set.
+
+    Used by heuristic functions to read signal lists from the YAML
+    (e.g., benefit_signals, context_signals) rather than hardcoding
+    values that are already in the config files. Signals are lowercased
+    and deduplicated once at load time.
+
+    Args:
+        rule_id: Rule identifier, e.g. "compliance.unbalanced_claims".
+        signal_key: Detection key holding the list, e.g. "benefit_signals".
+        ruleset: Ruleset to read from. Defaults to the active ruleset.
+
+    Raises:
+        KeyError: If the rule or signal key does not exist.
+    """
+    return (ruleset or active_ruleset()).signals(rule_id, signal_key)
@@ -0,0 +1,153 @@
+"""
+Conversation-aware classification.
+
+After a CLARIFY, the user's follow-up supplies the missing context
+("I'm in New York, it's for my Roth IRA"). Classifying that turn alone
+loses the original question; re-classifying the whole transcript costs
+more every turn. ClassificationSession keeps what earlier turns
+established and evaluates only the new text.
+
+Why this is exact: every rule is a disjunction over the text. Keyword
+and regex rules fire if any pattern occurs; every heuristic is built
+from "is any signal of list X present" checks (benefit / risk language,
+recommendation gate, each context type, financial-domain terms,
+produce intent). Each of those is an OR across turns, so the session
+accumulates:
+
+    fired_rules   keyword/regex rule IDs fired in any turn
+    signals       signal flag -> True once seen in any turn
+
+and resolves a decision from them through the same upgrade, context-
+first override and priority steps as classify(). The result equals
+classify("\\n".join(turns)), except for a pattern that would only match
+across a turn boundary.
+
+Because flags are sticky, the context-first override resolves across
+turns: once a follow-up supplies risk tolerance and time horizon, the
+suitability CLARIFY rules stop firing and a compliance ESCALATE from the
+first turn is no longer suppressed.
+"""
+
+from src.classifier import _finalize, _has_gate_signals
+from src.models import Category, GuardrailResult
+from src.rules.compiled import CompiledRuleSet
+from src.rules.heuristics import (
+    detect_produce_intent,
+    has_account_type_context,
+    has_jurisdiction_context,
+    has_risk_tolerance_context,
+    has_time_horizon_context,
+    is_out_of_scope,
+    is_recommendation_request,
+)
+from src.rules.query_view import QueryView
+from src.rules.yaml_evaluator import active_ruleset, evaluate_category, get_signals, RuleMatch
+
+
+def _has_signal(view: QueryView, rule_id: str, key: str, ruleset: CompiledRuleSet) -> bool:
+    return any(s in view.lower for s in get_signals(rule_id, key, ruleset))
+
+
+# Signal flag -> per-turn probe. Each probe is one "any signal present"
+# check from heuristics.py, so flags combine across turns with OR.
+_SIGNAL_PROBES = {
+    "produce_intent": lambda v, rs: detect_produce_intent(v),
+    "benefit_claims": lambda v, rs: _has_signal(
+        v, "compliance.unbalanced_claims", "benefit_signals", rs),
+    "risk_disclosure": lambda v, rs: _has_signal(
+        v, "compliance.unbalanced_claims", "risk_signals", rs),
+    "recommendation": is_recommendation_request,
+    "risk_tolerance": has_risk_tolerance_context,
+    "time_horizon": has_time_horizon_context,
+    "tax_topic": lambda v, rs: _has_gate_signals(
+        v, "suitability.missing_jurisdiction", "tax_signals", rs),
+    "jurisdiction": lambda v, rs: has_jurisdiction_context(v),
+    "account_topic": lambda v, rs: _has_gate_signals(
+        v, "suitability.missing_account_type", "account_signals", rs),
+    "account_type": has_account_type_context,
+    "financial": lambda v, rs: not is_out_of_scope(v),
+}
+
+# Heuristic rule -> decision over accumulated flags. Mirrors
+# classifier._evaluate_heuristic; tests/test_session.py pins the two
+# together. Unknown heuristic rules do not fire, as in classify().
+_HEURISTIC_RULES = {
+    "compliance.unbalanced_claims":
+        lambda f: f["benefit_claims"] and not f["risk_disclosure"],
+    "prohibited.out_of_scope":
+        lambda f: not f["financial"],
+    "suitability.missing_risk_tolerance":
+        lambda f: f["recommendation"] and not f["risk_tolerance"],
+    "suitability.missing_time_horizon":
+        lambda f: f["recommendation"] and not f["time_horizon"],
+    "suitability.missing_jurisdiction":
+        lambda f: f["tax_topic"] and not f["jurisdiction"],
+    "suitability.missing_account_type":
+        lambda f: f["account_topic"] and not f["account_type"],
+}
+
+
+class ClassificationSession:
+    """Classifies a conversation turn by turn.
+
+    Usage:
+        session = ClassificationSession()
+        session.classify_turn("What should I invest in for retirement?")   # CLARIFY
+        session.classify_turn("I'm aggressive and have a 20 year horizon") # re-resolved
+
+    The session pins the ruleset active when it was created, so rule
+    state from earlier turns is never reinterpreted under a different
+    ruleset version after a hot reload. Not thread-safe: use one
+    session per conversation.
+
+    Attributes:
+        ruleset: The ruleset every turn is evaluated against.
+        turns: Number of turns classified so far.
+    """
+
+    def __init__(self, ruleset: CompiledRuleSet | None = None):
+        self.ruleset = ruleset or active_ruleset()
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget every earlier turn."""
+        self.turns = 0
+        self._fired_rules: set[str] = set()
+        self._signals: dict[str, bool] = dict.fromkeys(_SIGNAL_PROBES, False)
+
+    @property
+    def signals(self) -> dict[str, bool]:
+        """Signal flags accumulated so far (a copy)."""
+        return dict(self._signals)
+
+    def classify_turn(self, text: str) -> GuardrailResult:
+        """Add one turn and classify the conversation so far.
+
+        Only `text` is scanned: keyword/regex rules once, and only the
+        signal probes that have not already been satisfied by an
+        earlier turn. The cost per turn does not grow with history.
+
+        Returns:
+            A GuardrailResult for the whole conversation, as
+            classify() would produce for the joined turns.
+        """
+        ruleset = self.ruleset
+        view = QueryView.from_text(text)
+        self._fired_rules |= ruleset.match(view)
+        signals = self._signals
+        for name, probe in _SIGNAL_PROBES.items():
+            if not signals[name] and probe(view, ruleset):
+                signals[name] = True
+        self.turns += 1
+
+        confirmed_matches: list[RuleMatch] = []
+        for category in [Category.COMPLIANCE, Category.SUITABILITY, Category.PROHIBITED]:
+            for match in evaluate_category(view, category, self._fired_rules, ruleset):
+                if not match.is_heuristic:
+                    confirmed_matches.append(match)
+                else:
+                    decide = _HEURISTIC_RULES.get(match.rule_id)
+                    if decide is not None and decide(signals):
+                        confirmed_matches.append(match)
+
+        return _finalize(confirmed_matches, signals["produce_intent"], ruleset)
@@ -0,0 +1,308 @@
+"""
+Shadow evaluation of a candidate ruleset against live traffic.
+
+Before a YAML change is promoted, the candidate ruleset runs alongside
+production on real queries. Calling classify() twice would normalize
+and scan every query twice; ShadowEvaluator instead shares the work:
+
+    one QueryView            built once per query
+    one merged scan          one Aho-Corasick automaton and one list of
+                             compiled regexes over both rulesets' rules;
+                             rules identical in both are scanned once
+    shared heuristics        when the heuristic rules' signal lists are
+                             unchanged, the candidate reuses production's
+                             heuristic results
+
+The production GuardrailResult is computed first and returned unchanged.
+The candidate is then resolved from the shared work — decision only, no
+audit fields or request_id — and a ShadowDiff is
+emitted whenever its classification, category or triggered rule IDs
+differ. stats() reports the time spent on the candidate, which is the
+overhead added to the production decision; sample_rate bounds it.
+
+Usage:
+    from src.audit import AuditSink
+    from src.rules.registry import load_ruleset
+
+    sink = AuditSink("shadow-diffs/")
+    shadow = ShadowEvaluator(load_ruleset(candidate_dir),
+                             on_diff=lambda d: sink.write(d.to_dict()))
+    result = shadow.classify(query)     # production result
+"""
+
+import random
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from src.classifier import (
+    _classify_view,
+    _confirm_matches,
+    _finalize,
+    _resolve_decision,
+)
+from src.models import Category, Classification, GuardrailResult
+from src.rules.compiled import CompiledRuleSet, RuleSpec, compile_regex_rules
+from src.rules.heuristics import detect_produce_intent
+from src.rules.matcher import KeywordMatcher
+from src.rules.query_view import QueryView, as_view
+from src.rules.yaml_evaluator import active_ruleset
+
+# Namespaces for merged-scan entries: production only, candidate only,
+# or identical in both.
+_PRODUCTION, _CANDIDATE, _BOTH = "p:", "c:", "b:"
+
+
+def _specs(ruleset: CompiledRuleSet) -> list[RuleSpec]:
+    return [spec for category in ruleset.configs for spec in ruleset.rules_in(category)]
+
+
+def _heuristic_signals(ruleset: CompiledRuleSet) -> dict[str, dict]:
+    return {spec.rule_id: dict(spec.signals)
+            for spec in _specs(ruleset) if spec.detection_type == "heuristic"}
+
+
+class MergedScan:
+    """One keyword automaton and one set of compiled regexes over two rulesets.
+
+    Each rule is entered under a namespaced ID. A rule with the same ID,
+    detection type and patterns in both rulesets is entered once.
+    """
+
+    def __init__(self, production: CompiledRuleSet, candidate: CompiledRuleSet):
+        entries: dict[str, list[tuple[str, list[str]]]] = {"keyword": [], "regex": []}
+        for detection, target in entries.items():
+            prod = {s.rule_id: s.patterns for s in _specs(production)
+                    if s.detection_type == detection}
+            cand = {s.rule_id: s.patterns for s in _specs(candidate)
+                    if s.detection_type == detection}
+            for rule_id in sorted(prod.keys() | cand.keys()):
+                if prod.get(rule_id) == cand.get(rule_id):
+                    target.append((_BOTH + rule_id, list(prod[rule_id])))
+                    continue
+                if rule_id in prod:
+                    target.append((_PRODUCTION + rule_id, list(prod[rule_id])))
+                if rule_id in cand:
+                    target.append((_CANDIDATE + rule_id, list(cand[rule_id])))
+        self.keyword_matcher = KeywordMatcher(entries["keyword"])
+        self.regex_rules = compile_regex_rules(entries["regex"])
+
+    def match(self, query: "str | QueryView") -> tuple[set[str], set[str]]:
+        """Return (production fired rule IDs, candidate fired rule IDs)."""
+        view = as_view(query)
+        fired = self.keyword_matcher.scan(view.lower)
+        fired.update(
+            entry for entry, patterns in self.regex_rules
+            if any(p.search(view.text) for p in patterns)
+        )
+
+        production: set[str] = set()
+        candidate: set[str] = set()
+        for entry in fired:
+            namespace, rule_id = entry[:2], entry[2:]
+            if namespace != _CANDIDATE:
+                production.add(rule_id)
+            if namespace != _PRODUCTION:
+                candidate.add(rule_id)
+        return production, candidate
+
+
+def _rule_ids(result: GuardrailResult) -> list[str]:
+    return [rule.rule_id for rule in result.triggered_rules]
+
+
+def _summary(ruleset_version: str | None, classification: Classification,
+             category: Category, rule_ids: list[str], missing_context: list[str]) -> dict:
+    return {
+        "ruleset_version": ruleset_version,
+        "classification": classification.value,
+        "category": category.value,
+        "triggered_rules": rule_ids,
+        "missing_context": list(missing_context),
+    }
+
+
+@dataclass
+class ShadowDiff:
+    """A query on which the candidate ruleset routes differently.
+
+    Attributes:
+        request_id: The production result's request_id.
+        timestamp: The production result's timestamp.
+        changed: Which of "classification", "category",
+            "triggered_rules" differ.
+        production: Summary of the production result.
+        candidate: Summary of the candidate result.
+        query: The query text, only if the evaluator was built with
+            include_query=True (audit records do not carry query text
+            by default).
+    """
+
+    request_id: str
+    timestamp: str
+    changed: list[str]
+    production: dict
+    candidate: dict
+    query: str | None = None
+
+    def to_dict(self) -> dict:
+        """Serialize to a plain dict for JSON output and audit logging."""
+        out = {
+            "record_type": "ruleset_shadow_diff",
+            "request_id": self.request_id,
+            "timestamp": self.timestamp,
+            "changed": list(self.changed),
+            "production": self.production,
+            "candidate": self.candidate,
+        }
+        if self.query is not None:
+            out["query"] = self.query
+        return out
+
+
+@dataclass
+class ShadowStats:
+    """Counters for a ShadowEvaluator.
+
+    Attributes:
+        requests: Queries classified.
+        shadowed: Queries also evaluated against the candidate.
+        diffs: Shadowed queries whose candidate result differed.
+        overhead_ns: Total time spent resolving and comparing the
+            candidate after the production result was ready. The extra
+            cost of the merged scan over a production-only scan is not
+            included; benchmarks/shadow_overhead.py measures end to end.
+        changed: Diff count per changed field.
+    """
+
+    requests: int = 0
+    shadowed: int = 0
+    diffs: int = 0
+    overhead_ns: int = 0
+    changed: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def mean_overhead_us(self) -> float:
+        return self.overhead_ns / self.shadowed / 1e3 if self.shadowed else 0.0
+
+
+class ShadowEvaluator:
+    """Classifies with production and shadows a candidate ruleset."""
+
+    def __init__(
+        self,
+        candidate: CompiledRuleSet,
+        production: CompiledRuleSet | None = None,
+        on_diff: Callable[[ShadowDiff], None] | None = None,
+        sample_rate: float = 1.0,
+        include_query: bool = False,
+        seed: int | None = None,
+    ):
+        """
+        Args:
+            candidate: The proposed ruleset.
+            production: The ruleset whose results are returned. None
+                follows the registry's active ruleset across hot reloads.
+            on_diff: Called with each ShadowDiff (e.g. to write it to an
+                AuditSink). Called on the request thread; keep it cheap.
+            sample_rate: Fraction of queries shadowed (0..1). Unsampled
+                queries pay only a random() call.
+            include_query: Copy the query text into diff records.
+            seed: Seed for sampling, for reproducible runs.
+        """
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError("sample_rate must be between 0 and 1")
+        self.candidate = candidate
+        self.production = production
+        self.on_diff = on_diff
+        self.sample_rate = sample_rate
+        self.include_query = include_query
+        self._random = random.Random(seed)
+        self._stats = ShadowStats()
+        self._stats_lock = threading.Lock()
+        self._plan: tuple[CompiledRuleSet, MergedScan, bool] | None = None
+        self._plan_lock = threading.Lock()
+
+    def _plan_for(self, production: CompiledRuleSet) -> tuple[MergedScan, bool]:
+        """Merged scan and heuristic-sharing flag for this production ruleset."""
+        plan = self._plan
+        if plan is None or plan[0] is not production:
+            with self._plan_lock:
+                plan = self._plan
+                if plan is None or plan[0] is not production:
+                    shared = (_heuristic_signals(production)
+                              == _heuristic_signals(self.candidate))
+                    plan = (production, MergedScan(production, self.candidate), shared)
+                    self._plan = plan
+        return plan[1], plan[2]
+
+    def classify(self, query: str) -> GuardrailResult:
+        """Return the production result; shadow the candidate if sampled."""
+        production = self.production or active_ruleset()
+        view = QueryView.from_text(query)
+        sampled = self.sample_rate >= 1.0 or self._random.random() < self.sample_rate
+        if not sampled:
+            with self._stats_lock:
+                self._stats.requests += 1
+            return _classify_view(view, production, production.match(view))
+
+        scan, shared_heuristics = self._plan_for(production)
+        prod_fired, cand_fired = scan.match(view)
+        heuristic_results: dict[str, bool] = {}
+        produce_intent = detect_produce_intent(view)
+        result = _finalize(
+            _confirm_matches(view, production, prod_fired,
+                             heuristic_results=heuristic_results),
+            produce_intent, production,
+        )
+
+        start = time.perf_counter_ns()
+        candidate = self.candidate
+        matches = _confirm_matches(
+            view, candidate, cand_fired,
+            heuristic_results=heuristic_results if shared_heuristics else None,
+        )
+        cls, cat, missing_context = _resolve_decision(matches, produce_intent)
+        cand_ids = [m.rule_id for m in matches]
+        prod_ids = _rule_ids(result)
+        changed = [
+            name for name, differs in (
+                ("classification", cls != result.classification),
+                ("category", cat != result.category),
+                ("triggered_rules", cand_ids != prod_ids),
+            ) if differs
+        ]
+        diff = None
+        if changed:
+            diff = ShadowDiff(
+                request_id=result.request_id,
+                timestamp=result.timestamp,
+                changed=changed,
+                production=_summary(result.ruleset_version, result.classification,
+                                    result.category, prod_ids, result.missing_context),
+                candidate=_summary(candidate.version, cls, cat, cand_ids, missing_context),
+                query=query if self.include_query else None,
+            )
+        elapsed = time.perf_counter_ns() - start
+
+        with self._stats_lock:
+            stats = self._stats
+            stats.requests += 1
+            stats.shadowed += 1
+            stats.overhead_ns += elapsed
+            if changed:
+                stats.diffs += 1
+                for name in changed:
+                    stats.changed[name] = stats.changed.get(name, 0) + 1
+        if diff is not None and self.on_diff is not None:
+            self.on_diff(diff)
+        return result
+
+    __call__ = classify
+
+    def stats(self) -> ShadowStats:
+        """Return a snapshot of the counters."""
+        with self._stats_lock:
+            s = self._stats
+            return ShadowStats(s.requests, s.shadowed, s.diffs, s.overhead_ns, dict(s.changed))
@@ -0,0 +1,103 @@
+"""
+Tests for the precompiled ruleset artifact.
+
+A loaded artifact must behave exactly like the ruleset compiled from
+YAML, and any mismatch — edited YAML, other format, corrupt bytes —
+must fall back to YAML rather than serve a stale ruleset.
+"""
+
+import shutil
+from pathlib import Path
+
+import pytest
+
+from src.rules import artifact
+from src.rules.artifact import read_artifact, write_artifact
+from src.rules.compiled import CompiledRuleSet
+from src.rules.registry import CONFIG_FILES, RulesetRegistry, load_ruleset
+from tests.test_rule_matching import SAMPLE_QUERIES
+
+CONFIG_DIR = Path(__file__).parent.parent / "src" / "config"
+
+
+@pytest.fixture
+def config_dir(tmp_path):
+    """A private copy of the shipped config directory."""
+    for filename in CONFIG_FILES.values():
+        shutil.copy(CONFIG_DIR / filename, tmp_path / filename)
+    return tmp_path
+
+
+@pytest.fixture
+def built(config_dir):
+    """(compiled-from-YAML ruleset, artifact path) for the copied configs."""
+    ruleset = load_ruleset(config_dir)
+    path = config_dir / artifact.DEFAULT_ARTIFACT_NAME
+    write_artifact(ruleset, path)
+    return ruleset, path
+
+
+class TestArtifact:
+    """Round trip, staleness, and fallback."""
+
+    def test_round_trip_is_equivalent(self, built):
+        original, path = built
+        loaded = read_artifact(path, original.version)
+        assert loaded is not None and loaded is not original
+        assert loaded.version == original.version
+        for query in SAMPLE_QUERIES:
+            assert loaded.match(query) == original.match(query)
+        for spec in original.rules_in(next(iter(original.configs))):
+            assert loaded.rule(spec.rule_id) == spec
+            assert loaded.raw_rule(spec.rule_id) == original.raw_rule(spec.rule_id)
+        assert loaded.signals("suitability.missing_account_type", "type_signals") == \
+            original.signals("suitability.missing_account_type", "type_signals")
+
+    def test_loaded_mappings_stay_read_only(self, built):
+        original, path = built
+        loaded = read_artifact(path, original.version)
+        with pytest.raises(TypeError):
+            loaded.configs["x"] = {}
+        with pytest.raises(TypeError):
+            loaded.rule("compliance.unbalanced_claims").signals["x"] = frozenset()
+
+    def test_registry_prefers_artifact(self, config_dir, built, monkeypatch):
+        _, path = built
+        monkeypatch.setattr(CompiledRuleSet, "__init__", _fail_compile)
+        registry = RulesetRegistry(config_dir, artifact_path=path)
+        assert registry.version == built[0].version
+
+    def test_edited_yaml_falls_back(self, config_dir, built):
+        original, path = built
+        yaml_path = config_dir / "compliance.yaml"
+        yaml_path.write_text(yaml_path.read_text().replace('- "sure thing"', '- "sure bet"'))
+        ruleset = load_ruleset(config_dir, artifact_path=path)
+        assert ruleset.version != original.version
+        assert "compliance.guarantee_language" in ruleset.match("a sure bet")
+
+    def test_compiler_change_invalidates(self, built, monkeypatch):
+        original, path = built
+        monkeypatch.setattr(artifact, "compiler_fingerprint", lambda: "0" * 16)
+        assert read_artifact(path, original.version) is None
+
+    @pytest.mark.parametrize("damage", [
+        lambda data: data[:10],
+        lambda data: b"NOTRULES" + data[8:],
+        lambda data: data[:60] + b"\x00" * 20,
+    ])
+    def test_damaged_artifact_returns_none(self, built, damage):
+        original, path = built
+        path.write_bytes(damage(path.read_bytes()))
+        assert read_artifact(path, original.version) is None
+
+    def test_missing_artifact_returns_none(self, tmp_path):
+        assert read_artifact(tmp_path / "absent", "0" * 16) is None
+
+    def test_unversioned_ruleset_rejected(self, built, tmp_path):
+        original, _ = built
+        with pytest.raises(ValueError):
+            write_artifact(CompiledRuleSet(original.configs), tmp_path / "x")
+
+
+def _fail_compile(self, *args, **kwargs):
+    raise AssertionError("compiled from YAML instead of loading the artifact")
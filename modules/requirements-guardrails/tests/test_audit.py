@@ -0,0 +1,153 @@
+"""
+Tests for the buffered audit sink.
+
+Every accepted record must land on disk exactly once, in order, across
+rotation and compression; records the sink cannot accept must be counted.
+"""
+
+import gzip
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from src.audit import AuditSink
+from src.classifier import classify
+
+
+def _wait_for(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+def _read_records(directory) -> list[dict]:
+    records = []
+    for path in sorted(directory.iterdir()):
+        opener = gzip.open if path.suffix == ".gz" else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            records.extend(json.loads(line) for line in f)
+    return records
+
+
+class TestAuditSink:
+    """Ordering, rotation, compression, and backpressure."""
+
+    def test_records_written_in_order(self, tmp_path):
+        result = classify("Should I buy NVDA?")
+        with AuditSink(tmp_path, batch_size=16) as sink:
+            for i in range(100):
+                assert sink.write({"seq": i})
+            sink.write(result)
+        records = _read_records(tmp_path)
+        assert [r["seq"] for r in records[:-1]] == list(range(100))
+        assert records[-1] == result.to_dict()
+        assert sink.stats().written == 101
+
+    def test_flush_makes_records_visible(self, tmp_path):
+        with AuditSink(tmp_path, flush_interval=60) as sink:
+            sink.write({"seq": 0})
+            sink.flush()
+            assert _read_records(tmp_path) == [{"seq": 0}]
+
+    def test_size_rotation(self, tmp_path):
+        with AuditSink(tmp_path, batch_size=10, rotate_bytes=100) as sink:
+            for i in range(50):
+                sink.write({"seq": i})
+        assert sink.stats().rotations >= 1
+        assert len(list(tmp_path.iterdir())) > 1
+        assert [r["seq"] for r in _read_records(tmp_path)] == list(range(50))
+
+    def test_gzip(self, tmp_path):
+        with AuditSink(tmp_path, compress=True, fsync="batch") as sink:
+            for i in range(20):
+                sink.write({"seq": i})
+        assert all(p.name.endswith(".jsonl.gz") for p in tmp_path.iterdir())
+        assert len(_read_records(tmp_path)) == 20
+
+    def test_drop_policy_counts_rejected_records(self, tmp_path, monkeypatch):
+        release = threading.Event()
+        original = AuditSink._write_batch
+
+        def stalled(self, batch):
+            release.wait()
+            original(self, batch)
+
+        monkeypatch.setattr(AuditSink, "_write_batch", stalled)
+        sink = AuditSink(tmp_path, max_queue=2, batch_size=1, overflow="drop")
+        accepted = sum(sink.write({"seq": i}) for i in range(10))
+        release.set()
+        sink.close()
+        stats = sink.stats()
+        assert stats.dropped == 10 - accepted > 0
+        assert stats.written == accepted
+
+    def test_fsync_failure_on_idle_rotation_keeps_flusher_alive(self, tmp_path, monkeypatch):
+        real_fsync = os.fsync
+        failures = []
+
+        def fails_once(fd):
+            if not failures:
+                failures.append(fd)
+                raise OSError(5, "Input/output error")
+            real_fsync(fd)
+
+        sink = AuditSink(tmp_path, max_queue=4, batch_size=1, flush_interval=0.01,
+                         rotate_seconds=0.05, fsync_interval=3600, put_timeout=5)
+        sink.write({"seq": 0})
+        sink.flush()
+        monkeypatch.setattr(os, "fsync", fails_once)
+        assert _wait_for(lambda: failures)
+        # With a dead flusher these would fill the queue and time out.
+        assert all(sink.write({"seq": i}) for i in range(1, 21))
+        sink.close()
+        stats = sink.stats()
+        assert stats.errors == 1
+        assert stats.written == 21 and stats.failed == 0
+        assert [r["seq"] for r in _read_records(tmp_path)] == list(range(21))
+
+    def test_interval_fsync_runs_while_idle(self, tmp_path, monkeypatch):
+        synced = []
+        monkeypatch.setattr(os, "fsync", synced.append)
+        with AuditSink(tmp_path, flush_interval=0.01, fsync="interval", fsync_interval=0.2) as sink:
+            sink.write({"seq": 0})
+            sink.flush()
+            assert not synced
+            # No further batch arrives; the idle loop must fsync on its own.
+            assert _wait_for(lambda: synced)
+
+    def test_close_racing_writers_loses_nothing(self, tmp_path):
+        sink = AuditSink(tmp_path, max_queue=8, batch_size=4)
+        accepted = []
+
+        def writer(n):
+            for i in range(200):
+                try:
+                    if sink.write({"seq": n * 1000 + i}):
+                        accepted.append(n * 1000 + i)
+                except RuntimeError:
+                    return
+
+        threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        sink.close()
+        for t in threads:
+            t.join()
+        assert sorted(r["seq"] for r in _read_records(tmp_path)) == sorted(accepted)
+        assert sink.stats().written == len(accepted)
+
+    def test_write_after_close_raises(self, tmp_path):
+        sink = AuditSink(tmp_path)
+        sink.close()
+        with pytest.raises(RuntimeError):
+            sink.write({"seq": 0})
+
+    def test_invalid_policy(self, tmp_path):
+        with pytest.raises(ValueError):
+            AuditSink(tmp_path, fsync="sometimes")
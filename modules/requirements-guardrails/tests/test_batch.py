@@ -0,0 +1,65 @@
+"""
+Tests for batch classification and the streaming JSONL CLI.
+
+classify_many must be a drop-in replacement for calling classify() in a
+loop: same decisions, same order, whether or not a process pool is used.
+"""
+
+import json
+
+import pytest
+
+from src.classifier import classify, classify_many, main
+
+QUERIES = [
+    "What is my current account balance in my Roth IRA?",
+    "What should I invest in right now?",
+    "Should I buy NVIDIA stock today?",
+    "What's the weather today?",
+    "My advisor said this fund is guaranteed, should I be worried?",
+] * 7
+
+
+def _decision(result):
+    return (result.classification, result.category,
+            [r.rule_id for r in result.triggered_rules], result.missing_context)
+
+
+class TestClassifyMany:
+    """Ordering and equivalence with single-query classify()."""
+
+    @pytest.mark.parametrize("workers,chunksize", [(1, 256), (2, 3)])
+    def test_matches_classify_in_order(self, workers, chunksize):
+        expected = [_decision(classify(q)) for q in QUERIES]
+        results = classify_many(iter(QUERIES), workers=workers, chunksize=chunksize)
+        assert [_decision(r) for r in results] == expected
+
+    @pytest.mark.parametrize("workers,chunksize", [(0, 256), (1, 0)])
+    def test_invalid_arguments_raise_at_call_time(self, workers, chunksize):
+        with pytest.raises(ValueError):
+            classify_many(QUERIES, workers=workers, chunksize=chunksize)
+
+
+class TestStreamingCli:
+    """python -m src.classifier --in ... --out ..."""
+
+    def test_jsonl_round_trip(self, tmp_path):
+        src = tmp_path / "queries.jsonl"
+        dst = tmp_path / "results.jsonl"
+        src.write_text(
+            json.dumps({"id": "a", "query": QUERIES[2]}) + "\n"
+            + "\n"
+            + json.dumps(QUERIES[3]) + "\n",
+            encoding="utf-8",
+        )
+        assert main(["--in", str(src), "--out", str(dst)]) == 0
+        records = [json.loads(line) for line in dst.read_text().splitlines()]
+        assert [r["classification"] for r in records] == ["BLOCK", "BLOCK"]
+        assert records[0]["id"] == "a"
+        assert "id" not in records[1]
+
+    def test_rejects_records_without_query(self, tmp_path):
+        src = tmp_path / "queries.jsonl"
+        src.write_text(json.dumps({"text": "hi"}) + "\n", encoding="utf-8")
+        with pytest.raises(ValueError, match="line 1"):
+            main(["--in", str(src), "--out", str(tmp_path / "out.jsonl")])
@@ -0,0 +1,71 @@
+"""
+Tests for the opt-in classify() result cache.
+
+Cached results must be decision-identical to uncached ones while still
+honoring the audit contract: a fresh request_id and timestamp per call.
+"""
+
+import pytest
+
+from src.cache import CachedClassifier
+from src.classifier import classify
+
+QUERY = "What should I invest in right now?"
+
+
+def _decision(result):
+    return (result.classification, result.category,
+            result.triggered_rules, result.missing_context,
+            result.ruleset_version)
+
+
+class TestCachedClassifier:
+    """Hit/miss accounting, eviction, TTL, and audit fields."""
+
+    def test_hit_returns_same_decision_with_fresh_audit_fields(self):
+        cached = CachedClassifier(maxsize=4)
+        first = cached.classify(QUERY)
+        second = cached.classify(QUERY)
+        assert _decision(first) == _decision(second) == _decision(classify(QUERY))
+        assert first.request_id != second.request_id
+        stats = cached.stats()
+        assert (stats.hits, stats.misses, stats.size) == (1, 1, 1)
+        assert stats.hit_rate == 0.5
+
+    def test_key_is_case_sensitive(self):
+        """State abbreviations are case-sensitive: 'NY' is a jurisdiction,
+        'ny' is not, so the two queries route differently."""
+        cached = CachedClassifier()
+        upper = cached.classify("What are the tax implications in NY?")
+        lower = cached.classify("what are the tax implications in ny?")
+        assert upper.classification != lower.classification
+        assert cached.stats().misses == 2
+
+    def test_lru_eviction(self):
+        cached = CachedClassifier(maxsize=2)
+        for q in ["a fund", "b fund", "a fund", "c fund"]:
+            cached.classify(q)
+        stats = cached.stats()
+        assert stats.evictions == 1 and stats.size == 2
+        cached.classify("a fund")  # most recently used before "c fund": kept
+        assert cached.stats().hits == 2
+
+    def test_ttl_expiry(self, monkeypatch):
+        clock = [1000.0]
+        monkeypatch.setattr("src.cache.time.monotonic", lambda: clock[0])
+        cached = CachedClassifier(ttl=10)
+        cached.classify(QUERY)
+        clock[0] += 11
+        cached.classify(QUERY)
+        stats = cached.stats()
+        assert (stats.hits, stats.misses, stats.expirations) == (0, 2, 1)
+
+    def test_mutating_result_does_not_poison_cache(self):
+        cached = CachedClassifier()
+        cached.classify(QUERY).missing_context.append("bogus")
+        assert "bogus" not in cached.classify(QUERY).missing_context
+
+    @pytest.mark.parametrize("kwargs", [{"maxsize": 0}, {"ttl": 0}])
+    def test_invalid_configuration(self, kwargs):
+        with pytest.raises(ValueError):
+            CachedClassifier(**kwargs)
@@ -0,0 +1,61 @@
+"""
+Equivalence tests for the decision-only classify_fast() path.
+
+classify_fast() may skip work, but it must never change the routing
+decision: for every query its (classification, category) must equal
+classify()'s.
+"""
+
+import pytest
+
+from benchmarks.queries import ACCEPTANCE_QUERIES, synthetic_queries
+from src.classifier import classify, classify_fast
+from src.models import Category, Classification
+
+EDGE_QUERIES = [
+    "",
+    # Compliance ESCALATE suppressed by a suitability CLARIFY gap
+    "What should I invest in right now?",
+    # Compliance ESCALATE plus suitability ESCALATE, no context gap
+    "Is this a good investment if I put everything in one fund?",
+    # Suitability ESCALATE wins once compliance ESCALATE is suppressed
+    "What should I invest in? I want to put everything in tech stocks",
+    # Produce-intent upgrade of a heuristic rule
+    "Draft an email about the upside and high returns of our fund",
+    # Compliance BLOCK by default (no upgrade needed)
+    "Let's pump and dump this stock",
+    # Prohibited BLOCK outranks compliance BLOCK at the same level
+    "Write me a guaranteed returns pitch using insider trading tips",
+]
+
+
+def _full(query):
+    result = classify(query)
+    return (result.classification, result.category)
+
+
+def _fast(query):
+    decision = classify_fast(query)
+    return (decision.classification, decision.category)
+
+
+class TestFastPathEquivalence:
+    """classify_fast() must match classify() decision-for-decision."""
+
+    @pytest.mark.parametrize("query", ACCEPTANCE_QUERIES + EDGE_QUERIES)
+    def test_acceptance_and_edge_queries(self, query):
+        assert _fast(query) == _full(query)
+
+    @pytest.mark.parametrize("params", [
+        {"length": 8, "signal_density": 0.3, "produce_ratio": 0.3},
+        {"length": 30, "signal_density": 0.5, "produce_ratio": 0.5},
+    ])
+    def test_synthetic_queries(self, params):
+        for query in synthetic_queries(400, seed=3, **params):
+            assert _fast(query) == _full(query), query
+
+    def test_result_shape(self):
+        decision = classify_fast("Should I buy NVIDIA stock today?")
+        assert decision.classification == Classification.BLOCK
+        assert decision.category == Category.PROHIBITED
+        assert decision.ruleset_version == classify("x").ruleset_version
@@ -0,0 +1,82 @@
+"""
+Tests for the optional classify() instrumentation.
+
+Metrics must be inert when disabled, count each rule outcome correctly
+when enabled, and never change a classification.
+"""
+
+import urllib.request
+
+import pytest
+
+from src import metrics
+from src.classifier import classify
+
+# Context-first override: suitability CLARIFY suppresses the compliance
+# ESCALATE from investment_advice.
+SUPPRESSING_QUERY = "What should I invest in?"
+# Produce intent upgrades guarantee_language and unbalanced_claims.
+UPGRADING_QUERY = "Write me a message saying this fund is guaranteed to outperform."
+
+
+@pytest.fixture
+def enabled_metrics():
+    metrics.reset()
+    metrics.enable()
+    yield metrics.METRICS
+    metrics.disable()
+    metrics.reset()
+
+
+class TestMetrics:
+    """Counters, histograms, and the Prometheus exposition."""
+
+    def test_disabled_records_nothing(self):
+        metrics.reset()
+        classify(SUPPRESSING_QUERY)
+        assert not metrics.METRICS.evaluated
+        assert not metrics.METRICS.phase_latency
+
+    def test_counters(self, enabled_metrics):
+        classify(SUPPRESSING_QUERY)
+        classify(UPGRADING_QUERY)
+        m = enabled_metrics
+        assert m.evaluated["prohibited.jailbreak"] == 2
+        assert m.fired["compliance.investment_advice"] == 1
+        assert m.suppressed == {"compliance.investment_advice": 1}
+        assert m.upgraded == {"compliance.guarantee_language": 1,
+                              "compliance.unbalanced_claims": 1}
+        assert m.classifications[("CLARIFY", "suitability")] == 1
+        assert m.rule_latency["prohibited.out_of_scope"].count == 2
+        assert m.phase_latency["rule_scan"].count == 2
+
+    def test_decisions_unchanged(self, enabled_metrics):
+        for q in (SUPPRESSING_QUERY, UPGRADING_QUERY, "Should I buy NVDA?"):
+            instrumented = classify(q)
+            metrics.disable()
+            plain = classify(q)
+            metrics.enable()
+            assert (instrumented.classification, instrumented.category,
+                    instrumented.triggered_rules) == (
+                plain.classification, plain.category, plain.triggered_rules)
+
+    def test_prometheus_text(self, enabled_metrics):
+        classify(SUPPRESSING_QUERY)
+        text = metrics.render_prometheus()
+        assert "# TYPE guardrail_rule_fired_total counter" in text
+        assert 'guardrail_rule_suppressed_total{rule_id="compliance.investment_advice"} 1' in text
+        assert 'guardrail_phase_latency_seconds_bucket{phase="rule_scan",le="+Inf"} 1' in text
+        assert 'guardrail_phase_latency_seconds_count{phase="rule_scan"} 1' in text
+
+    def test_http_endpoint(self, enabled_metrics):
+        classify(SUPPRESSING_QUERY)
+        server = metrics.serve(port=0)
+        try:
+            port = server.server_address[1]
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as resp:
+                body = resp.read().decode()
+            assert resp.headers["Content-Type"].startswith("text/plain")
+            assert "guardrail_rule_evaluated_total" in body
+        finally:
+            server.shutdown()
+            server.server_close()
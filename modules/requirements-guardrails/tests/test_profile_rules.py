@@ -0,0 +1,134 @@
+"""
+Tests for the rule-cost profiler.
+
+The decision counts must agree with classify(), and the static regex
+checks must flag the textbook catastrophic-backtracking shapes while
+leaving the shipped patterns' plain alternations alone.
+"""
+
+import json
+from collections import Counter
+
+import pytest
+
+from benchmarks import profile_rules
+from benchmarks.profile_rules import (
+    adversarial_growth,
+    build_report,
+    main,
+    profile_decisions,
+    static_risks,
+)
+from benchmarks.queries import ACCEPTANCE_QUERIES
+from src.classifier import classify
+from src.rules.query_view import QueryView
+from src.rules.yaml_evaluator import active_ruleset
+
+QUERIES = list(ACCEPTANCE_QUERIES)
+
+
+@pytest.fixture(scope="module")
+def report():
+    return build_report(active_ruleset(), QUERIES, repeat=1, adversarial=False)
+
+
+def test_report_covers_every_rule(report):
+    ruleset = active_ruleset()
+    expected = {spec.rule_id for category in ruleset.configs
+                for spec in ruleset.rules_in(category)}
+    assert {r["rule_id"] for r in report["rules"]} == expected
+    assert report["queries"] == len(QUERIES)
+
+
+def test_fired_counts_match_classify(report):
+    fired = Counter(rule.rule_id for q in QUERIES for rule in classify(q).triggered_rules)
+    for row in report["rules"]:
+        assert row["fired"] == fired[row["rule_id"]], row["rule_id"]
+        assert row["sole"] <= row["decided"] <= row["fired"]
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_deciders_belong_to_the_routed_category(query):
+    ruleset = active_ruleset()
+    result = classify(query)
+    _, decided, _ = profile_decisions(ruleset, [QueryView.from_text(query)])
+
+    assert bool(decided) == bool(result.triggered_rules)
+    for rule_id in decided:
+        assert ruleset.rule(rule_id).category == result.category
+
+
+@pytest.mark.parametrize("pattern, risk", [
+    ("(a+)+b", "nested unbounded quantifier"),
+    (r"(\w+\s?)+$", "nested unbounded quantifier"),
+    (".*x.*y", "multiple unbounded broad quantifiers in sequence"),
+    ("(a|a)*b", "quantified overlapping alternation"),
+    ("a*a*a*b", "adjacent unbounded quantifiers over shared characters"),
+    (r"\s*\s*\s*\s*x", "adjacent unbounded quantifiers over shared characters"),
+])
+def test_static_risks_flag_backtracking_shapes(pattern, risk):
+    assert risk in static_risks(pattern)
+
+
+@pytest.mark.parametrize("pattern", [
+    "should I (buy|sell|invest in)",
+    r"buy or sell [A-Z]{1,5}\b",
+    "which (fund|stock|etf|bond) should",
+    "a*b*c",
+])
+def test_static_risks_pass_plain_patterns(pattern):
+    assert static_risks(pattern) == []
+
+
+def test_adversarial_growth_exponential():
+    growth = adversarial_growth("(a+)+b", timeout=10)
+    assert growth["verdict"] == "exponential"
+    assert growth["n"] <= 32
+
+
+def test_adversarial_growth_polynomial():
+    growth = adversarial_growth("a*a*b", timeout=10)
+    assert growth["verdict"] == "polynomial"
+    assert growth["n"] > 64 and growth["exponent"] >= 1.6
+
+
+def test_adversarial_growth_plain_pattern_is_ok():
+    assert adversarial_growth("should I (buy|sell)")["verdict"] == "ok"
+
+
+def test_adversarial_growth_over_budget_at_first_doubling(monkeypatch):
+    # Only one polynomial-probe sample; the n=32 probe supplies the other.
+    class FakeProber:
+        def __init__(self, pattern, timeout):
+            pass
+
+        def worst_time(self, n):
+            return 1e-5 if n <= 32 else 0.5
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(profile_rules, "_Prober", FakeProber)
+    growth = adversarial_growth("a*a*a*b")
+    assert growth["verdict"] == "polynomial"
+    assert growth["n"] == 64 and growth["exponent"] > 10
+
+
+def test_adversarial_growth_stops_at_time_limit():
+    # With no budget, only the hard limit can stop (a+)+b at n=32.
+    growth = adversarial_growth("(a+)+b", budget=float("inf"), timeout=0.2)
+    assert growth["verdict"] == "exceeded budget"
+    assert growth["seconds"] == 0.2
+
+
+def test_cli_writes_json(tmp_path, capsys):
+    corpus = tmp_path / "corpus.jsonl"
+    corpus.write_text("\n".join(json.dumps({"query": q}) for q in QUERIES[:5]) + "\n")
+    out = tmp_path / "profile.json"
+
+    assert main(["--in", str(corpus), "--repeat", "1", "--no-adversarial",
+                 "--sort", "decided", "--json", str(out)]) == 0
+
+    report = json.loads(out.read_text())
+    assert report["queries"] == 5
+    assert "rule_id" in capsys.readouterr().out
@@ -0,0 +1,86 @@
+"""
+Tests for the hot-reloadable ruleset registry.
+
+A reload must swap the active ruleset atomically, leave previously
+captured rulesets untouched, and never replace a working ruleset with
+one that fails to load.
+"""
+
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+from src.classifier import classify
+from src.models import Classification
+from src.rules.registry import CONFIG_FILES, RulesetRegistry
+from src.rules.yaml_evaluator import REGISTRY
+
+CONFIG_DIR = Path(__file__).parent.parent / "src" / "config"
+
+
+@pytest.fixture
+def config_dir(tmp_path):
+    """A private copy of the shipped config directory."""
+    for filename in CONFIG_FILES.values():
+        shutil.copy(CONFIG_DIR / filename, tmp_path / filename)
+    return tmp_path
+
+
+def _edit(path: Path, old: str, new: str) -> None:
+    """Rewrite a config file and bump its mtime so polling notices."""
+    text = path.read_text(encoding="utf-8")
+    assert old in text
+    path.write_text(text.replace(old, new), encoding="utf-8")
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+class TestRulesetRegistry:
+    """Versioning, reload, and atomic swap."""
+
+    def test_version_is_content_hash(self, config_dir):
+        assert RulesetRegistry(config_dir).version == REGISTRY.version
+
+    def test_unchanged_files_do_not_reload(self, config_dir):
+        registry = RulesetRegistry(config_dir)
+        before = registry.active
+        assert registry.check_for_changes() is False
+        assert registry.reload() is False
+        assert registry.active is before
+
+    def test_edit_swaps_new_version(self, config_dir):
+        registry = RulesetRegistry(config_dir)
+        old = registry.active
+        _edit(config_dir / "compliance.yaml", '- "sure thing"', '- "sure bet"')
+
+        assert registry.check_for_changes() is True
+        new = registry.active
+        assert new is not old
+        assert new.version != old.version
+        # The captured ruleset still evaluates with the rules it was built from.
+        assert "compliance.guarantee_language" in old.match("a sure thing")
+        assert "compliance.guarantee_language" not in new.match("a sure thing")
+        assert "compliance.guarantee_language" in new.match("a sure bet")
+
+    def test_bad_edit_keeps_previous_ruleset(self, config_dir):
+        registry = RulesetRegistry(config_dir)
+        before = registry.active
+        _edit(config_dir / "prohibited.yaml",
+              '- "buy or sell [A-Z]{1,5}\\\\b"', '- "buy or sell ([A-Z]"')
+
+        assert registry.check_for_changes() is False
+        assert registry.active is before
+        with pytest.raises(ValueError, match="prohibited.specific_security"):
+            registry.reload()
+
+
+class TestResultVersion:
+    """Every result records the ruleset version it was evaluated against."""
+
+    def test_result_carries_ruleset_version(self):
+        result = classify("Should I buy NVIDIA stock today?")
+        assert result.classification == Classification.BLOCK
+        assert result.ruleset_version == REGISTRY.version
+        assert result.to_dict()["ruleset_version"] == REGISTRY.version
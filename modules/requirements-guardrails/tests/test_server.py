@@ -0,0 +1,151 @@
+"""
+Tests for the guardrails sidecar.
+
+Responses must be exactly GuardrailResult.to_dict() for the query, with
+micro-batching invisible to callers.
+"""
+
+import asyncio
+import json
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from src.classifier import classify
+from src.server import GuardrailServer, MicroBatcher
+
+QUERIES = [
+    "Should I buy NVDA?",
+    "What should I invest in?",
+    "What is my current account balance in my Roth IRA?",
+]
+
+
+def _decision(d: dict) -> tuple:
+    return (d["classification"], d["category"], d["triggered_rules"],
+            d["missing_context"], d["ruleset_version"])
+
+
+async def _with_server(fn, max_wait=0.001):
+    batcher = MicroBatcher(None, max_batch=8, max_wait=max_wait)
+    batcher.start()
+    app = GuardrailServer(batcher)
+    server = await asyncio.start_server(app.handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        return await fn(app, port)
+    finally:
+        server.close()
+        await server.wait_closed()
+        await batcher.stop()
+
+
+async def _http(port: int, method: str, path: str, body: bytes = b"",
+                requests: int = 1) -> list[tuple[int, bytes]]:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    responses = []
+    for _ in range(requests):
+        writer.write(f"{method} {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n"
+                     .encode() + body)
+        head = await reader.readuntil(b"\r\n\r\n")
+        status = int(head.split(b" ")[1])
+        length = int(head.lower().split(b"content-length:")[1].split(b"\r\n")[0])
+        responses.append((status, await reader.readexactly(length)))
+    writer.close()
+    return responses
+
+
+class TestSidecar:
+    """Routing, validation, keep-alive, and batching."""
+
+    def test_classify_matches_in_process(self):
+        async def check(app, port):
+            for query in QUERIES:
+                body = json.dumps({"query": query}).encode()
+                [(status, payload)] = await _http(port, "POST", "/classify", body)
+                assert status == 200
+                assert _decision(json.loads(payload)) == _decision(classify(query).to_dict())
+        asyncio.run(_with_server(check))
+
+    def test_keep_alive(self):
+        async def check(app, port):
+            body = json.dumps({"query": QUERIES[0]}).encode()
+            responses = await _http(port, "POST", "/classify", body, requests=3)
+            assert [s for s, _ in responses] == [200, 200, 200]
+        asyncio.run(_with_server(check))
+
+    def test_batch_endpoint_preserves_order(self):
+        async def check(app, port):
+            body = json.dumps({"queries": QUERIES}).encode()
+            [(status, payload)] = await _http(port, "POST", "/classify/batch", body)
+            assert status == 200
+            assert [_decision(d) for d in json.loads(payload)] == [
+                _decision(classify(q).to_dict()) for q in QUERIES
+            ]
+        asyncio.run(_with_server(check))
+
+    def test_concurrent_requests_are_batched(self):
+        async def check(app, port):
+            dispatched = []
+            original = app.batcher._dispatch
+
+            async def spy(batch):
+                dispatched.append(len(batch))
+                await original(batch)
+
+            app.batcher._dispatch = spy
+            results = await asyncio.gather(*(app.batcher.submit(q) for q in QUERIES * 4))
+            assert [json.loads(r)["classification"] for r in results] == [
+                classify(q).classification.value for q in QUERIES * 4
+            ]
+            assert max(dispatched) > 1
+        asyncio.run(_with_server(check, max_wait=0.01))
+
+    def test_errors(self):
+        async def check(app, port):
+            assert (await app.route("POST", "/classify", b"not json"))[0] == 400
+            assert (await app.route("POST", "/classify", b'{"query": 1}'))[0] == 400
+            assert (await app.route("GET", "/classify", b""))[0] == 405
+            assert (await app.route("GET", "/nope", b""))[0] == 404
+            status, payload = await app.route("GET", "/health", b"")
+            assert status == 200 and json.loads(payload)["status"] == "ok"
+        asyncio.run(_with_server(check))
+
+
+class _BrokenPool(Executor):
+    """Stands in for a ProcessPoolExecutor whose worker died."""
+
+    def submit(self, fn, /, *args, **kwargs):
+        future = Future()
+        future.set_exception(BrokenProcessPool("a worker died"))
+        return future
+
+
+class TestBrokenPool:
+    """A dead worker costs the batches in flight, not the server."""
+
+    def test_broken_pool_is_replaced(self):
+        async def check():
+            replacements = []
+
+            def factory():
+                replacements.append(ThreadPoolExecutor(1))
+                return replacements[-1]
+
+            batcher = MicroBatcher(_BrokenPool(), max_batch=8, max_wait=0,
+                                   executor_factory=factory)
+            batcher.start()
+            app = GuardrailServer(batcher)
+            try:
+                body = json.dumps({"query": QUERIES[0]}).encode()
+                assert (await app.route("POST", "/classify", body))[0] == 500
+                status, payload = await app.route("POST", "/classify", body)
+                assert status == 200
+                assert _decision(json.loads(payload)) == _decision(classify(QUERIES[0]).to_dict())
+                assert len(replacements) == 1
+                await asyncio.sleep(0.01)  # let done callbacks run
+                assert not batcher._dispatches
+            finally:
+                await batcher.stop()
+                for executor in replacements:
+                    executor.shutdown()
+        asyncio.run(check())
@@ -0,0 +1,84 @@
+"""
+Tests for multi-turn classification.
+
+A session's result after N turns must equal classify() of the N turns
+joined by newlines, while scanning only the newest turn.
+"""
+
+import random
+
+import pytest
+
+from benchmarks.queries import ACCEPTANCE_QUERIES, synthetic_queries
+from src.classifier import classify
+from src.models import Category, Classification
+from src.session import ClassificationSession, _HEURISTIC_RULES
+from src.rules.yaml_evaluator import active_ruleset
+
+
+def _decision(result) -> tuple:
+    return (result.classification, result.category, result.triggered_rules,
+            result.missing_context, result.decision_reason, result.next_action)
+
+
+def _assert_matches_joined(turns: list[str]) -> None:
+    session = ClassificationSession()
+    for i, turn in enumerate(turns):
+        result = session.classify_turn(turn)
+        assert _decision(result) == _decision(classify("\n".join(turns[:i + 1]))), turns[:i + 1]
+
+
+class TestClassificationSession:
+    """Equivalence with whole-transcript classification."""
+
+    def test_every_heuristic_rule_is_mirrored(self):
+        heuristic_ids = {
+            spec.rule_id
+            for category in (Category.COMPLIANCE, Category.SUITABILITY, Category.PROHIBITED)
+            for spec in active_ruleset().rules_in(category)
+            if spec.detection_type == "heuristic"
+        }
+        assert heuristic_ids == set(_HEURISTIC_RULES)
+
+    def test_context_supplied_on_follow_up(self):
+        session = ClassificationSession()
+        first = session.classify_turn("What should I invest in?")
+        assert first.classification == Classification.CLARIFY
+        assert "risk_tolerance" in first.missing_context
+
+        second = session.classify_turn("I have a high risk tolerance.")
+        assert second.classification == Classification.CLARIFY
+        assert "risk_tolerance" not in second.missing_context
+
+        # With every suitability gap filled, the compliance ESCALATE from
+        # the first turn is no longer suppressed by the context-first override.
+        third = session.classify_turn("My time horizon is 20 years.")
+        assert third.classification == Classification.ESCALATE
+        assert third.category == Category.COMPLIANCE
+        assert session.turns == 3
+
+    @pytest.mark.parametrize("turns", [
+        ["What should I invest in?", "I have a high risk tolerance.",
+         "My time horizon is 20 years."],
+        ["What are the tax implications of selling?", "I live in NY."],
+        ["Which account should I withdraw from?", "It's my Roth IRA."],
+        ["This fund has guaranteed high returns.", "But there is risk of loss."],
+        ["Tell me a joke", "about my retirement portfolio"],
+        ["Help me write", "a message saying this fund is guaranteed to outperform."],
+    ])
+    def test_conversations_match_joined_transcript(self, turns):
+        _assert_matches_joined(turns)
+
+    def test_random_conversations_match_joined_transcript(self):
+        rng = random.Random(3)
+        pool = list(ACCEPTANCE_QUERIES) + synthetic_queries(300, seed=5)
+        for _ in range(100):
+            _assert_matches_joined(rng.sample(pool, rng.randint(1, 5)))
+
+    def test_reset(self):
+        session = ClassificationSession()
+        session.classify_turn("Should I buy NVDA?")
+        session.reset()
+        assert session.turns == 0 and not any(session.signals.values())
+        result = session.classify_turn("What is my Roth IRA balance?")
+        assert _decision(result) == _decision(classify("What is my Roth IRA balance?"))
@@ -0,0 +1,107 @@
+"""
+Tests for shadow evaluation of a candidate ruleset.
+
+The production result must be unaffected by shadowing, and the
+candidate result — resolved from the shared scan — must equal what
+classify() would return under the candidate ruleset.
+"""
+
+import shutil
+from pathlib import Path
+
+import pytest
+
+from benchmarks.queries import ACCEPTANCE_QUERIES, synthetic_queries
+from src.classifier import _classify_view, classify
+from src.rules.query_view import QueryView
+from src.rules.registry import CONFIG_FILES, load_ruleset
+from src.shadow import MergedScan, ShadowEvaluator
+from src.rules.yaml_evaluator import active_ruleset
+
+CONFIG_DIR = Path(__file__).parent.parent / "src" / "config"
+QUERIES = list(ACCEPTANCE_QUERIES) + synthetic_queries(200, seed=9)
+
+
+@pytest.fixture
+def config_dir(tmp_path):
+    for filename in CONFIG_FILES.values():
+        shutil.copy(CONFIG_DIR / filename, tmp_path / filename)
+    return tmp_path
+
+
+def _candidate(config_dir: Path, filename: str, old: str, new: str):
+    path = config_dir / filename
+    text = path.read_text(encoding="utf-8")
+    assert old in text
+    path.write_text(text.replace(old, new), encoding="utf-8")
+    return load_ruleset(config_dir)
+
+
+def _decision(result) -> tuple:
+    return (result.classification, result.category, result.triggered_rules,
+            result.missing_context, result.ruleset_version)
+
+
+def _classify_with(ruleset, query):
+    view = QueryView.from_text(query)
+    return _classify_view(view, ruleset, ruleset.match(view))
+
+
+class TestShadowEvaluator:
+    """Merged scan, diff emission, and sampling."""
+
+    def test_identical_candidate_never_diffs(self, config_dir):
+        diffs = []
+        shadow = ShadowEvaluator(load_ruleset(config_dir), on_diff=diffs.append)
+        for query in QUERIES:
+            assert _decision(shadow.classify(query)) == _decision(classify(query))
+        assert diffs == []
+        assert shadow.stats().shadowed == len(QUERIES)
+
+    def test_merged_scan_matches_each_ruleset(self, config_dir):
+        candidate = _candidate(config_dir, "compliance.yaml",
+                               '- "pump and dump"', '- "pump and dump"\n        - "rug pull"')
+        scan = MergedScan(active_ruleset(), candidate)
+        for query in QUERIES + ["a rug pull scheme", "pump and dump"]:
+            assert scan.match(query) == (active_ruleset().match(query), candidate.match(query))
+
+    def test_pattern_removal_emits_diff(self, config_dir):
+        candidate = _candidate(config_dir, "compliance.yaml", '- "sure thing"', '- "sure bet"')
+        diffs = []
+        shadow = ShadowEvaluator(candidate, on_diff=diffs.append)
+        query = "This fund is a sure thing"
+        result = shadow.classify(query)
+        assert _decision(result) == _decision(classify(query))
+        [diff] = diffs
+        assert "triggered_rules" in diff.changed
+        assert diff.production["ruleset_version"] == active_ruleset().version
+        assert diff.candidate["ruleset_version"] == candidate.version
+        assert "compliance.guarantee_language" in diff.production["triggered_rules"]
+        assert "compliance.guarantee_language" not in diff.candidate["triggered_rules"]
+        record = diff.to_dict()
+        assert record["request_id"] == result.request_id and "query" not in record
+
+    def test_candidate_results_match_direct_evaluation(self, config_dir):
+        """Also covers changed heuristic signals (no heuristic sharing)."""
+        candidate = _candidate(config_dir, "suitability.yaml",
+                               '- "conservative"', '- "cautious"')
+        captured = []
+        shadow = ShadowEvaluator(candidate, include_query=True, on_diff=captured.append)
+        for query in QUERIES + ["What should I invest in? I'm conservative, 10 year horizon"]:
+            shadow.classify(query)
+        expected = {
+            q for q in QUERIES + ["What should I invest in? I'm conservative, 10 year horizon"]
+            if _classify_with(candidate, q).triggered_rules != classify(q).triggered_rules
+            or _classify_with(candidate, q).classification != classify(q).classification
+        }
+        assert {d.query for d in captured} == expected
+        assert expected
+
+    def test_sampling(self, config_dir):
+        shadow = ShadowEvaluator(load_ruleset(config_dir), sample_rate=0.0)
+        for query in ACCEPTANCE_QUERIES:
+            shadow.classify(query)
+        stats = shadow.stats()
+        assert stats.requests == len(ACCEPTANCE_QUERIES) and stats.shadowed == 0
+        with pytest.raises(ValueError):
+            ShadowEvaluator(load_ruleset(config_dir), sample_rate=1.5)